@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import JobApplication, Interview, Note
+from .models import JobApplication, Interview, Note, UserApplicationStats
 
 
 @admin.register(JobApplication)
@@ -83,3 +83,17 @@ class NoteAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(UserApplicationStats)
+class UserApplicationStatsAdmin(admin.ModelAdmin):
+    """Read-only admin interface for UserApplicationStats model"""
+    list_display = ['user', 'total_applications', 'updated_at']
+    search_fields = ['user__username']
+    readonly_fields = [
+        'user', 'total_applications', 'status_counts', 'monthly_counts',
+        'daily_counts', 'upcoming_interviews', 'updated_at'
+    ]
+    
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,129 @@
+"""
+Async versions of the read-heavy API endpoints
+
+These are plain Django async views that query through the async ORM, so under
+an ASGI server (see DEPLOYMENT.md) a request waiting on the database does not
+hold a worker. They return the same data as their viewset actions, page
+through the list with page numbers only, and skip the response cache and
+conditional GET layer of the viewsets.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .calendar_feed import COMPACT_FIELDS, CalendarRangeError, calendar_bounds, compact_row
+from .models import JobApplication, Interview
+from .serializers import InterviewSerializer, JobApplicationListSerializer
+from .stats import aget_dashboard_stats
+
+
+def json_response(data, status=200, headers=None):
+    # Same encoding as DRF's JSONRenderer with the default COMPACT_JSON and UNICODE_JSON
+    return JsonResponse(
+        data, status=status, headers=headers, safe=False,
+        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False},
+    )
+
+
+def error_response(exc, request):
+    """Render an authentication error the way DRF's exception handler would"""
+    headers = None
+    status = exc.status_code
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        authenticate_header = request.authenticators[0].authenticate_header(request) if request.authenticators else None
+        if authenticate_header:
+            headers = {'WWW-Authenticate': authenticate_header}
+        else:
+            status = 403
+    return json_response({'detail': exc.detail}, status=status, headers=headers)
+
+
+def async_api_view(view):
+    """Authenticate an async GET view with the API's authentication classes and require a user"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        try:
+            # The authentication classes are sync; with the cached ones this rarely touches the database
+            user = await sync_to_async(lambda: drf_request.user)()
+            if not user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+        except exceptions.APIException as exc:
+            return error_response(exc, drf_request)
+        return await view(drf_request, user, *args, **kwargs)
+    return wrapper
+
+
+@async_api_view
+async def dashboard_stats(request, user):
+    """Get dashboard statistics for the user"""
+    return json_response(await aget_dashboard_stats(user))
+
+
+@async_api_view
+async def job_application_list(request, user):
+    """List the user's job applications, one page at a time"""
+    queryset = JobApplication.objects.filter(user=user)
+    page_size = api_settings.PAGE_SIZE
+    count = await queryset.acount()
+    try:
+        page = int(request.query_params.get('page', 1))
+        if page < 1 or (page - 1) * page_size >= max(count, 1):
+            raise ValueError
+    except ValueError:
+        return json_response({'detail': 'Invalid page.'}, status=404)
+
+    offset = (page - 1) * page_size
+    serializer = JobApplicationListSerializer()
+    results = [serializer.to_representation(application) async for application in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if offset + page_size < count else None
+    previous_url = None
+    if page > 1:
+        previous_url = replace_query_param(url, 'page', page - 1) if page > 2 else remove_query_param(url, 'page')
+    return json_response({'count': count, 'next': next_url, 'previous': previous_url, 'results': results})
+
+
+async def serialize_interviews(queryset):
+    serializer = InterviewSerializer()
+    return [serializer.to_representation(interview) async for interview in queryset]
+
+
+@async_api_view
+async def upcoming_interviews(request, user):
+    """Get upcoming interviews"""
+    queryset = Interview.objects.filter(
+        job_application__user=user,
+        scheduled_date__gte=timezone.now(),
+        status='scheduled'
+    ).order_by('scheduled_date')
+    return json_response(await serialize_interviews(queryset))
+
+
+@async_api_view
+async def interview_calendar(request, user):
+    """Get interviews for calendar view (the iCalendar feed is only served by the sync endpoint)"""
+    try:
+        start, end = calendar_bounds(
+            request.query_params.get('start'), request.query_params.get('end'), request.query_params.get('tz')
+        )
+    except CalendarRangeError as exc:
+        return json_response({'error': str(exc)}, status=400)
+
+    queryset = Interview.objects.filter(job_application__user=user, scheduled_date__gte=start, scheduled_date__lt=end)
+
+    payload = request.query_params.get('type', 'full')
+    if payload == 'compact':
+        return json_response([compact_row(row) async for row in queryset.values(*COMPACT_FIELDS)])
+    if payload != 'full':
+        return json_response({'error': 'type must be one of: full, compact'}, status=400)
+    return json_response(await serialize_interviews(queryset))
@@ -0,0 +1,130 @@
+"""
+Response caching for the read-only API actions
+
+Cache keys combine the user id, a per-user data version, the viewset, the
+action and the request parameters. Every write to a user's applications,
+interviews or notes bumps their version (see jobs.signals), so stale entries
+are simply never looked up again and expire on their own. The versions and
+the hit/miss counters live in the cache too, so with several worker
+processes the cache has to be shared (redis, memcached, database or file
+based): with local memory a worker would keep serving responses that
+another worker's write invalidated.
+"""
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+STATS_KEYS = ('hits', 'misses')
+
+
+def get_api_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def is_shared_cache(alias):
+    """Whether a cache alias is seen by every worker process, rather than private to one"""
+    return settings.CACHES[alias]['BACKEND'] not in settings.PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def user_version_key(user_id):
+    return f'jobs:api:version:{user_id}'
+
+
+def get_user_version(user_id):
+    """Return the user's data version, starting a new one if the cache has none"""
+    api_cache = get_api_cache()
+    key = user_version_key(user_id)
+    version = api_cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never restarts at a value already used
+        api_cache.add(key, time.time_ns(), None)
+        version = api_cache.get(key)
+    return version
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached response of the user"""
+    api_cache = get_api_cache()
+    key = user_version_key(user_id)
+    try:
+        api_cache.incr(key)
+    except ValueError:
+        api_cache.set(key, time.time_ns(), None)
+
+
+def request_fingerprint(view, request, kwargs):
+    """Identify the resource a read request asks for: viewset, action, lookup and query parameters"""
+    params = sorted((name, value) for name, values in request.query_params.lists() for value in values)
+    digest = hashlib.md5(
+        f'{request.get_host()}?{urlencode(params)}'.encode(), usedforsecurity=False
+    ).hexdigest()
+    lookup = kwargs.get(view.lookup_url_kwarg or view.lookup_field, '')
+    return f'{view.basename}:{view.action}:{lookup}:{digest}'
+
+
+def response_cache_key(view, request, kwargs):
+    version = get_user_version(request.user.id)
+    return f'jobs:api:{request.user.id}:{version}:{request_fingerprint(view, request, kwargs)}'
+
+
+def record(outcome):
+    api_cache = get_api_cache()
+    key = f'jobs:api:stats:{outcome}'
+    if not api_cache.add(key, 1, None):
+        try:
+            api_cache.incr(key)
+        except ValueError:
+            api_cache.set(key, 1, None)
+
+
+def get_cache_stats():
+    """Return the hit and miss counters of the response cache"""
+    api_cache = get_api_cache()
+    stats = {outcome: api_cache.get(f'jobs:api:stats:{outcome}', 0) for outcome in STATS_KEYS}
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / total if total else 0.0
+    return stats
+
+
+def reset_cache_stats():
+    get_api_cache().delete_many([f'jobs:api:stats:{outcome}' for outcome in STATS_KEYS])
+
+
+def cache_response(method):
+    """Cache the data of successful responses of a read-only viewset action"""
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if not settings.API_CACHE_ENABLED:
+            return method(self, request, *args, **kwargs)
+
+        api_cache = get_api_cache()
+        key = response_cache_key(self, request, kwargs)
+        data = api_cache.get(key)
+        if data is not None:
+            record('hits')
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = method(self, request, *args, **kwargs)
+        record('misses')
+        if response.status_code == 200 and isinstance(response, Response):
+            api_cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+
+class CachedReadMixin:
+    """Cache the list and retrieve actions of a viewset"""
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
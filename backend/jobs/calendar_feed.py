@@ -0,0 +1,153 @@
+"""
+Date windows and payloads for the interview calendar
+
+The requested days become a half-open [start, end) range of aware datetimes
+in the caller's time zone, so scheduled_date is compared directly and its
+indexes stay usable (a __date lookup casts the column first). Requests
+without a range get the six-week grid a month view shows, and windows are
+capped so one request never returns a user's whole history.
+"""
+import zoneinfo
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+# Days shown without a start/end: the weeks a month view can touch
+DEFAULT_DAYS = 42
+
+MAX_DAYS = 366
+
+COMPACT_FIELDS = [
+    'id', 'job_application_id', 'job_application__company_name', 'job_application__position_title',
+    'interview_type', 'status', 'scheduled_date', 'duration_minutes',
+]
+
+ICS_FIELDS = COMPACT_FIELDS + ['location', 'meeting_link', 'interviewer_name']
+
+
+class CalendarRangeError(ValueError):
+    """Raised for calendar parameters that cannot be turned into a window"""
+
+
+def parse_day(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CalendarRangeError('Invalid date format')
+
+
+def get_calendar_timezone(name):
+    """Return the named time zone, or the current one"""
+    if not name:
+        return timezone.get_current_timezone()
+    try:
+        return zoneinfo.ZoneInfo(name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise CalendarRangeError(f'Unknown time zone "{name}"')
+
+
+def calendar_bounds(start=None, end=None, tz_name=None):
+    """
+    Turn inclusive start/end days (YYYY-MM-DD, either may be missing) into aware
+    datetimes [start, end) at midnight in the requested time zone
+    """
+    tz = get_calendar_timezone(tz_name)
+    first_day = parse_day(start) if start else None
+    last_day = parse_day(end) if end else None
+    try:
+        if first_day:
+            last_day = last_day or first_day + timedelta(days=DEFAULT_DAYS - 1)
+        elif last_day:
+            first_day = last_day - timedelta(days=DEFAULT_DAYS - 1)
+        else:
+            first_day = timezone.localtime(timezone.now(), tz).date().replace(day=1)
+            last_day = first_day + timedelta(days=DEFAULT_DAYS - 1)
+        bounds = (
+            datetime.combine(first_day, time.min, tzinfo=tz),
+            datetime.combine(last_day + timedelta(days=1), time.min, tzinfo=tz),
+        )
+        # The query compares in UTC, which can leave the datetime range at the edges too
+        for bound in bounds:
+            bound.astimezone(dt_timezone.utc)
+    except OverflowError:
+        raise CalendarRangeError('Dates are out of range')
+
+    days = (last_day - first_day).days + 1
+    if days < 1:
+        raise CalendarRangeError('end must not be before start')
+    if days > MAX_DAYS:
+        raise CalendarRangeError(f'The calendar window is limited to {MAX_DAYS} days')
+    return bounds
+
+
+def compact_row(row):
+    """Return what a calendar cell needs from an interview values() row"""
+    start = row['scheduled_date']
+    return {
+        'id': row['id'],
+        'application': row['job_application_id'],
+        'title': f"{row['job_application__company_name']} - {row['job_application__position_title']}",
+        'type': row['interview_type'],
+        'status': row['status'],
+        'start': start.isoformat().replace('+00:00', 'Z'),
+        'end': (start + timedelta(minutes=row['duration_minutes'])).isoformat().replace('+00:00', 'Z'),
+    }
+
+
+def ics_escape(value):
+    return (
+        value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def ics_time(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics_line(line):
+    """Fold a content line to 75 octets as RFC 5545 requires"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def stream_ics(queryset, host):
+    """Yield an iCalendar document with one event per interview"""
+    stamp = ics_time(timezone.now())
+    yield ics_line('BEGIN:VCALENDAR')
+    yield ics_line('VERSION:2.0')
+    yield ics_line('PRODID:-//Job Tracker//Interviews//EN')
+    yield ics_line('CALSCALE:GREGORIAN')
+    for row in queryset.values(*ICS_FIELDS).iterator(chunk_size=500):
+        start = row['scheduled_date']
+        summary = (
+            f"{row['interview_type'].title()} interview: "
+            f"{row['job_application__company_name']} - {row['job_application__position_title']}"
+        )
+        yield ics_line('BEGIN:VEVENT')
+        yield ics_line(f"UID:interview-{row['id']}@{host}")
+        yield ics_line(f'DTSTAMP:{stamp}')
+        yield ics_line(f'DTSTART:{ics_time(start)}')
+        yield ics_line(f"DTEND:{ics_time(start + timedelta(minutes=row['duration_minutes']))}")
+        yield ics_line(f'SUMMARY:{ics_escape(summary)}')
+        if row['status'] == 'cancelled':
+            yield ics_line('STATUS:CANCELLED')
+        if row['location']:
+            yield ics_line(f"LOCATION:{ics_escape(row['location'])}")
+        if row['meeting_link']:
+            yield ics_line(f"URL:{row['meeting_link']}")
+        if row['interviewer_name']:
+            yield ics_line(f"DESCRIPTION:{ics_escape('Interviewer: ' + row['interviewer_name'])}")
+        yield ics_line('END:VEVENT')
+    yield ics_line('END:VCALENDAR')
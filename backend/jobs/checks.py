@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from .caching import is_shared_cache
+
+
+@register(Tags.caches)
+def check_api_cache(app_configs, **kwargs):
+    """The response cache is only safe with a cache every worker process shares"""
+    if settings.API_CACHE_ENABLED and not is_shared_cache(settings.API_CACHE_ALIAS):
+        return [Warning(
+            'API_CACHE_ENABLED is on with a per-process cache backend.',
+            hint=(
+                'With more than one worker process, writes only invalidate the cached responses of the '
+                'worker that handled them. Set CACHE_BACKEND to a shared cache or API_CACHE_ENABLED=False.'
+            ),
+            id='jobs.W001',
+        )]
+    return []
@@ -0,0 +1,109 @@
+"""
+Compression of API responses
+
+CompressionMiddleware gzips (or, when the brotli package is installed and
+the client prefers it, brotli-compresses) JSON responses under /api/.
+Responses below API_COMPRESSION_MIN_SIZE bytes are left alone, as are
+streaming responses (the export and the iCalendar feed are written as they
+are read), responses that already have a Content-Encoding and every other
+content type: the browsable API's HTML carries a CSRF token next to
+reflected request input, which is what a BREACH attack needs. gzip output
+also gets the random-length header padding of Django's GZipMiddleware.
+Strong ETags are made weak, as GZipMiddleware does, and conditional
+requests still match them.
+"""
+import gzip
+import secrets
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def parse_accept_encoding(header):
+    """Return {coding: q} for an Accept-Encoding header"""
+    accepted = {}
+    for part in header.split(','):
+        coding, *params = [piece.strip() for piece in part.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """Return the best supported coding the client accepts, or None; brotli wins ties"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for coding in ('br', 'gzip') if brotli is not None else ('gzip',):
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def gzip_compress(content, max_random_bytes=GZipMiddleware.max_random_bytes):
+    """
+    gzip at API_COMPRESSION_GZIP_LEVEL, padded like django.utils.text.compress_string()
+    (which always compresses at level 6): a file name of random length in the header
+    keeps the response length from tracking the content exactly
+    """
+    compressed = gzip.compress(content, compresslevel=settings.API_COMPRESSION_GZIP_LEVEL, mtime=0)
+    header = bytearray(compressed[:10])
+    header[3] = gzip.FNAME
+    return bytes(header) + b'a' * secrets.randbelow(max_random_bytes) + b'\x00' + compressed[10:]
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.API_COMPRESSION_BROTLI_QUALITY)
+    return gzip_compress(content)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress API responses for clients that accept gzip or brotli"""
+    path_prefix = '/api/'
+    compressible_types = ('application/json', 'application/x-ndjson')
+
+    def process_response(self, request, response):
+        if (
+            not settings.API_COMPRESSION_ENABLED
+            or not request.path.startswith(self.path_prefix)
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith(self.compressible_types)
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < settings.API_COMPRESSION_MIN_SIZE:
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,89 @@
+"""
+Conditional GET for the read-only API actions
+
+Validators come from the database, so every worker process agrees on them:
+one aggregate query reads the number of the user's applications and the
+newest last_activity_at, which moves on every write to an application or to
+one of its interviews or notes (see jobs.counters); deleting an application
+changes the count. The ETag hashes that state together with the user fields
+nested in the responses and the resource being requested. A request whose
+If-None-Match still matches gets a 304 before the page query or any
+serialization runs. There is no Last-Modified: a delete leaves the newest
+last_activity_at where it was, so a date alone cannot tell that a list
+shrank or that a resource is gone.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .caching import request_fingerprint
+from .models import JobApplication
+from .serializers import UserSerializer
+
+
+def get_user_state(user_id):
+    """Return (application count, newest last_activity_at or None) for a user"""
+    state = JobApplication.objects.filter(user_id=user_id).aggregate(
+        count=Count('pk'), modified=Max('last_activity_at')
+    )
+    return state['count'], state['modified']
+
+
+def get_etag(view, request, kwargs, state):
+    count, modified = state
+    accept = request.META.get('HTTP_ACCEPT', '')
+    # Applications nest their user, whose edits touch no application row
+    user = ':'.join(str(getattr(request.user, field)) for field in UserSerializer.Meta.fields)
+    digest = hashlib.md5(
+        f'{user}:{count}:{modified.isoformat() if modified else ""}:{accept}:'
+        f'{request_fingerprint(view, request, kwargs)}'.encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is None:
+        return False
+    # Compare weakly
+    opaque = etag.removeprefix('W/')
+    return any(tag == '*' or tag.removeprefix('W/') == opaque for tag in parse_etags(if_none_match))
+
+
+def set_validators(response, etag):
+    response['ETag'] = etag
+    # Let clients keep the response but revalidate it on every use
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def conditional_response(method):
+    """Answer GETs whose ETag still matches with 304 Not Modified"""
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        etag = get_etag(self, request, kwargs, get_user_state(request.user.id))
+        if is_not_modified(request, etag):
+            return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag)
+        return response
+    return wrapper
+
+
+class ConditionalGetMixin:
+    """Conditional GET for the list and retrieve actions of a viewset"""
+
+    @conditional_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
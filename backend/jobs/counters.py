@@ -0,0 +1,98 @@
+"""
+Per-application interview and note counters
+
+JobApplication carries interview_count, note_count, next_interview_at (the
+earliest interview still in the scheduled state, overdue ones included) and
+last_activity_at (the last write to the application or to one of its
+interviews or notes), so the list needs no joins or GROUP BY. The signal
+handlers in jobs.signals apply each interview and note change with a single
+UPDATE of the application row: the counts with F() expressions, so that
+concurrent writes never lose an increment, and next_interview_at with a
+subquery over the application's interviews. Bulk inserts call
+rebuild_application_counters() for the rows they touched, which recomputes
+the columns in batches; check_application_counters() reports drift.
+"""
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import JobApplication, Interview, Note
+
+
+def next_interview_subquery():
+    return Subquery(
+        Interview.objects.filter(job_application=OuterRef('pk'), status='scheduled')
+        .order_by('scheduled_date').values('scheduled_date')[:1]
+    )
+
+
+def child_aggregate(model, aggregate):
+    return Subquery(
+        model.objects.filter(job_application=OuterRef('pk')).order_by()
+        .values('job_application').annotate(value=aggregate).values('value')
+    )
+
+
+def adjust_counters(application_id, interviews=0, notes=0, next_interview=False):
+    """Apply a change to an application's interviews or notes in one UPDATE"""
+    changes = {'last_activity_at': timezone.now()}
+    if interviews:
+        changes['interview_count'] = F('interview_count') + interviews
+    if notes:
+        changes['note_count'] = F('note_count') + notes
+    if next_interview:
+        changes['next_interview_at'] = next_interview_subquery()
+    JobApplication.objects.filter(pk=application_id).update(**changes)
+
+
+def computed_counters():
+    """Expressions recomputing every counter column from the interview and note tables"""
+    return {
+        'interview_count': Coalesce(child_aggregate(Interview, Count('pk')), 0),
+        'note_count': Coalesce(child_aggregate(Note, Count('pk')), 0),
+        'next_interview_at': next_interview_subquery(),
+        # Deleted interviews and notes leave no trace, so this can only see the remaining rows
+        'last_activity_at': Greatest(
+            'updated_at',
+            Coalesce(child_aggregate(Interview, Max('updated_at')), 'updated_at'),
+            Coalesce(child_aggregate(Note, Max('updated_at')), 'updated_at'),
+        ),
+    }
+
+
+def select_applications(user_ids=None, application_ids=None):
+    applications = JobApplication.objects.order_by('pk')
+    if user_ids is not None:
+        applications = applications.filter(user_id__in=user_ids)
+    if application_ids is not None:
+        applications = applications.filter(pk__in=application_ids)
+    return applications
+
+
+def rebuild_application_counters(user_ids=None, application_ids=None, batch_size=1000):
+    """Recompute the counters of the given applications (default: all), batch_size rows per UPDATE"""
+    ids = list(select_applications(user_ids, application_ids).values_list('pk', flat=True))
+    for start in range(0, len(ids), batch_size):
+        JobApplication.objects.filter(pk__in=ids[start:start + batch_size]).update(**computed_counters())
+    return len(ids)
+
+
+def check_application_counters(user_ids=None, application_ids=None):
+    """
+    Compare stored counters with a fresh recomputation
+    Returns a list of (application_id, field, stored, expected) for every mismatch;
+    last_activity_at only counts when it is older than the newest remaining row
+    """
+    fields = [*JobApplication.COUNTER_FIELDS, 'last_activity_at']
+    applications = select_applications(user_ids, application_ids).annotate(
+        **{f'expected_{name}': expression for name, expression in computed_counters().items()}
+    )
+    mismatches = []
+    for row in applications.values('pk', *fields, *(f'expected_{name}' for name in fields)):
+        for field in fields:
+            stored, expected = row[field], row[f'expected_{field}']
+            if field == 'last_activity_at' and stored >= expected:
+                continue
+            if stored != expected:
+                mismatches.append((row['pk'], field, stored, expected))
+    return mismatches
@@ -0,0 +1,77 @@
+"""
+Streaming export of a user's job applications
+
+Rows are read as values() with QuerySet.iterator(), which uses a server-side
+cursor on PostgreSQL, turned into the detail representation by a RowBuilder
+(rows.py) that loads interviews and notes one chunk at a time, and written
+out as they are read. Memory use does not grow with the history size and the
+first bytes go out before the query has finished.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .rows import get_row_builder
+from .serializers import JobApplicationSerializer
+
+CHUNK_SIZE = 500
+
+CSV_FIELDS = [
+    'id', 'company_name', 'position_title', 'job_description', 'application_date', 'status',
+    'contact_person', 'contact_email', 'contact_phone', 'salary_min', 'salary_max', 'salary_range',
+    'location', 'job_url', 'source', 'general_notes', 'created_at', 'updated_at',
+]
+
+
+class Echo:
+    """File-like object whose write() returns the value instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def iter_applications(queryset, context):
+    """Yield each application as the dict the detail endpoint would return"""
+    serializer = JobApplicationSerializer(context=context)
+    builder = get_row_builder(serializer, queryset)
+    if builder is not None:
+        yield from builder.iterate(queryset, CHUNK_SIZE)
+        return
+    for application in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield serializer.to_representation(application)
+
+
+def flatten_interviews(interviews):
+    return '; '.join(
+        f"{interview['scheduled_date']} {interview['interview_type']} ({interview['status']})"
+        for interview in interviews
+    )
+
+
+def flatten_notes(notes):
+    return '; '.join(f"{note['title']}: {note['content']}" for note in notes)
+
+
+def stream_csv(queryset, context):
+    """Yield CSV lines, one per application, with interviews and notes flattened into two columns"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_FIELDS + ['interviews', 'notes'])
+    for row in iter_applications(queryset, context):
+        yield writer.writerow(
+            [row[field] for field in CSV_FIELDS]
+            + [flatten_interviews(row['interviews']), flatten_notes(row['notes'])]
+        )
+
+
+def stream_ndjson(queryset, context):
+    """Yield one JSON document per line, with interviews and notes nested"""
+    for row in iter_applications(queryset, context):
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+# Export type -> (content type, file extension, stream function)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv', stream_csv),
+    'ndjson': ('application/x-ndjson', 'ndjson', stream_ndjson),
+}
@@ -0,0 +1,121 @@
+"""
+Sparse fieldsets and field expansion for read endpoints
+
+?fields=id,company_name limits a response to the named top-level fields and
+?expand=job_application adds fields a serializer only includes on request
+(Meta.expandable_fields), or nested fields left out by ?fields=. The viewset
+side loads only the columns and relations the chosen fields read: .only()
+on the main query, and select_related/prefetch_related just for nested
+fields that are shown.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import permissions, serializers
+
+
+def parse_names(value):
+    return [name for name in (part.strip() for part in (value or '').split(',')) if name]
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Accept fields= (the set of field names to show) when constructed
+    Meta.expandable_fields maps names of opt-in fields to functions returning the field
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            expandable = self.get_expandable_fields()
+            for name in fields:
+                if name in expandable and name not in self.fields:
+                    self.fields[name] = expandable[name]()
+            for name in list(self.fields):
+                if name not in fields:
+                    self.fields.pop(name)
+
+    @classmethod
+    def get_expandable_fields(cls):
+        return getattr(cls.Meta, 'expandable_fields', {})
+
+    @classmethod
+    def select_fields(cls, query_params):
+        """Return the field names a request selects, or None for the default fields"""
+        fields = parse_names(query_params.get('fields'))
+        expand = parse_names(query_params.get('expand'))
+        if not fields and not expand:
+            return None
+        default = list(cls.Meta.fields)
+        allowed = set(default) | set(cls.get_expandable_fields())
+        errors = {}
+        for param, names in (('fields', fields), ('expand', expand)):
+            unknown = [name for name in names if name not in allowed]
+            if unknown:
+                errors[param] = [f'Unknown field: {name}' for name in unknown]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return set(fields or default) | set(expand)
+
+
+def only_columns(model, serializer, names, ordering=None):
+    """Return the model fields that serializing the named fields reads, for QuerySet.only()"""
+    extra_sources = getattr(serializer.Meta, 'field_sources', {})
+    # Cursor pagination reads the ordering columns from the last row of a page
+    columns = {model._meta.pk.name} | {name.lstrip('-') for name in ordering or model._meta.ordering}
+    for name in names:
+        field = serializer.fields.get(name)
+        if name in extra_sources:
+            columns.update(extra_sources[name])
+            continue
+        source = field.source if field is not None else name
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            continue
+        if model_field.concrete and not model_field.many_to_many:
+            columns.add(model_field.name)
+    return sorted(columns)
+
+
+class SparseFieldsetMixin:
+    """
+    Apply ?fields= and ?expand= to the serializer of the actions in sparse_fieldset_actions
+    get_queryset() implementations call sparse_queryset() and wants_field() so that
+    queries only load what will be shown
+    """
+    sparse_fieldset_actions = ['list', 'retrieve']
+
+    def get_sparse_fieldset(self):
+        """Return the selected field names, or None to show the serializer's default fields"""
+        if not hasattr(self, '_sparse_fieldset'):
+            self._sparse_fieldset = None
+            serializer_class = self.get_serializer_class()
+            if (
+                self.request.method in permissions.SAFE_METHODS
+                and self.action in self.sparse_fieldset_actions
+                and issubclass(serializer_class, SparseFieldsetSerializerMixin)
+            ):
+                self._sparse_fieldset = serializer_class.select_fields(self.request.query_params)
+        return self._sparse_fieldset
+
+    def wants_field(self, name):
+        """Whether the response shows a field that needs extra queries or joins"""
+        selected = self.get_sparse_fieldset()
+        if selected is None:
+            serializer_class = self.get_serializer_class()
+            return name in getattr(serializer_class.Meta, 'fields', ())
+        return name in selected
+
+    def sparse_queryset(self, queryset):
+        """Defer the columns none of the selected fields read"""
+        selected = self.get_sparse_fieldset()
+        if selected is None:
+            return queryset
+        serializer = self.get_serializer_class()(fields=selected)
+        ordering = getattr(self, 'keyset_ordering', None)
+        return queryset.only(*only_columns(queryset.model, serializer, selected, ordering))
+
+    def get_serializer(self, *args, **kwargs):
+        selected = self.get_sparse_fieldset()
+        if selected is not None:
+            kwargs.setdefault('fields', selected)
+        return super().get_serializer(*args, **kwargs)
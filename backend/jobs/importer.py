@@ -0,0 +1,225 @@
+"""
+Streaming import of job applications from CSV or JSON
+
+The pipeline is a chain of generators: parse rows from the file, group them
+into chunks, then validate, deduplicate and bulk insert one chunk at a time.
+Only a single chunk is held in memory, so file size does not matter.
+Duplicates are rows whose (company_name, position_title, application_date)
+already exists for the user, found with one indexed query per chunk.
+"""
+import csv
+import io
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .models import JobApplication
+from .search import get_search_backend
+from .serializers import JobApplicationSerializer
+from .signals import bulk_changed
+
+CHUNK_SIZE = 1000
+
+# Number of row errors kept in the result
+MAX_ERRORS = 100
+
+READ_SIZE = 64 * 1024
+
+
+class ImportFileError(Exception):
+    """Raised when an import file cannot be parsed"""
+
+
+class ImportResult:
+    """Counters for one import run"""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add_error(self, line, detail):
+        self.invalid += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({'row': line, 'errors': detail})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'duplicates': self.duplicates,
+            'invalid': self.invalid,
+            'errors': self.errors,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+def parse_csv(fileobj):
+    """Yield rows of a CSV file with a header line"""
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(fileobj)
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise ImportFileError(f'Invalid CSV: {exc}')
+
+
+def parse_json(fileobj):
+    """Yield the items of a JSON array, or of newline-delimited JSON, without loading the whole file"""
+    decoder = json.JSONDecoder()
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig')
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+    in_array = False
+    closed = False
+    while True:
+        if closed:
+            # Like json.loads(), only whitespace may follow the array
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                raise ImportFileError(f'Invalid JSON: extra data after the array: {buffer[position:position + 20]!r}')
+            if eof:
+                return
+        else:
+            while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ','):
+                position += 1
+        if position < len(buffer):
+            if not started:
+                started = True
+                if buffer[position] == '[':
+                    in_array = True
+                    position += 1
+                    continue
+            if in_array and buffer[position] == ']':
+                in_array = False
+                closed = True
+                position += 1
+                continue
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as exc:
+                # The item may just be cut off at the end of the buffer
+                if eof:
+                    raise ImportFileError(f'Invalid JSON: {exc}')
+            else:
+                yield value
+                continue
+        elif eof:
+            if in_array:
+                raise ImportFileError('Invalid JSON: unterminated array')
+            return
+        try:
+            chunk = fileobj.read(READ_SIZE)
+        except UnicodeDecodeError as exc:
+            raise ImportFileError(f'Invalid JSON: {exc}')
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'json': parse_json,
+}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ApplicationImporter:
+    """Import rows into one user's job applications"""
+
+    def __init__(self, user, chunk_size=CHUNK_SIZE):
+        self.user = user
+        self.chunk_size = chunk_size
+        # One serializer validates every row; building one per row would copy its fields each time
+        self.serializer = JobApplicationSerializer()
+        self.fields = {name for name, field in self.serializer.fields.items() if not field.read_only}
+
+    def run(self, rows):
+        """Import an iterable of row dicts and return an ImportResult"""
+        result = ImportResult()
+        start = time.perf_counter()
+        with transaction.atomic():
+            line = 0
+            for chunk in chunked(rows, self.chunk_size):
+                valid = []
+                for row in chunk:
+                    line += 1
+                    result.rows += 1
+                    attrs = self.validate(row, line, result)
+                    if attrs is not None:
+                        valid.append(attrs)
+                self.insert(self.deduplicate(valid, result), result)
+            # The search index is refreshed per chunk; stats and cache version once at the end
+            bulk_changed.send(sender=JobApplication, user_id=self.user.id, application_ids=[])
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def validate(self, row, line, result):
+        """Return validated attributes for a row, or None after recording its errors"""
+        if not isinstance(row, dict):
+            result.add_error(line, {'non_field_errors': ['Expected an object.']})
+            return None
+        # Blank cells mean "not given" so field defaults apply
+        data = {name: value for name, value in row.items() if name in self.fields and value not in ('', None)}
+        try:
+            return self.serializer.run_validation(data)
+        except serializers.ValidationError as exc:
+            result.add_error(line, exc.detail)
+            return None
+
+    def deduplicate(self, chunk, result):
+        """Drop rows that exist already, or earlier in the chunk, using one query"""
+        if not chunk:
+            return []
+        existing = set(
+            JobApplication.objects.filter(
+                user=self.user,
+                company_name__in={attrs['company_name'] for attrs in chunk},
+                application_date__in={attrs['application_date'] for attrs in chunk},
+            ).values_list('company_name', 'position_title', 'application_date')
+        )
+        unique = []
+        for attrs in chunk:
+            key = (attrs['company_name'], attrs['position_title'], attrs['application_date'])
+            if key in existing:
+                result.duplicates += 1
+                continue
+            existing.add(key)
+            unique.append(attrs)
+        return unique
+
+    def insert(self, chunk, result):
+        if not chunk:
+            return
+        applications = JobApplication.objects.bulk_create(
+            [JobApplication(user=self.user, **attrs) for attrs in chunk], batch_size=self.chunk_size
+        )
+        get_search_backend().index([application.id for application in applications])
+        result.created += len(applications)
+
+
+def import_applications(user, fileobj, file_type, chunk_size=CHUNK_SIZE):
+    """Import a CSV or JSON file into the user's job applications"""
+    if file_type not in PARSERS:
+        raise ImportFileError(f'Unsupported file type "{file_type}", expected one of: {", ".join(PARSERS)}')
+    return ApplicationImporter(user, chunk_size).run(PARSERS[file_type](fileobj))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.caching import get_cache_stats, is_shared_cache, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the hit/miss counters of the API response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        if not is_shared_cache(settings.API_CACHE_ALIAS):
+            self.stdout.write(self.style.WARNING(
+                'The API cache is private to each process, so this command only sees its own (empty) '
+                'counters; point CACHE_BACKEND at a shared cache to read those of the web workers'
+            ))
+        stats = get_cache_stats()
+        self.stdout.write(
+            f"hits: {stats['hits']}  misses: {stats['misses']}  hit rate: {stats['hit_rate']:.1%}"
+        )
+        if options['reset']:
+            reset_cache_stats()
@@ -0,0 +1,292 @@
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from jobs.counters import rebuild_application_counters
+from jobs.models import JobApplication, Interview, Note
+from jobs.synthetic import seed_applications
+from jobs.urls import router
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a user with 1k/10k/100k applications and drive every router endpoint through the test client, '
+        'recording p50/p95/p99 latency, queries per request and response bytes as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Applications per user, one run each')
+        parser.add_argument('--requests', type=int, default=20, help='Timed requests per endpoint')
+        parser.add_argument('--heavy-requests', type=int, default=3,
+                            help='Timed requests for endpoints that read every row (export)')
+        parser.add_argument('--only', nargs='+', default=None, help='Run only scenarios whose name contains one of these')
+        parser.add_argument('--with-cache', action='store_true', help='Leave the API response cache on')
+        parser.add_argument('--accept-encoding', default='', help='Accept-Encoding sent with every request')
+        parser.add_argument('--output', default='api-benchmark.json', help='File the JSON results are written to')
+        parser.add_argument('--baseline', help='Earlier results file to print p50 changes against')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = {
+                    (result['rows'], result['scenario']): result for result in json.load(baseline_file)['results']
+                }
+
+        results = []
+        test_settings = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], API_CACHE_ENABLED=options['with_cache'],
+        )
+        test_settings.enable()
+        try:
+            for rows in options['sizes']:
+                try:
+                    with transaction.atomic():
+                        results.extend(self.run_size(rows, options))
+                        raise Rollback
+                except Rollback:
+                    pass
+        finally:
+            test_settings.disable()
+
+        report = {'meta': self.get_meta(options), 'results': results}
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(f'\nWrote {len(results)} results to {options["output"]}')
+        if baseline:
+            self.compare(results, baseline)
+
+    def get_meta(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'requests': options['requests'],
+            'heavy_requests': options['heavy_requests'],
+            'response_cache': options['with_cache'],
+            'accept_encoding': options['accept_encoding'],
+        }
+
+    def run_size(self, rows, options):
+        start = time.perf_counter()
+        user = User.objects.create(username=f'api-benchmark-{rows}')
+        applications, interviews, notes = seed_applications(user, rows, seed=rows)
+        self.stdout.write(
+            f'\n{applications} applications, {interviews} interviews, {notes} notes '
+            f'seeded in {time.perf_counter() - start:.1f}s'
+        )
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}',
+            HTTP_ACCEPT_ENCODING=options['accept_encoding'],
+        )
+        scenarios = self.get_scenarios(user, rows, options)
+        self.check_coverage(scenarios)
+
+        results = []
+        self.stdout.write(f'{"scenario":42} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"queries":>8} {"bytes":>10}')
+        for name, url_name, method, count, make_request in scenarios:
+            if options['only'] and not any(part in name for part in options['only']):
+                continue
+            # One untimed request warms up caches and lazy imports
+            self.request(client, method, *make_request(-1))
+            timings, queries, sizes = [], [], []
+            for index in range(count):
+                elapsed, query_count, size = self.request(client, method, *make_request(index))
+                timings.append(elapsed * 1000)
+                queries.append(query_count)
+                sizes.append(size)
+            timings.sort()
+            result = {
+                'rows': rows, 'scenario': name, 'route': url_name, 'method': method, 'requests': count,
+                'p50_ms': round(percentile(timings, 50), 3),
+                'p95_ms': round(percentile(timings, 95), 3),
+                'p99_ms': round(percentile(timings, 99), 3),
+                'mean_ms': round(statistics.fmean(timings), 3),
+                'queries': round(statistics.fmean(queries), 2),
+                'max_queries': max(queries),
+                'bytes': round(statistics.fmean(sizes)),
+            }
+            results.append(result)
+            self.stdout.write(
+                f'{name:42} {result["p50_ms"]:9.2f} {result["p95_ms"]:9.2f} {result["p99_ms"]:9.2f} '
+                f'{result["queries"]:8.1f} {result["bytes"]:10d}'
+            )
+        return results
+
+    def request(self, client, method, path, kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(client, method.lower())(path, **kwargs)
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+            elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise CommandError(f'{method} {path} returned {response.status_code}: {content[:200]!r}')
+        return elapsed, len(queries), len(content)
+
+    def check_coverage(self, scenarios):
+        """Warn about router routes and methods that no scenario drives"""
+        covered = {(url_name, method.lower()) for _, url_name, method, _, _ in scenarios}
+        routes = {
+            (url.name, method)
+            for url in router.urls
+            for method in getattr(url.callback, 'actions', None) or {}
+            if method not in ('head', 'options')
+        }
+        for url_name, method in sorted(routes - covered):
+            self.stderr.write(f'No benchmark scenario for {method.upper()} {url_name}')
+
+    def get_scenarios(self, user, rows, options):
+        """Return (name, route name, method, request count, index -> (path, client kwargs)) tuples"""
+        requests = options['requests']
+        heavy = options['heavy_requests']
+        victims = requests + 1
+        application_ids = list(user.job_applications.values_list('id', flat=True)[:100])
+        application_id = application_ids[0]
+        interview_id = Interview.objects.filter(job_application__user=user).values_list('id', flat=True)[0]
+        note_id = Note.objects.filter(job_application__user=user).values_list('id', flat=True)[0]
+
+        # Rows for the DELETE scenarios, one (or ten, for bulk delete) per request; the interviews
+        # and notes hang off applications of their own so the application deletes leave them alone
+        doomed = JobApplication.objects.bulk_create([
+            JobApplication(user=user, company_name='Doomed', position_title='Engineer', application_date=date.today())
+            for _ in range(victims * 12)
+        ])
+        doomed_ids = [application.id for application in doomed]
+        doomed_interviews = Interview.objects.bulk_create([
+            Interview(job_application=application, interview_type='phone', scheduled_date=timezone.now())
+            for application in doomed[victims * 11:]
+        ])
+        doomed_notes = Note.objects.bulk_create([
+            Note(job_application=application, title='Doomed', content='Doomed') for application in doomed[victims * 11:]
+        ])
+        rebuild_application_counters(application_ids=doomed_ids)
+
+        def url(name, **kwargs):
+            return reverse(name, kwargs=kwargs)
+
+        def get(path, params=None):
+            return lambda index: (path, {'data': params} if params else {})
+
+        def body(path, make_data):
+            return lambda index: (path, {'data': make_data(index), 'format': 'json'})
+
+        application = {'company_name': 'Benchmark Corp', 'position_title': 'Engineer', 'application_date': '2024-01-15'}
+        interview = {
+            'job_application': application_id, 'interview_type': 'video',
+            'scheduled_date': (timezone.now() + timedelta(days=3)).isoformat(),
+        }
+        note = {'job_application': application_id, 'title': 'Benchmark', 'content': 'Benchmark note'}
+        pages = max(1, rows // settings.REST_FRAMEWORK['PAGE_SIZE'])
+
+        def import_file(index):
+            lines = ['company_name,position_title,application_date'] + [
+                f'Imported {index} {line},Engineer,2024-02-{line % 28 + 1:02d}' for line in range(50)
+            ]
+            upload = SimpleUploadedFile('applications.csv', '\n'.join(lines).encode(), content_type='text/csv')
+            return url('jobapplication-import-file'), {'data': {'file': upload}, 'format': 'multipart'}
+
+        return [
+            ('applications list', 'jobapplication-list', 'GET', requests, get(url('jobapplication-list'))),
+            ('applications list, middle page', 'jobapplication-list', 'GET', requests,
+             get(url('jobapplication-list'), {'page': pages // 2 or 1})),
+            ('applications list, cursor', 'jobapplication-list', 'GET', requests,
+             get(url('jobapplication-list'), {'pagination': 'cursor'})),
+            ('applications list, sparse fields', 'jobapplication-list', 'GET', requests,
+             get(url('jobapplication-list'), {'fields': 'id,company_name,status'})),
+            ('applications create', 'jobapplication-list', 'POST', requests,
+             body(url('jobapplication-list'), lambda index: application)),
+            ('application detail', 'jobapplication-detail', 'GET', requests,
+             get(url('jobapplication-detail', pk=application_id))),
+            ('application update', 'jobapplication-detail', 'PUT', requests,
+             body(url('jobapplication-detail', pk=application_id), lambda index: application)),
+            ('application partial update', 'jobapplication-detail', 'PATCH', requests,
+             body(url('jobapplication-detail', pk=application_id), lambda index: {'status': 'interview'})),
+            ('application delete', 'jobapplication-detail', 'DELETE', requests,
+             lambda index: (url('jobapplication-detail', pk=doomed_ids[index + 1]), {})),
+            ('dashboard stats', 'jobapplication-dashboard-stats', 'GET', requests,
+             get(url('jobapplication-dashboard-stats'))),
+            ('search', 'jobapplication-search', 'GET', requests, get(url('jobapplication-search'), {'q': 'python'})),
+            ('bulk retrieve 100', 'jobapplication-bulk', 'GET', requests,
+             get(url('jobapplication-bulk'), {'ids': ','.join(map(str, application_ids))})),
+            ('bulk create 100', 'jobapplication-bulk', 'POST', requests,
+             body(url('jobapplication-bulk'), lambda index: [application] * 100)),
+            ('bulk update 100', 'jobapplication-bulk', 'PATCH', requests,
+             body(url('jobapplication-bulk'), lambda index: [{'id': pk, 'location': 'Remote'} for pk in application_ids])),
+            ('bulk delete 10', 'jobapplication-bulk', 'DELETE', requests,
+             body(url('jobapplication-bulk'), lambda index: {
+                 'ids': doomed_ids[victims + (index + 1) * 10:victims + (index + 2) * 10],
+             })),
+            ('export csv', 'jobapplication-export', 'GET', heavy, get(url('jobapplication-export'))),
+            ('export ndjson', 'jobapplication-export', 'GET', heavy, get(url('jobapplication-export'), {'type': 'ndjson'})),
+            ('import 50 rows', 'jobapplication-import-file', 'POST', requests, import_file),
+            ('interviews list', 'interview-list', 'GET', requests, get(url('interview-list'))),
+            ('interviews create', 'interview-list', 'POST', requests, body(url('interview-list'), lambda index: interview)),
+            ('interview detail', 'interview-detail', 'GET', requests, get(url('interview-detail', pk=interview_id))),
+            ('interview update', 'interview-detail', 'PUT', requests,
+             body(url('interview-detail', pk=interview_id), lambda index: interview)),
+            ('interview partial update', 'interview-detail', 'PATCH', requests,
+             body(url('interview-detail', pk=interview_id), lambda index: {'status': 'completed'})),
+            ('interview delete', 'interview-detail', 'DELETE', requests,
+             lambda index: (url('interview-detail', pk=doomed_interviews[index + 1].id), {})),
+            ('interviews upcoming', 'interview-upcoming', 'GET', requests, get(url('interview-upcoming'))),
+            ('interviews calendar', 'interview-calendar', 'GET', requests, get(url('interview-calendar'))),
+            ('interviews calendar ics', 'interview-calendar', 'GET', requests,
+             get(url('interview-calendar'), {'type': 'ics'})),
+            ('notes list', 'note-list', 'GET', requests, get(url('note-list'))),
+            ('notes create', 'note-list', 'POST', requests, body(url('note-list'), lambda index: note)),
+            ('note detail', 'note-detail', 'GET', requests, get(url('note-detail', pk=note_id))),
+            ('note update', 'note-detail', 'PUT', requests, body(url('note-detail', pk=note_id), lambda index: note)),
+            ('note partial update', 'note-detail', 'PATCH', requests,
+             body(url('note-detail', pk=note_id), lambda index: {'title': 'Updated'})),
+            ('note delete', 'note-detail', 'DELETE', requests,
+             lambda index: (url('note-detail', pk=doomed_notes[index + 1].id), {})),
+        ]
+
+    def compare(self, results, baseline):
+        self.stdout.write(f'\n{"scenario":42} {"rows":>7} {"p50 before":>11} {"p50 now":>9} {"change":>8}')
+        for result in results:
+            before = baseline.get((result['rows'], result['scenario']))
+            if before is None:
+                continue
+            change = result['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0
+            self.stdout.write(
+                f'{result["scenario"]:42} {result["rows"]:7d} {before["p50_ms"]:11.2f} '
+                f'{result["p50_ms"]:9.2f} {change:+8.1%}'
+            )
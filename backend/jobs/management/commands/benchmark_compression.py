@@ -0,0 +1,107 @@
+import gzip
+import random
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs.compression import brotli
+from jobs.counters import rebuild_application_counters
+from jobs.models import JobApplication, Interview, Note
+
+WORDS = ['python', 'django', 'react', 'platform', 'remote', 'senior', 'payments', 'postgres', 'cloud', 'team']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure bytes saved and CPU time of gzip/brotli levels on representative API payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200, help='Applications to seed')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = self.seed(options['rows'])
+                payloads = self.fetch_payloads(user)
+                self.report(payloads, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rows):
+        user = User.objects.create(username='compression-benchmark')
+        rng = random.Random(rows)
+        applications = JobApplication.objects.bulk_create([
+            JobApplication(
+                user=user, company_name=f'Company {index}', position_title=' '.join(rng.sample(WORDS, 2)).title(),
+                application_date=date.today() - timedelta(days=rng.randrange(365)),
+                job_description=' '.join(rng.choices(WORDS, k=80)), location=rng.choice(['Remote', 'Berlin']),
+                salary_min=rng.choice([None, 90000]), salary_max=rng.choice([None, 130000]),
+            )
+            for index in range(rows)
+        ])
+        Interview.objects.bulk_create([
+            Interview(job_application=application, interview_type='video', scheduled_date=timezone.now())
+            for application in applications[::2]
+        ])
+        Note.objects.bulk_create([
+            Note(job_application=application, title='Follow up', content=' '.join(rng.choices(WORDS, k=30)))
+            for application in applications[::2]
+        ])
+        rebuild_application_counters(user_ids=[user.id])
+        return user
+
+    def fetch_payloads(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        ids = ','.join(str(pk) for pk in user.job_applications.values_list('id', flat=True)[:100])
+        detail_id = user.job_applications.filter(notes__isnull=False).values_list('id', flat=True)[0]
+        paths = [
+            ('dashboard_stats', '/api/job-applications/dashboard_stats/'),
+            ('detail', f'/api/job-applications/{detail_id}/'),
+            ('list page', '/api/job-applications/'),
+            ('bulk of 100', f'/api/job-applications/bulk/?ids={ids}'),
+        ]
+        payloads = []
+        # The test client sends Host: testserver and no Accept-Encoding, so responses come back uncompressed
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, path in paths:
+                response = client.get(path)
+                assert response.status_code == 200, (path, response.status_code)
+                payloads.append((name, response.content))
+        return payloads
+
+    def report(self, payloads, repeat):
+        codecs = [(f'gzip -{level}', lambda content, level=level: gzip.compress(content, level, mtime=0))
+                  for level in (1, 6, 9)]
+        if brotli is not None:
+            codecs += [(f'br q{quality}', lambda content, quality=quality: brotli.compress(content, quality=quality))
+                       for quality in (1, 5, 11)]
+        else:
+            self.stdout.write('brotli is not installed; gzip only')
+        self.stdout.write(f'{"payload":18} {"codec":8} {"bytes":>9} {"saved":>7} {"ms":>8} {"MB/s":>8}')
+        for name, content in payloads:
+            self.stdout.write(f'{name:18} {"none":8} {len(content):9d}')
+            for codec, compress in codecs:
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    compressed = compress(content)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                saved = 1 - len(compressed) / len(content)
+                self.stdout.write(
+                    f'{"":18} {codec:8} {len(compressed):9d} {saved:7.1%} {best * 1000:8.3f} '
+                    f'{len(content) / best / 1e6:8.1f}'
+                )
@@ -0,0 +1,64 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+
+class Command(BaseCommand):
+    help = 'Compare the latency of a query on a fresh connection with one on a reused connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--conn-max-age', type=int, help='Override CONN_MAX_AGE for the run')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        settings = connection.settings_dict
+        if options['conn_max_age'] is not None:
+            settings['CONN_MAX_AGE'] = options['conn_max_age']
+        self.stdout.write(
+            f'{connection.vendor} {settings["HOST"] or settings["NAME"]}: CONN_MAX_AGE={settings["CONN_MAX_AGE"]} '
+            f'CONN_HEALTH_CHECKS={settings["CONN_HEALTH_CHECKS"]} pool={bool(settings["OPTIONS"].get("pool"))}'
+        )
+
+        def cold():
+            # What every request did with CONN_MAX_AGE=0 (with a pool: a checkout instead of a connect)
+            connection.close()
+            self.query(connection)
+
+        def reused():
+            # What the request_started/request_finished handlers do around each request
+            close_old_connections()
+            self.query(connection)
+            close_old_connections()
+
+        # close_old_connections() closes every connection opened with CONN_MAX_AGE=0, so the
+        # reused phase needs a positive age to measure reuse at all
+        configured_max_age = settings['CONN_MAX_AGE']
+        reuse_max_age = 60 if configured_max_age == 0 else configured_max_age
+        if reuse_max_age != configured_max_age:
+            self.stdout.write(f'  reused phase runs with CONN_MAX_AGE={reuse_max_age}')
+
+        for name, request, max_age in (('cold connect', cold, configured_max_age), ('reused', reused, reuse_max_age)):
+            # The age applies from the next connect
+            connection.close()
+            settings['CONN_MAX_AGE'] = max_age
+            timings = []
+            for _ in range(options['requests']):
+                start = time.perf_counter()
+                request()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'  {name:14} p50 {statistics.median(timings):8.3f} ms   '
+                f'p95 {timings[int(len(timings) * 0.95) - 1]:8.3f} ms   max {timings[-1]:8.3f} ms'
+            )
+        connection.close()
+        settings['CONN_MAX_AGE'] = configured_max_age
+
+    def query(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
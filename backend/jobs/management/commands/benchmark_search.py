@@ -0,0 +1,89 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.counters import rebuild_application_counters
+from jobs.models import JobApplication, Note
+from jobs.search import FallbackSearchBackend, get_search_backend
+
+WORDS = [
+    'python', 'django', 'react', 'backend', 'frontend', 'platform', 'data', 'cloud',
+    'remote', 'senior', 'staff', 'startup', 'fintech', 'health', 'payments', 'kubernetes',
+    'postgres', 'analytics', 'mobile', 'security', 'machine', 'learning', 'design', 'growth',
+]
+# Filler vocabulary so that, like real descriptions, most terms are selective
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'po', 'qu', 'li', 'da', 'fe', 'go']
+FILLER = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+QUERIES = ['python', 'kubernetes postgres', 'remote senior', 'kaloze', 'zzzz']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare the full-text search backend with icontains filtering on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        self.stdout.write(f'Search backend: {type(backend).__name__}')
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    user = self.seed(rows)
+                    start = time.perf_counter()
+                    backend.rebuild(user_id=user.id)
+                    self.stdout.write(f'\n{rows} rows, index built in {time.perf_counter() - start:.2f}s')
+                    for query in QUERIES:
+                        indexed = self.time_search(backend, user, query, options['repeat'])
+                        scanned = self.time_search(FallbackSearchBackend(), user, query, options['repeat'])
+                        self.stdout.write(
+                            f'  {query!r:24} full-text {indexed * 1000:8.2f} ms   '
+                            f'icontains {scanned * 1000:8.2f} ms   x{scanned / indexed:.1f}'
+                        )
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def seed(self, rows):
+        user = User.objects.create(username=f'search-benchmark-{rows}')
+        rng = random.Random(rows)
+        applications = [
+            JobApplication(
+                user=user,
+                company_name=' '.join(rng.sample(WORDS, 2)).title(),
+                position_title=' '.join(rng.sample(WORDS, 3)).title(),
+                location=rng.choice(['Remote', 'Berlin', 'New York', 'London']),
+                job_description=' '.join(rng.choices(WORDS, k=5) + rng.choices(FILLER, k=60)),
+                general_notes=' '.join(rng.choices(FILLER, k=10)),
+                application_date=date.today() - timedelta(days=rng.randrange(365)),
+            )
+            for _ in range(rows)
+        ]
+        applications = JobApplication.objects.bulk_create(applications, batch_size=2000)
+        Note.objects.bulk_create(
+            [
+                Note(job_application=application, title='Note', content=' '.join(rng.choices(FILLER, k=20)))
+                for application in applications[::2]
+            ],
+            batch_size=2000,
+        )
+        rebuild_application_counters(user_ids=[user.id])
+        return user
+
+    def time_search(self, backend, user, query, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            backend.count(user.id, query)
+            backend.search(user.id, query, 10, 0)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,111 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from jobs.counters import rebuild_application_counters
+from jobs.models import JobApplication, Interview, Note
+from jobs.renderers import FastJSONRenderer
+from jobs.rows import get_row_builder
+from jobs.serializers import JobApplicationListSerializer, JobApplicationSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare serializer + JSONRenderer with values() rows + FastJSONRenderer for the application '
+        'list and the full export, on synthetic data'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    user = self.seed(rows)
+                    self.stdout.write(f'\n{rows} rows')
+                    self.compare(
+                        'list', JobApplicationListSerializer,
+                        JobApplication.objects.filter(user=user),
+                        options['repeat'],
+                    )
+                    self.compare(
+                        'export', JobApplicationSerializer,
+                        JobApplication.objects.filter(user=user).select_related('user').prefetch_related(
+                            'interviews', 'notes'
+                        ),
+                        options['repeat'],
+                    )
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def seed(self, rows):
+        user = User.objects.create(username=f'serialization-benchmark-{rows}')
+        rng = random.Random(rows)
+        applications = JobApplication.objects.bulk_create(
+            [
+                JobApplication(
+                    user=user, company_name=f'Company {index}', position_title='Software Engineer',
+                    application_date=date.today() - timedelta(days=rng.randrange(365)),
+                    status=rng.choice(['applied', 'interview', 'rejected']),
+                    location=rng.choice(['Remote', 'Berlin', 'New York']),
+                    salary_min=rng.choice([None, 80000, 90000]), salary_max=rng.choice([None, 120000, 150000]),
+                )
+                for index in range(rows)
+            ],
+            batch_size=2000,
+        )
+        Interview.objects.bulk_create(
+            [
+                Interview(
+                    job_application=application, interview_type='video',
+                    scheduled_date=timezone.now() + timedelta(hours=rng.randrange(1000)),
+                )
+                for application in applications[::3]
+            ],
+            batch_size=2000,
+        )
+        Note.objects.bulk_create(
+            [Note(job_application=application, title='Note', content='Follow up') for application in applications[::2]],
+            batch_size=2000,
+        )
+        rebuild_application_counters(user_ids=[user.id])
+        return user
+
+    def compare(self, name, serializer_class, queryset, repeat):
+        def serialize():
+            return JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+
+        def build():
+            builder = get_row_builder(serializer_class(), queryset)
+            return FastJSONRenderer().render(list(builder.iterate(queryset.all())))
+
+        slow, expected = self.time(serialize, repeat)
+        fast, content = self.time(build, repeat)
+        if content != expected:
+            raise CommandError(f'{name}: row output differs from the serializer output')
+        self.stdout.write(
+            f'  {name:8} serializer {slow * 1000:9.1f} ms   rows {fast * 1000:9.1f} ms   '
+            f'x{slow / fast:.1f}   {len(content)} bytes'
+        )
+
+    def time(self, function, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
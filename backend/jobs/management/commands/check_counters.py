@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.counters import check_application_counters, rebuild_application_counters
+
+
+class Command(BaseCommand):
+    help = 'Compare the interview and note counters of job applications with the underlying rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, action='append', dest='user_ids',
+                            help='Only check this user\'s applications (may be repeated)')
+        parser.add_argument('--fix', action='store_true', help='Rebuild the counters of inconsistent applications')
+
+    def handle(self, *args, **options):
+        mismatches = check_application_counters(options['user_ids'])
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Counters are consistent'))
+            return
+
+        for application_id, field, stored, expected in mismatches:
+            self.stdout.write(self.style.WARNING(
+                f'Application {application_id}: {field} is {stored!r}, expected {expected!r}'
+            ))
+
+        application_ids = sorted({application_id for application_id, field, stored, expected in mismatches})
+        if options['fix']:
+            rebuild_application_counters(application_ids=application_ids)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt counters for {len(application_ids)} applications'))
+        else:
+            raise CommandError(f'Counters are inconsistent for {len(application_ids)} applications')
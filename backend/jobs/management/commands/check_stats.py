@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.stats import check_user_stats, rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-user application statistics table with the underlying data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, action='append', dest='user_ids',
+                            help='Only check stats for this user (may be repeated)')
+        parser.add_argument('--fix', action='store_true', help='Rebuild the stats of inconsistent users')
+
+    def handle(self, *args, **options):
+        mismatches = check_user_stats(options['user_ids'])
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Stats are consistent'))
+            return
+
+        for user_id, field, stored, expected in mismatches:
+            self.stdout.write(self.style.WARNING(f'User {user_id}: {field} is {stored!r}, expected {expected!r}'))
+
+        user_ids = sorted({user_id for user_id, field, stored, expected in mismatches})
+        if options['fix']:
+            rebuild_user_stats(user_ids)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {len(user_ids)} users'))
+        else:
+            raise CommandError(f'Stats are inconsistent for {len(user_ids)} users')
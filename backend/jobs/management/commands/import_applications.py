@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.importer import CHUNK_SIZE, PARSERS, ImportFileError, import_applications
+
+
+class Command(BaseCommand):
+    help = 'Import job applications for a user from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--type', choices=sorted(PARSERS), help='File type (default: from the extension)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User {options["username"]} does not exist')
+
+        file_type = options['type'] or options['path'].rsplit('.', 1)[-1].lower()
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                result = import_applications(user, fileobj, file_type, options['chunk_size'])
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.rows} rows: {result.created} created, {result.duplicates} duplicates, '
+            f'{result.invalid} invalid in {result.seconds:.2f}s ({result.rows_per_second:,.0f} rows/sec)'
+        ))
@@ -0,0 +1,132 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from jobs.counters import rebuild_application_counters
+from jobs.models import JobApplication, Interview
+from jobs.stats import rebuild_user_stats
+
+# (name, sync path, async path)
+ENDPOINTS = [
+    ('list', '/api/job-applications/', '/api/async/job-applications/'),
+    ('dashboard_stats', '/api/job-applications/dashboard_stats/', '/api/async/job-applications/dashboard_stats/'),
+    ('upcoming', '/api/interviews/upcoming/', '/api/async/interviews/upcoming/'),
+    ('calendar', '/api/interviews/calendar/', '/api/async/interviews/calendar/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare throughput and latency of the sync and async endpoints at the same number of requests '
+        'in flight, with an artificial delay added to every database query'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Requests per endpoint and mode')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once, in both modes')
+        parser.add_argument('--db-latency', type=float, default=20.0, help='Milliseconds added to every query')
+
+    def handle(self, *args, **options):
+        latency = options['db_latency'] / 1000
+
+        def slow_query(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_latency(sender, connection, **kwargs):
+            connection.execute_wrappers.append(slow_query)
+
+        user = self.seed()
+        headers = {'authorization': f'Token {Token.objects.get(user=user).key}'}
+        connection_created.connect(add_latency)
+        connections.close_all()
+        # The test clients send Host: testserver; the response cache would hide the database latency
+        test_settings = override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], API_CACHE_ENABLED=False)
+        test_settings.enable()
+        try:
+            self.stdout.write(
+                f'{options["requests"]} requests per endpoint, {options["db_latency"]:.0f} ms per query, '
+                f'{options["concurrency"]} requests in flight (sync: threads, async: one event loop)'
+            )
+            for name, sync_path, async_path in ENDPOINTS:
+                sync_result = self.run_sync(sync_path, headers, options['requests'], options['concurrency'])
+                async_result = asyncio.run(
+                    self.run_async(async_path, headers, options['requests'], options['concurrency'])
+                )
+                self.stdout.write(f'\n{name}')
+                self.report('sync', *sync_result)
+                self.report('async', *async_result)
+        finally:
+            test_settings.disable()
+            connection_created.disconnect(add_latency)
+            connections.close_all()
+            user.delete()
+
+    def seed(self):
+        User.objects.filter(username='async-loadtest').delete()
+        user = User.objects.create(username='async-loadtest')
+        Token.objects.create(user=user)
+        applications = JobApplication.objects.bulk_create([
+            JobApplication(
+                user=user, company_name=f'Company {index}', position_title='Engineer',
+                application_date=date.today() - timedelta(days=index),
+            )
+            for index in range(50)
+        ])
+        Interview.objects.bulk_create([
+            Interview(
+                job_application=application, interview_type='video',
+                scheduled_date=timezone.now() + timedelta(days=index),
+            )
+            for index, application in enumerate(applications[:10])
+        ])
+        rebuild_application_counters(user_ids=[user.id])
+        rebuild_user_stats([user.id])
+        return user
+
+    def run_sync(self, path, headers, count, concurrency):
+        def request(_):
+            start = time.perf_counter()
+            response = Client(headers=headers).get(path)
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            timings = list(executor.map(request, range(count)))
+        return timings, time.perf_counter() - start
+
+    async def run_async(self, path, headers, count, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request():
+            # ASGIHandler gives each request its own thread for sync code; the test client does not
+            async with semaphore, ThreadSensitiveContext():
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                assert response.status_code == 200, response.status_code
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        timings = await asyncio.gather(*(request() for _ in range(count)))
+        return timings, time.perf_counter() - start
+
+    def report(self, mode, timings, elapsed):
+        timings = sorted(timings)
+        self.stdout.write(
+            f'  {mode:6} {len(timings) / elapsed:8.1f} req/s   p50 {statistics.median(timings) * 1000:8.1f} ms   '
+            f'p95 {timings[int(len(timings) * 0.95) - 1] * 1000:8.1f} ms'
+        )
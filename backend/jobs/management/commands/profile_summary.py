@@ -0,0 +1,68 @@
+import io
+import os
+import pstats
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.profiling import PROFILE_SUFFIX, parse_filename
+
+
+class Command(BaseCommand):
+    help = 'Summarize the hottest functions of the stored API profiles, per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', help='Profile directory (default: API_PROFILE_DIR)')
+        parser.add_argument('--endpoint', help='Only endpoints containing this text, e.g. "GET jobapplication-list"')
+        parser.add_argument('--limit', type=int, default=15, help='Functions shown per endpoint')
+        parser.add_argument('--sort', choices=['tottime', 'cumulative'], default='tottime',
+                            help='Rank by own time or by time including callees')
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.API_PROFILE_DIR
+        if not os.path.isdir(directory):
+            raise CommandError(f'No profile directory at {directory}')
+
+        groups = defaultdict(list)
+        for name in sorted(os.listdir(directory)):
+            parsed = name.endswith(PROFILE_SUFFIX) and parse_filename(name)
+            if not parsed:
+                continue
+            endpoint, milliseconds, mode = parsed
+            if options['endpoint'] and options['endpoint'] not in endpoint:
+                continue
+            groups[endpoint, mode].append((os.path.join(directory, name), milliseconds))
+
+        if not groups:
+            self.stdout.write(f'No profiles in {directory}')
+            return
+
+        # Endpoints with the most profiled time first
+        for (endpoint, mode), profiles in sorted(groups.items(), key=lambda item: -sum(ms for _, ms in item[1])):
+            durations = [ms for _, ms in profiles]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{endpoint} ({mode}): {len(profiles)} profiles, '
+                f'mean {sum(durations) / len(durations):.0f} ms, max {max(durations)} ms'
+            ))
+            self.write_top(pstats.Stats(*(path for path, _ in profiles), stream=io.StringIO()), options)
+
+    def write_top(self, stats, options):
+        # Stats entries are (primitive calls, calls, own time, cumulative time, callers)
+        index = 2 if options['sort'] == 'tottime' else 3
+        total = stats.total_tt or 1
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][index])[:options['limit']]
+        self.stdout.write(f'  {"calls":>9} {"own s":>9} {"cum s":>9} {"share":>6}  function')
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in rows:
+            share = (tottime if index == 2 else cumtime) / total
+            self.stdout.write(
+                f'  {calls:9d} {tottime:9.4f} {cumtime:9.4f} {share:6.1%}  '
+                f'{function} ({self.short_path(filename)}:{line})'
+            )
+
+    def short_path(self, filename):
+        for prefix in (str(settings.BASE_DIR), *(path for path in sys.path if path)):
+            if filename.startswith(prefix + os.sep):
+                return filename[len(prefix) + 1:]
+        return filename
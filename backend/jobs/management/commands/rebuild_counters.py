@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.counters import rebuild_application_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the interview and note counters of job applications from the underlying rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, action='append', dest='user_ids',
+                            help='Only rebuild the counters of this user\'s applications (may be repeated)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Applications per UPDATE')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = rebuild_application_counters(options['user_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt counters for {count} applications in {time.perf_counter() - start:.2f}s'
+        ))
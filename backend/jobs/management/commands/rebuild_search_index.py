@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for job applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help='Only rebuild documents for this user')
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            backend.rebuild(user_id=options['user_id'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search index using {type(backend).__name__}'))
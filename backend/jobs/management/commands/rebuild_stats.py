@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-user application statistics table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, action='append', dest='user_ids',
+                            help='Only rebuild stats for this user (may be repeated)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = rebuild_user_stats(options['user_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt stats for {count} users in {time.perf_counter() - start:.2f}s'
+        ))
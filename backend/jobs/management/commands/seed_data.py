@@ -0,0 +1,82 @@
+import multiprocessing
+import re
+import time
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+
+from jobs.stats import rebuild_user_stats
+from jobs.synthetic import BATCH_SIZE, create_users, seed_user, seed_user_in_worker
+
+
+# With DEBUG on, every INSERT would be logged, and on SQLite its parameters quoted by an extra query
+quiet_settings = override_settings(DEBUG=False)
+
+
+def setup_worker():
+    django.setup()
+    quiet_settings.enable()
+    # Never share the parent's database connection
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Create N users with M synthetic applications each, plus interviews and notes, using bulk inserts, '
+        'one precomputed password hash and optionally several worker processes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--applications', type=int, default=1000, help='Applications per user')
+        parser.add_argument('--workers', type=int, default=1, help='Processes seeding users in parallel')
+        parser.add_argument('--prefix', default='seeduser', help='Usernames are <prefix>1 .. <prefix>N')
+        parser.add_argument('--password', default='testpass123', help='Password of every seeded user')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        with quiet_settings:
+            self.seed(options)
+
+    def seed(self, options):
+        self.verbosity = options['verbosity']
+        prefix = options['prefix']
+        if User.objects.filter(username__regex=rf'^{re.escape(prefix)}[0-9]+$').exists():
+            raise CommandError(f'Users named {prefix}<n> already exist; pick another --prefix or delete them')
+
+        start = time.perf_counter()
+        # One PBKDF2 hash shared by every user instead of one per create_user() call
+        user_ids = create_users(options['users'], prefix, make_password(options['password']), options['batch_size'])
+        jobs = [
+            (user_id, options['applications'], options['seed'] * 1_000_003 + index, options['batch_size'])
+            for index, user_id in enumerate(user_ids)
+        ]
+
+        totals = [0, 0, 0]
+        if options['workers'] > 1:
+            connections.close_all()
+            with multiprocessing.Pool(options['workers'], initializer=setup_worker) as pool:
+                for done, counts in enumerate(pool.imap_unordered(seed_user_in_worker, jobs), 1):
+                    self.add_counts(totals, counts, done, len(jobs), start)
+        else:
+            for done, job in enumerate(jobs, 1):
+                self.add_counts(totals, seed_user(*job), done, len(jobs), start)
+
+        rebuild_user_stats(user_ids)
+        elapsed = time.perf_counter() - start
+        rows = len(user_ids) + sum(totals)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(user_ids)} users, {totals[0]} applications, {totals[1]} interviews and {totals[2]} notes '
+            f'({rows} rows) in {elapsed:.1f}s, {rows / elapsed:,.0f} rows/s'
+        ))
+
+    def add_counts(self, totals, counts, done, total, start):
+        for index, count in enumerate(counts):
+            totals[index] += count
+        if self.verbosity > 1 or done == total or done % max(1, total // 10) == 0:
+            self.stdout.write(f'  {done}/{total} users seeded, {time.perf_counter() - start:.1f}s')
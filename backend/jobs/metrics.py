@@ -0,0 +1,243 @@
+"""
+Per-request SQL and timing instrumentation
+
+With REQUEST_METRICS_ENABLED, RequestMetricsMiddleware wraps every database
+connection's execute for the duration of a request and records the query
+count, the time spent in the database and repeated queries: the same SQL
+with the same parameters (a duplicate), or the same SQL with different
+parameters run REQUEST_METRICS_REPEAT_THRESHOLD times or more (the shape of
+an N+1 loop in a serializer). Each response gets a Server-Timing header,
+each request a JSON log line on the jobs.metrics logger, and the totals are
+aggregated per endpoint (method and URL name) for the admin-only
+/api/_metrics view. Streaming responses run most of their queries while the
+body is iterated, after the headers have gone out, so they are recorded and
+logged when the iteration finishes and get no Server-Timing header. Under
+ASGI the middleware runs on the event loop and only hops to the request's
+sync thread, to install the wrappers, while metrics are enabled. The
+aggregates live in the worker process, so each gunicorn worker reports its
+own.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('jobs.metrics')
+
+# Recent request durations kept per endpoint for percentiles
+RECENT_DURATIONS = 500
+
+
+class QueryRecorder:
+    """Database execute wrapper counting and timing the queries of one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.executions = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+            try:
+                self.executions[sql, repr(params)] += 1
+            except Exception:
+                pass
+
+    def duplicates(self):
+        """Number of executions that repeated an earlier query exactly"""
+        return sum(count - 1 for count in self.executions.values() if count > 1)
+
+    def repeated(self, threshold):
+        """{sql: executions} for statements run at least threshold times"""
+        return {sql: count for sql, count in self.statements.items() if count >= threshold}
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else None
+
+
+class EndpointMetrics:
+    """Running totals per endpoint, shared by the threads of a worker process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+            self.since = time.time()
+
+    def add(self, endpoint, status_code, duration, recorder, repeated):
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    'requests': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'db_ms': 0.0,
+                    'queries': 0, 'max_queries': 0, 'duplicate_queries': 0, 'requests_with_repeats': 0,
+                    'durations': deque(maxlen=RECENT_DURATIONS),
+                }
+            duration_ms = duration * 1000
+            stats['requests'] += 1
+            stats['errors'] += status_code >= 500
+            stats['total_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['db_ms'] += recorder.duration * 1000
+            stats['queries'] += recorder.count
+            stats['max_queries'] = max(stats['max_queries'], recorder.count)
+            stats['duplicate_queries'] += recorder.duplicates()
+            stats['requests_with_repeats'] += bool(repeated)
+            stats['durations'].append(duration_ms)
+
+    def snapshot(self):
+        """Return the aggregates as a JSON-friendly dict, slowest endpoints first"""
+        with self.lock:
+            endpoints = []
+            for endpoint, stats in self.endpoints.items():
+                requests = stats['requests']
+                endpoints.append({
+                    'endpoint': endpoint,
+                    'requests': requests,
+                    'errors': stats['errors'],
+                    'mean_ms': round(stats['total_ms'] / requests, 3),
+                    'p50_ms': round(percentile(stats['durations'], 50), 3),
+                    'p95_ms': round(percentile(stats['durations'], 95), 3),
+                    'max_ms': round(stats['max_ms'], 3),
+                    'mean_db_ms': round(stats['db_ms'] / requests, 3),
+                    'mean_queries': round(stats['queries'] / requests, 2),
+                    'max_queries': stats['max_queries'],
+                    'duplicate_queries': stats['duplicate_queries'],
+                    'requests_with_repeats': stats['requests_with_repeats'],
+                })
+            endpoints.sort(key=lambda item: item['mean_ms'] * item['requests'], reverse=True)
+            return {'pid': os.getpid(), 'since': self.since, 'endpoints': endpoints}
+
+
+endpoint_metrics = EndpointMetrics()
+
+
+def get_endpoint(request):
+    match = request.resolver_match
+    return f'{request.method} {match.view_name if match else "<unresolved>"}'
+
+
+def server_timing(duration, recorder):
+    db = recorder.duration * 1000
+    return (
+        f'db;dur={db:.1f};desc="{recorder.count} queries", '
+        f'app;dur={duration * 1000 - db:.1f}, total;dur={duration * 1000:.1f}'
+    )
+
+
+class RequestMetricsMiddleware:
+    """Record queries and timings of each request when REQUEST_METRICS_ENABLED is set"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with self.recording(recorder):
+            response = self.get_response(request)
+        return self.record(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        # Under ASGI the request's sync code and its async ORM calls share one thread
+        # (thread_sensitive), so the wrappers go on that thread's connections
+        stack = await sync_to_async(self.recording)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.record(request, response, recorder, start)
+
+    def record(self, request, response, recorder, start):
+        def finish():
+            duration = time.perf_counter() - start
+            repeated = recorder.repeated(settings.REQUEST_METRICS_REPEAT_THRESHOLD)
+            endpoint = get_endpoint(request)
+            endpoint_metrics.add(endpoint, response.status_code, duration, recorder, repeated)
+            self.log(request, response, endpoint, duration, recorder, repeated)
+            return duration
+
+        if response.streaming:
+            stream = self.astream if response.is_async else self.stream
+            response.streaming_content = stream(response.streaming_content, recorder, finish)
+        else:
+            response['Server-Timing'] = server_timing(finish(), recorder)
+        return response
+
+    def recording(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def stream(self, content, recorder, finish):
+        try:
+            with self.recording(recorder):
+                yield from content
+        finally:
+            finish()
+
+    async def astream(self, content, recorder, finish):
+        stack = await sync_to_async(self.recording)(recorder)
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            await sync_to_async(stack.close)()
+            finish()
+
+    def log(self, request, response, endpoint, duration, recorder, repeated):
+        record = {
+            'endpoint': endpoint,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 3),
+            'db_ms': round(recorder.duration * 1000, 3),
+            'queries': recorder.count,
+            'duplicate_queries': recorder.duplicates(),
+        }
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            record['user_id'] = user.id
+        if repeated:
+            record['repeated_queries'] = [
+                {'sql': sql[:300], 'count': count}
+                for sql, count in sorted(repeated.items(), key=lambda item: -item[1])[:5]
+            ]
+            logger.warning(json.dumps(record, separators=(',', ':')))
+        else:
+            logger.info(json.dumps(record, separators=(',', ':')))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['job_application', 'scheduled_date'], name='jobs_int_app_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['scheduled_date', 'job_application'], name='jobs_int_scheduled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', '-application_date', '-created_at'], name='jobs_app_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', 'status'], name='jobs_app_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['job_application', '-created_at'], name='jobs_note_app_created_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from jobs.search import get_search_backend
+    backend = get_search_backend(schema_editor.connection)
+    for sql in backend.create_sql:
+        schema_editor.execute(sql)
+    backend.rebuild()
+
+
+def drop_search_index(apps, schema_editor):
+    from jobs.search import get_search_backend
+    for sql in get_search_backend(schema_editor.connection).drop_sql:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
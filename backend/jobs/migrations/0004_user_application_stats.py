@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('jobs', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserApplicationStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='application_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_applications', models.IntegerField(default=0)),
+                ('status_counts', models.JSONField(default=dict)),
+                ('monthly_counts', models.JSONField(default=dict)),
+                ('daily_counts', models.JSONField(default=dict)),
+                ('upcoming_interviews', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'User Application Stats',
+                'verbose_name_plural': 'User Application Stats',
+            },
+        ),
+    ]
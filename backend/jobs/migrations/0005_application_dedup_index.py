@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_user_application_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', 'company_name', 'position_title', 'application_date'], name='jobs_app_user_dedup_idx'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:01
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def fill_counters(apps, schema_editor):
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    Interview = apps.get_model('jobs', 'Interview')
+    Note = apps.get_model('jobs', 'Note')
+
+    def child_aggregate(model, aggregate):
+        return Subquery(
+            model.objects.filter(job_application=OuterRef('pk')).order_by()
+            .values('job_application').annotate(value=aggregate).values('value')
+        )
+
+    JobApplication.objects.update(
+        interview_count=Coalesce(child_aggregate(Interview, Count('pk')), 0),
+        note_count=Coalesce(child_aggregate(Note, Count('pk')), 0),
+        next_interview_at=Subquery(
+            Interview.objects.filter(job_application=OuterRef('pk'), status='scheduled')
+            .order_by('scheduled_date').values('scheduled_date')[:1]
+        ),
+        last_activity_at=Greatest(
+            'updated_at',
+            Coalesce(child_aggregate(Interview, Max('updated_at')), 'updated_at'),
+            Coalesce(child_aggregate(Note, Max('updated_at')), 'updated_at'),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_application_dedup_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='interview_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='last_activity_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='next_interview_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='note_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', 'next_interview_at'], name='jobs_app_user_next_int_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', '-last_activity_at'], name='jobs_app_user_activity_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -49,14 +49,46 @@ class JobApplication(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Denormalized from the interviews and notes by jobs.counters, so the list needs no joins
+    interview_count = models.IntegerField(default=0)
+    note_count = models.IntegerField(default=0)
+    next_interview_at = models.DateTimeField(null=True, blank=True)  # Earliest interview still scheduled
+    last_activity_at = models.DateTimeField(auto_now=True)  # Last write to the application or its children
+    
+    # Only ever written with UPDATE queries by jobs.counters, so save() leaves them alone
+    COUNTER_FIELDS = ['interview_count', 'note_count', 'next_interview_at']
+    
     class Meta:
         ordering = ['-application_date', '-created_at']
         verbose_name = 'Job Application'
         verbose_name_plural = 'Job Applications'
+        indexes = [
+            # Per-user listing in default ordering
+            models.Index(fields=['user', '-application_date', '-created_at'], name='jobs_app_user_date_idx'),
+            # Per-user status filters and dashboard status counts
+            models.Index(fields=['user', 'status'], name='jobs_app_user_status_idx'),
+            # Duplicate detection when importing applications
+            models.Index(
+                fields=['user', 'company_name', 'position_title', 'application_date'],
+                name='jobs_app_user_dedup_idx',
+            ),
+            # Per-user listing by next interview and by recent activity
+            models.Index(fields=['user', 'next_interview_at'], name='jobs_app_user_next_int_idx'),
+            models.Index(fields=['user', '-last_activity_at'], name='jobs_app_user_activity_idx'),
+        ]
     
     def __str__(self):
         return f"{self.position_title} at {self.company_name}"
     
+    def save(self, *args, **kwargs):
+        """Never overwrite the counters with the values loaded before they last changed"""
+        if kwargs.get('update_fields') is None and not self._state.adding and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
     @property
     def salary_range(self):
         """Return formatted salary range"""
@@ -120,6 +152,16 @@ class Interview(models.Model):
         ordering = ['scheduled_date']
         verbose_name = 'Interview'
         verbose_name_plural = 'Interviews'
+        indexes = [
+            # Interviews of an application in default ordering
+            models.Index(fields=['job_application', 'scheduled_date'], name='jobs_int_app_date_idx'),
+            # Upcoming interviews only ever look at scheduled rows
+            models.Index(
+                fields=['scheduled_date', 'job_application'],
+                condition=models.Q(status='scheduled'),
+                name='jobs_int_scheduled_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.interview_type} interview for {self.job_application.position_title}"
@@ -144,6 +186,36 @@ class Note(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Note'
         verbose_name_plural = 'Notes'
+        indexes = [
+            # Notes of an application in default ordering
+            models.Index(fields=['job_application', '-created_at'], name='jobs_note_app_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.job_application.company_name}"
+
+
+class UserApplicationStats(models.Model):
+    """
+    Per-user dashboard counters, kept up to date incrementally by jobs.signals
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='application_stats')
+    
+    # Application counters
+    total_applications = models.IntegerField(default=0)
+    status_counts = models.JSONField(default=dict)  # status -> count
+    monthly_counts = models.JSONField(default=dict)  # 'YYYY-MM' -> count
+    daily_counts = models.JSONField(default=dict)  # 'YYYY-MM-DD' -> count, recent days only
+    
+    # Scheduled future interviews, interview id -> scheduled timestamp
+    upcoming_interviews = models.JSONField(default=dict)
+    
+    # Timestamps
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'User Application Stats'
+        verbose_name_plural = 'User Application Stats'
+    
+    def __str__(self):
+        return f"Application stats for {self.user}"
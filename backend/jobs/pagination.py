@@ -0,0 +1,187 @@
+import base64
+import json
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def ordering_term(field, descending, nulls_last=True):
+    """ORDER BY term for a model field; NULLs of nullable fields sort last (or first) on every database"""
+    if not field.null:
+        return f'-{field.name}' if descending else field.name
+    nulls = {'nulls_last': True} if nulls_last else {'nulls_first': True}
+    return F(field.name).desc(**nulls) if descending else F(field.name).asc(**nulls)
+
+
+def ordering_terms(model, ordering):
+    """ORDER BY terms for an ordering given as field names with an optional '-' prefix"""
+    return [ordering_term(model._meta.get_field(name.lstrip('-')), name.startswith('-')) for name in ordering]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a composite ordering
+    Each page is fetched with a WHERE clause on the last row seen, so the cost
+    of a page does not depend on how deep into the results it is
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset, view)
+        values, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self.get_keyset_filter(values, reverse))
+
+        # Fetch one extra row to find out whether there is another page
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = values is not None
+
+        self.page = results
+        return results
+
+    def get_ordering(self, queryset, view):
+        """Return the ordering as (field name, descending) pairs, ending with the primary key"""
+        ordering = getattr(view, 'keyset_ordering', None) or queryset.model._meta.ordering
+        ordering = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+        pk_name = queryset.model._meta.pk.name
+        if ordering[-1][0] not in (pk_name, 'pk'):
+            # Use the primary key as a tiebreaker, in the direction of the last field
+            ordering.append((pk_name, ordering[-1][1]))
+        self.fields = [queryset.model._meta.get_field(name) for name, descending in ordering]
+        return ordering
+
+    def get_order_by(self, reverse):
+        # NULLs come last going forward, so first when walking back
+        return [
+            ordering_term(field, descending != reverse, nulls_last=not reverse)
+            for field, (name, descending) in zip(self.fields, self.ordering)
+        ]
+
+    def get_keyset_filter(self, values, reverse):
+        """Build (a < x) OR (a = x AND b < y) OR ... for the cursor position"""
+        keyset_filter = Q()
+        for index, (name, descending) in enumerate(self.ordering):
+            condition = self.get_past_filter(self.fields[index], descending, values[index], reverse)
+            for (previous_name, _), previous_value in zip(self.ordering[:index], values[:index]):
+                # filter(name=None) is an IS NULL test
+                condition &= Q(**{previous_name: previous_value})
+            keyset_filter |= condition
+        return keyset_filter
+
+    def get_past_filter(self, field, descending, value, reverse):
+        """Rows past value in one column, in the direction of travel"""
+        if value is None:
+            # Going forward nothing follows the NULLs, going back every value precedes them
+            return Q(**{f'{field.name}__isnull': False}) if reverse else Q(pk__in=[])
+        lookup = 'lt' if descending != reverse else 'gt'
+        condition = Q(**{f'{field.name}__{lookup}': value})
+        if field.null and not reverse:
+            condition |= Q(**{f'{field.name}__isnull': True})
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if len(payload['v']) != len(self.fields):
+                raise ValueError
+            values = [field.to_python(value) for field, value in zip(self.fields, payload['v'])]
+            return values, bool(payload.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse):
+        if isinstance(instance, dict):
+            values = [instance[field.attname] for field in self.fields]
+        else:
+            values = [getattr(instance, field.attname) for field in self.fields]
+        payload = {
+            'v': [value.isoformat() if hasattr(value, 'isoformat') else value for value in values],
+        }
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, default=str).encode('ascii'))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class OptionalKeysetPagination(PageNumberPagination):
+    """
+    Page number pagination by default, keyset pagination on request
+    Pass ?pagination=cursor for the first page, then follow the next/previous links
+    """
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return ''
+        return super().to_html()
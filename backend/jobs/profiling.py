@@ -0,0 +1,239 @@
+"""
+Sampling profiler for the API viewsets
+
+ProfilingMiddleware profiles requests routed to a DRF viewset in two ways,
+both off by default:
+
+- API_PROFILE_SAMPLE_RATE percent of requests run under cProfile, which
+  records every call but slows the request down while it does;
+- with API_PROFILE_SLOW_MS, every other request is watched by a stack
+  sampler: one background thread per process reads the request thread's
+  stack every API_PROFILE_INTERVAL_MS, which costs the request nothing, and
+  the samples are kept only if the request took longer than the threshold.
+
+Both are written to API_PROFILE_DIR in pstats format (sampled stacks are
+converted, with times estimated from the sample counts), so they open in
+pstats or snakeviz and are summarized by the profile_summary command. Only
+the newest API_PROFILE_MAX_FILES profiles are kept. Under ASGI the middleware
+stays on the event loop and only starts and stops a profile on the sync
+thread that runs the viewset.
+"""
+import cProfile
+import marshal
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from rest_framework.viewsets import ViewSetMixin
+
+PROFILE_SUFFIX = '.prof'
+
+
+def profile_filename(endpoint, duration, mode):
+    """<time>__<method>__<view name>__<milliseconds>ms__<mode>.prof; parse_filename() reverses it"""
+    method, _, view_name = endpoint.partition(' ')
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S.%f')
+    return f'{stamp}__{method}__{view_name}__{duration * 1000:.0f}ms__{mode}{PROFILE_SUFFIX}'
+
+
+def parse_filename(name):
+    """Return (endpoint, milliseconds, mode) for a profile file name, or None"""
+    parts = name.removesuffix(PROFILE_SUFFIX).split('__')
+    if len(parts) != 5 or not parts[3].endswith('ms'):
+        return None
+    try:
+        return f'{parts[1]} {parts[2]}', int(parts[3][:-2]), parts[4]
+    except ValueError:
+        return None
+
+
+def rotate(directory, keep):
+    """Delete all but the newest keep profiles"""
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(PROFILE_SUFFIX)),
+        key=lambda entry: entry.name,
+    )
+    for entry in profiles[:max(0, len(profiles) - keep)]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def save_stats(stats, endpoint, duration, mode):
+    """Write a pstats dict to the profile directory and rotate; return the path"""
+    directory = settings.API_PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, profile_filename(endpoint, duration, mode))
+    with open(path, 'wb') as output:
+        marshal.dump(stats, output)
+    rotate(directory, settings.API_PROFILE_MAX_FILES)
+    return path
+
+
+def samples_to_stats(samples, interval):
+    """
+    Turn {stack: count} samples (stacks as (file, line, function) tuples, innermost
+    first) into the {function: (cc, nc, tt, ct, callers)} dict pstats reads
+    """
+    stats = {}
+    for stack, count in samples.items():
+        seconds = count * interval
+        seen = set()
+        for depth, function in enumerate(stack):
+            cc, nc, tt, ct, callers = stats.get(function, (0, 0, 0.0, 0.0, {}))
+            own = seconds if depth == 0 else 0.0
+            # Recursive frames count once towards the cumulative time
+            total = seconds if function not in seen else 0.0
+            seen.add(function)
+            if depth + 1 < len(stack):
+                caller = stack[depth + 1]
+                ccc, cnc, ctt, cct = callers.get(caller, (0, 0, 0.0, 0.0))
+                callers[caller] = (ccc + count, cnc + count, ctt + own, cct + total)
+            stats[function] = (cc + count, nc + count, tt + own, ct + total, callers)
+    return stats
+
+
+class StackSampler:
+    """Background thread sampling the stacks of the request threads registered with it"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.active = {}
+        self.thread = None
+
+    def register(self, thread_id, interval):
+        samples = Counter()
+        with self.lock:
+            self.active[thread_id] = samples
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, args=(interval,), name='api-stack-sampler', daemon=True,
+                )
+                self.thread.start()
+        self.wakeup.set()
+        return samples
+
+    def unregister(self, thread_id):
+        # Samples are only added under the lock, so they are complete once this returns
+        with self.lock:
+            self.active.pop(thread_id, None)
+
+    def run(self, interval):
+        own_id = threading.get_ident()
+        while True:
+            with self.lock:
+                idle = not self.active
+                if idle:
+                    self.wakeup.clear()
+            if idle:
+                self.wakeup.wait()
+                continue
+            time.sleep(interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, samples in self.active.items():
+                    frame = frames.get(thread_id)
+                    if frame is None or thread_id == own_id:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                        frame = frame.f_back
+                    samples[tuple(stack)] += 1
+
+
+stack_sampler = StackSampler()
+
+
+class ProfilingMiddleware:
+    """Profile a sample of viewset requests, or the slow ones, per the API_PROFILE_* settings"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django adapts a sync process_view with a thread hop on every request
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request._profiling = None
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(request, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        request._profiling = None
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if request._profiling is not None:
+                # The profiler and the sampler registration belong to the thread that started them
+                await sync_to_async(self.finish)(request, time.perf_counter() - start)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_profiled(view_func):
+            self.start(request)
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # Viewsets are sync, so under ASGI they run on the request's thread-sensitive sync thread:
+        # the profiler has to start there rather than on the event loop
+        if self.is_profiled(view_func):
+            await sync_to_async(self.start)(request)
+        return None
+
+    def is_profiled(self, view_func):
+        view_class = getattr(view_func, 'cls', None)
+        return (
+            view_class is not None and issubclass(view_class, ViewSetMixin)
+            and bool(settings.API_PROFILE_SAMPLE_RATE or settings.API_PROFILE_SLOW_MS)
+        )
+
+    def start(self, request):
+        rate = settings.API_PROFILE_SAMPLE_RATE
+        if rate and random.random() * 100 < rate:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already running in this process
+                return
+            request._profiling = ('cprofile', profiler)
+        elif settings.API_PROFILE_SLOW_MS:
+            interval = settings.API_PROFILE_INTERVAL_MS / 1000
+            request._profiling = ('sampled', stack_sampler.register(threading.get_ident(), interval))
+
+    def finish(self, request, duration):
+        if request._profiling is None:
+            return
+        mode, data = request._profiling
+        request._profiling = None
+        match = request.resolver_match
+        endpoint = f'{request.method} {match.view_name if match else "unresolved"}'
+        if mode == 'cprofile':
+            data.disable()
+            data.create_stats()
+            save_stats(data.stats, endpoint, duration, mode)
+            return
+        stack_sampler.unregister(threading.get_ident())
+        if duration * 1000 >= settings.API_PROFILE_SLOW_MS and data:
+            save_stats(samples_to_stats(data, settings.API_PROFILE_INTERVAL_MS / 1000), endpoint, duration, mode)
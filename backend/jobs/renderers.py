@@ -0,0 +1,42 @@
+"""
+JSON rendering with orjson when it is installed
+
+FastJSONRenderer produces the same bytes as DRF's JSONRenderer with the
+default COMPACT_JSON and UNICODE_JSON settings: compact separators, non-ASCII
+characters left as UTF-8 and \\u2028/\\u2029 escaped. Dates, datetimes,
+decimals and anything else orjson does not handle the same way go through
+DRF's JSONEncoder. Indented output (the browsable API, ?indent=), other JSON
+settings and payloads orjson rejects use JSONRenderer itself. (Floats in
+exponent notation are written as 1e16 rather than 1e+16, and NaN as null.)
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+    )
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson where the output is identical"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None or orjson is None or self.ensure_ascii or not self.compact
+            or self.encoder_class is not JSONEncoder
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+        return ret
@@ -0,0 +1,195 @@
+"""
+Serializer-compatible rows built from values() queries
+
+DRF serializes a model instance field by field: attribute lookups, None
+checks and a to_representation() call per field and row. RowBuilder looks
+at a serializer's fields once, turns them into a values() column list and
+a conversion per field, and then builds the same dicts straight from the
+fetched rows. Plain fields are copied as they are, dates and datetimes and
+decimals go through the field's own formatting, model properties such as
+salary_range are computed once per distinct input, and nested serializers
+become a join (foreign keys) or one query per chunk (reverse relations).
+
+Serializers with fields it cannot reproduce exactly make RowBuilder raise
+Unsupported; FastListMixin and the export then use the serializer itself.
+"""
+from functools import partial
+from itertools import islice
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+CHUNK_SIZE = 500
+
+# Fields whose to_representation() returns str, int or bool model values unchanged
+IDENTITY_FIELDS = (
+    drf_fields.CharField, drf_fields.ChoiceField, drf_fields.IntegerField, drf_fields.BooleanField,
+    drf_fields.ReadOnlyField, relations.PrimaryKeyRelatedField,
+)
+
+
+class Unsupported(Exception):
+    """Raised for serializers whose output a RowBuilder cannot reproduce"""
+
+
+def identity(value):
+    return value
+
+
+def iso_date(value):
+    return value.isoformat()
+
+
+def get_converter(field):
+    """Return a function giving the field's representation of a non-None model value"""
+    if isinstance(field, drf_fields.DateField) and getattr(field, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+        return iso_date
+    if isinstance(field, IDENTITY_FIELDS):
+        return identity
+    if isinstance(field, (serializers.BaseSerializer, relations.RelatedField, drf_fields.SerializerMethodField)):
+        raise Unsupported(field.field_name)
+    return field.to_representation
+
+
+class RowBuilder:
+    """Build the representation a serializer gives each row from values() dicts"""
+
+    def __init__(self, serializer, annotations=(), prefix=''):
+        self.model = serializer.Meta.model
+        self.prefix = prefix
+        self.pk_key = prefix + self.model._meta.pk.attname
+        self.columns = [self.pk_key]
+        self.plan = []
+        self.many = []
+        self.children = {}
+        field_sources = getattr(serializer.Meta, 'field_sources', {})
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, drf_fields.SerializerMethodField):
+                # Only method fields that read an annotation of the same name
+                if name not in annotations or prefix:
+                    raise Unsupported(name)
+                self.add(name, name, identity)
+                continue
+            if field.source == '*' or '.' in field.source:
+                raise Unsupported(name)
+            if name in field_sources:
+                self.add_property(name, field.source, field_sources[name])
+                continue
+            try:
+                model_field = self.model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                raise Unsupported(name)
+            if isinstance(field, serializers.ListSerializer):
+                if prefix or not model_field.one_to_many:
+                    raise Unsupported(name)
+                self.many.append((name, model_field.field.attname, RowBuilder(field.child)))
+                self.plan.append((name, self.pk_key, partial(self.get_children, name), False))
+            elif isinstance(field, serializers.BaseSerializer):
+                if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                    raise Unsupported(name)
+                nested = RowBuilder(field, prefix=f'{prefix}{model_field.name}__')
+                self.columns.extend(nested.columns)
+                self.plan.append((name, nested.pk_key, nested.build_row, True))
+            elif model_field.concrete:
+                self.add(name, prefix + model_field.attname, get_converter(field))
+            else:
+                raise Unsupported(name)
+
+    def add(self, name, column, convert):
+        if column not in self.columns:
+            self.columns.append(column)
+        self.plan.append((name, column, convert, False))
+
+    def add_property(self, name, source, dependencies):
+        """Compute a model property from the columns it reads, once per distinct set of values"""
+        getter = getattr(self.model, source).fget
+        columns = [self.prefix + dependency for dependency in dependencies]
+        for column in columns:
+            if column not in self.columns:
+                self.columns.append(column)
+        computed = {}
+
+        def convert(row):
+            key = tuple(row[column] for column in columns)
+            if key not in computed:
+                computed[key] = getter(SimpleNamespace(**dict(zip(dependencies, key))))
+            return computed[key]
+        self.plan.append((name, None, convert, True))
+
+    def get_children(self, name, pk):
+        return self.children[name].get(pk, [])
+
+    def build_row(self, row):
+        data = {}
+        # Each step reads one column, or the whole row for properties and nested objects
+        for name, column, convert, whole_row in self.plan:
+            value = row if column is None else row[column]
+            if value is None:
+                data[name] = None
+            elif whole_row:
+                data[name] = convert(row)
+            else:
+                data[name] = value if convert is identity else convert(value)
+        return data
+
+    def values(self, queryset, *extra):
+        """Return the values() queryset the rows are built from"""
+        columns = self.columns + [column for column in extra if column not in self.columns]
+        return queryset.prefetch_related(None).values(*columns)
+
+    def fetch_children(self, rows):
+        """Load the reverse relations of a chunk of rows with one query each, for get_children()"""
+        ids = [row[self.pk_key] for row in rows]
+        children = {}
+        for name, fk_attname, builder in self.many:
+            grouped = {}
+            related = builder.model._default_manager.filter(**{f'{fk_attname}__in': ids})
+            for row in builder.values(related, fk_attname).order_by(*builder.model._meta.ordering):
+                grouped.setdefault(row[fk_attname], []).append(builder.build_row(row))
+            children[name] = grouped
+        self.children = children
+
+    def build(self, rows):
+        """Build the representation of a list of values() rows"""
+        if self.many:
+            self.fetch_children(rows)
+        return [self.build_row(row) for row in rows]
+
+    def iterate(self, queryset, chunk_size=CHUNK_SIZE):
+        """Yield the representation of every row of a queryset, a chunk at a time"""
+        rows = self.values(queryset).iterator(chunk_size=chunk_size)
+        while chunk := list(islice(rows, chunk_size)):
+            yield from self.build(chunk)
+
+
+def get_row_builder(serializer, queryset):
+    """Return a RowBuilder reproducing the serializer on the queryset, or None"""
+    try:
+        return RowBuilder(serializer, queryset.query.annotations)
+    except Unsupported:
+        return None
+
+
+class FastListMixin:
+    """Build list responses from values() rows when the serializer allows it"""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        builder = get_row_builder(self.get_serializer(), queryset)
+        if builder is None:
+            return super().list(request, *args, **kwargs)
+
+        # Keyset pagination reads the ordering columns from the rows
+        ordering = getattr(self, 'keyset_ordering', None) or queryset.model._meta.ordering
+        ordering = [name.lstrip('-') for name in ordering]
+        rows = builder.values(queryset, *ordering)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(builder.build(page))
+        return Response(builder.build(list(rows)))
@@ -0,0 +1,305 @@
+"""
+Full-text search over job applications
+
+The search index lives in its own table, jobs_search_index, and holds one
+document per application built from company_name, position_title, location,
+job_description, general_notes and the titles and contents of its notes.
+PostgreSQL stores a weighted tsvector with a GIN index; SQLite uses an FTS5
+virtual table keyed by the application id. Other databases fall back to
+icontains filtering.
+
+Highlights are built from user text, so the database wraps the matches in
+private-use sentinel characters and format_highlight() escapes the fragment
+before turning the sentinels into <mark> tags.
+"""
+import html
+from collections import namedtuple
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import JobApplication
+
+SEARCH_TABLE = 'jobs_search_index'
+
+SearchHit = namedtuple('SearchHit', ['application_id', 'rank', 'highlight'])
+
+# Delimiters of the matched terms in highlights, replaced by <mark> tags after escaping
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_STOP = '\ue001'
+
+
+def format_highlight(fragment):
+    """Return a highlighted fragment as HTML: escaped text with the matches in <mark> tags"""
+    if fragment is None:
+        return None
+    return html.escape(fragment).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+
+
+@lru_cache(maxsize=None)
+def sqlite_has_fts5():
+    """Return True if the SQLite library was compiled with FTS5"""
+    import sqlite3
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE probe USING fts5(body)')
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+# Maximum number of ids bound into a single IN (...) clause
+CHUNK_SIZE = 500
+
+
+def in_clauses(column, ids):
+    """Yield SQL conditions and params restricting column to ids, in chunks"""
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        chunk = ids[start:start + CHUNK_SIZE]
+        yield f"{column} IN ({', '.join(['%s'] * len(chunk))})", chunk
+
+
+class PostgresSearchBackend:
+    """tsvector + GIN index backend"""
+    config = 'english'
+
+    create_sql = [
+        f"""
+        CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+            application_id bigint PRIMARY KEY
+                REFERENCES jobs_jobapplication (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+            user_id integer NOT NULL,
+            body text NOT NULL,
+            document tsvector NOT NULL
+        )
+        """,
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING gin (document)",
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_user_idx ON {SEARCH_TABLE} (user_id)",
+    ]
+    drop_sql = [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+
+    insert_sql = f"""
+        INSERT INTO {SEARCH_TABLE} (application_id, user_id, body, document)
+        SELECT a.id, a.user_id, doc.body,
+            setweight(to_tsvector('{config}', a.company_name || ' ' || a.position_title), 'A')
+            || setweight(to_tsvector('{config}', a.location), 'B')
+            || setweight(to_tsvector('{config}', doc.text), 'C')
+        FROM jobs_jobapplication a
+        CROSS JOIN LATERAL (
+            SELECT concat_ws(' ', a.job_description, a.general_notes, (
+                SELECT string_agg(n.title || ' ' || n.content, ' ')
+                FROM jobs_note n WHERE n.job_application_id = a.id
+            )) AS text
+        ) notes
+        CROSS JOIN LATERAL (
+            SELECT concat_ws(' ', a.company_name, a.position_title, a.location, notes.text) AS body,
+                notes.text AS text
+        ) doc
+        WHERE {{where}}
+    """
+
+    def index(self, application_ids):
+        self.remove(application_ids)
+        with connection.cursor() as cursor:
+            for where, params in in_clauses('a.id', application_ids):
+                cursor.execute(self.insert_sql.format(where=where), params)
+
+    def remove(self, application_ids):
+        with connection.cursor() as cursor:
+            for where, params in in_clauses('application_id', application_ids):
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {where}", params)
+
+    def rebuild(self, user_id=None):
+        with connection.cursor() as cursor:
+            if user_id is None:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+                cursor.execute(self.insert_sql.format(where='TRUE'))
+            else:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE user_id = %s", [user_id])
+                cursor.execute(self.insert_sql.format(where='a.user_id = %s'), [user_id])
+
+    def count(self, user_id, query):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT count(*) FROM {SEARCH_TABLE}
+                WHERE user_id = %s AND document @@ websearch_to_tsquery('{self.config}', %s)
+                """,
+                [user_id, query],
+            )
+            return cursor.fetchone()[0]
+
+    def search(self, user_id, query, limit, offset):
+        with connection.cursor() as cursor:
+            # Only the rows on the page pay for ts_headline
+            cursor.execute(
+                f"""
+                SELECT ranked.application_id, ranked.rank,
+                    ts_headline('{self.config}', ranked.body, ranked.query,
+                        'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=20, MinWords=5')
+                FROM (
+                    SELECT application_id, body, query, ts_rank(document, query) AS rank
+                    FROM {SEARCH_TABLE}, websearch_to_tsquery('{self.config}', %s) query
+                    WHERE user_id = %s AND document @@ query
+                    ORDER BY rank DESC, application_id DESC
+                    LIMIT %s OFFSET %s
+                ) ranked
+                ORDER BY ranked.rank DESC, ranked.application_id DESC
+                """,
+                [query, user_id, limit, offset],
+            )
+            return [
+                SearchHit(application_id, rank, format_highlight(highlight))
+                for application_id, rank, highlight in cursor.fetchall()
+            ]
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table backend, keyed by rowid = application id"""
+
+    create_sql = [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+            title, location, body, user_id UNINDEXED, tokenize = 'porter unicode61'
+        )
+        """,
+    ]
+    drop_sql = [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+
+    insert_sql = f"""
+        INSERT INTO {SEARCH_TABLE} (rowid, title, location, body, user_id)
+        SELECT a.id, a.company_name || ' ' || a.position_title, a.location,
+            a.job_description || ' ' || a.general_notes || ' ' || COALESCE((
+                SELECT group_concat(n.title || ' ' || n.content, ' ')
+                FROM jobs_note n WHERE n.job_application_id = a.id
+            ), ''),
+            a.user_id
+        FROM jobs_jobapplication a
+        WHERE {{where}}
+    """
+
+    def index(self, application_ids):
+        self.remove(application_ids)
+        with connection.cursor() as cursor:
+            for where, params in in_clauses('a.id', application_ids):
+                cursor.execute(self.insert_sql.format(where=where), params)
+
+    def remove(self, application_ids):
+        with connection.cursor() as cursor:
+            for where, params in in_clauses('rowid', application_ids):
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {where}", params)
+
+    def rebuild(self, user_id=None):
+        with connection.cursor() as cursor:
+            if user_id is None:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+                cursor.execute(self.insert_sql.format(where='1'))
+            else:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE user_id = %s", [user_id])
+                cursor.execute(self.insert_sql.format(where='a.user_id = %s'), [user_id])
+
+    def match_expression(self, query):
+        """Turn free text into an FTS5 query of quoted terms, so user input is never parsed as syntax"""
+        terms = [term.replace('"', '""') for term in query.split()]
+        return ' '.join(f'"{term}"' for term in terms)
+
+    def count(self, user_id, query):
+        match = self.match_expression(query)
+        if not match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND user_id = %s",
+                [match, user_id],
+            )
+            return cursor.fetchone()[0]
+
+    def search(self, user_id, query, limit, offset):
+        match = self.match_expression(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            # bm25() is lower for better matches; weight title over location over body
+            cursor.execute(
+                f"""
+                SELECT rowid, -bm25({SEARCH_TABLE}, 10.0, 5.0, 1.0) AS rank,
+                    snippet({SEARCH_TABLE}, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '...', 20)
+                FROM {SEARCH_TABLE}
+                WHERE {SEARCH_TABLE} MATCH %s AND user_id = %s
+                ORDER BY rank DESC, rowid DESC
+                LIMIT %s OFFSET %s
+                """,
+                [match, user_id, limit, offset],
+            )
+            return [
+                SearchHit(application_id, rank, format_highlight(highlight))
+                for application_id, rank, highlight in cursor.fetchall()
+            ]
+
+
+class FallbackSearchBackend:
+    """icontains filtering for databases without a full-text index"""
+    create_sql = []
+    drop_sql = []
+
+    def index(self, application_ids):
+        pass
+
+    def remove(self, application_ids):
+        pass
+
+    def rebuild(self, user_id=None):
+        pass
+
+    def get_queryset(self, user_id, query):
+        return JobApplication.objects.filter(user_id=user_id).filter(
+            Q(company_name__icontains=query) |
+            Q(position_title__icontains=query) |
+            Q(location__icontains=query) |
+            Q(job_description__icontains=query) |
+            Q(general_notes__icontains=query) |
+            Q(notes__title__icontains=query) |
+            Q(notes__content__icontains=query)
+        ).distinct()
+
+    def count(self, user_id, query):
+        return self.get_queryset(user_id, query).count()
+
+    def search(self, user_id, query, limit, offset):
+        ids = self.get_queryset(user_id, query).values_list('id', flat=True)[offset:offset + limit]
+        return [SearchHit(application_id, 0, None) for application_id in ids]
+
+
+class SearchResults:
+    """
+    Lazy, sliceable view of a user's search results
+    Lets Django's Paginator run the count and page queries against the backend
+    """
+
+    def __init__(self, backend, user_id, query):
+        self.backend = backend
+        self.user_id = user_id
+        self.query = query
+
+    def count(self):
+        return self.backend.count(self.user_id, self.query)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError('SearchResults only supports slicing')
+        start = index.start or 0
+        return self.backend.search(self.user_id, self.query, index.stop - start, start)
+
+
+def get_search_backend(db_connection=None):
+    """Return the search backend for the given (by default the current) database"""
+    vendor = (db_connection or connection).vendor
+    if vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if vendor == 'sqlite' and sqlite_has_fts5():
+        return SQLiteSearchBackend()
+    return FallbackSearchBackend()
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import JobApplication, Interview, Note
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .fields import SparseFieldsetSerializerMixin
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -11,15 +14,28 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class NoteSerializer(serializers.ModelSerializer):
+class ApplicationSummarySerializer(serializers.ModelSerializer):
+    """Serializer for the job application an interview or note is expanded with"""
+    class Meta:
+        model = JobApplication
+        fields = ['id', 'company_name', 'position_title', 'status']
+        read_only_fields = fields
+
+
+def expanded_application():
+    return ApplicationSummarySerializer(read_only=True)
+
+
+class NoteSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for Note model"""
     class Meta:
         model = Note
         fields = ['id', 'title', 'content', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+        expandable_fields = {'job_application': expanded_application}
 
 
-class InterviewSerializer(serializers.ModelSerializer):
+class InterviewSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for Interview model"""
     class Meta:
         model = Interview
@@ -29,9 +45,69 @@ class InterviewSerializer(serializers.ModelSerializer):
             'notes', 'feedback', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        expandable_fields = {'job_application': expanded_application}
+
 
+def parse_id(value):
+    """Parse a primary key as IntegerField does, which unlike int() rejects booleans and fractions"""
+    return serializers.IntegerField(min_value=1).run_validation(value)
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+
+class JobApplicationBulkSerializer(serializers.ListSerializer):
+    """
+    List serializer for bulk writes of job applications
+    Creates with bulk_create; for updates, pass a dict of the user's applications
+    by id as the instance and every item must carry the id it updates. Validated
+    update items hold the application they apply to under 'instance'.
+    """
+    batch_size = 1000
+    
+    def to_internal_value(self, data):
+        self.seen_ids = set()
+        return super().to_internal_value(data)
+    
+    def run_child_validation(self, data):
+        """Validate each update item against the application it names"""
+        if self.instance is None:
+            return super().run_child_validation(data)
+        try:
+            pk = parse_id(data['id'])
+        except (KeyError, TypeError, serializers.ValidationError):
+            raise serializers.ValidationError({'id': ['A valid id is required.']})
+        if pk in self.seen_ids:
+            raise serializers.ValidationError({'id': ['Duplicate id.']})
+        self.seen_ids.add(pk)
+        try:
+            instance = self.instance[pk]
+        except KeyError:
+            raise serializers.ValidationError({'id': ['Not found.']})
+        self.child.instance = instance
+        self.child.initial_data = data
+        attrs = super().run_child_validation(data)
+        attrs['instance'] = instance
+        return attrs
+    
+    def create(self, validated_data):
+        applications = [JobApplication(**attrs) for attrs in validated_data]
+        return JobApplication.objects.bulk_create(applications, batch_size=self.batch_size)
+    
+    def update(self, instance, validated_data):
+        # auto_now is not applied by bulk_update, so stamp updated_at and last_activity_at here
+        now = timezone.now()
+        fields = {'updated_at', 'last_activity_at'}
+        applications = []
+        for attrs in validated_data:
+            application = attrs.pop('instance')
+            for attr, value in attrs.items():
+                setattr(application, attr, value)
+                fields.add(attr)
+            application.updated_at = application.last_activity_at = now
+            applications.append(application)
+        JobApplication.objects.bulk_update(applications, sorted(fields), batch_size=self.batch_size)
+        return applications
+
+
+class JobApplicationSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for JobApplication model"""
     user = UserSerializer(read_only=True)
     interviews = InterviewSerializer(many=True, read_only=True)
@@ -48,6 +124,9 @@ class JobApplicationSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        list_serializer_class = JobApplicationBulkSerializer
+        # Columns read by fields that are not model fields, for sparse fieldsets
+        field_sources = {'salary_range': ['salary_min', 'salary_max']}
     
     def create(self, validated_data):
         """Override create to automatically set the user"""
@@ -55,28 +134,22 @@ class JobApplicationSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class JobApplicationListSerializer(serializers.ModelSerializer):
+class JobApplicationListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Simplified serializer for listing job applications"""
     salary_range = serializers.ReadOnlyField()
-    interview_count = serializers.SerializerMethodField()
-    note_count = serializers.SerializerMethodField()
     
     class Meta:
         model = JobApplication
         fields = [
             'id', 'company_name', 'position_title', 'application_date',
             'status', 'location', 'salary_range', 'interview_count',
-            'note_count', 'created_at'
+            'note_count', 'next_interview_at', 'last_activity_at', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at']
-    
-    def get_interview_count(self, obj):
-        """Get the number of interviews for this job application"""
-        return obj.interviews.count()
-    
-    def get_note_count(self, obj):
-        """Get the number of notes for this job application"""
-        return obj.notes.count()
+        # The counters are kept up to date by jobs.counters
+        read_only_fields = [
+            'id', 'interview_count', 'note_count', 'next_interview_at', 'last_activity_at', 'created_at'
+        ]
+        field_sources = {'salary_range': ['salary_min', 'salary_max']}
 
 
 class InterviewCreateSerializer(serializers.ModelSerializer):
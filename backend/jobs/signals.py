@@ -0,0 +1,232 @@
+"""
+Signal handlers that keep derived data in step with applications, interviews
+and notes: the search index, the per-user stats table, the per-application
+counters and the per-user response cache version.
+
+Bulk writes skip the per-row handlers (bulk_create and bulk_update never send
+model signals, and deletes run inside suspend_tracking()) and send
+bulk_changed once afterwards instead.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .caching import bump_user_version
+from .counters import adjust_counters, rebuild_application_counters
+from .models import JobApplication, Interview, Note
+from .search import get_search_backend
+from .stats import (
+    application_state, apply_application_change, forget_interview,
+    invalidate_dashboard_stats, rebuild_user_stats, record_interview,
+)
+
+# Sent after a bulk write to a user's applications, with user_id and application_ids
+bulk_changed = Signal()
+
+tracking_suspended = ContextVar('jobs_tracking_suspended', default=False)
+
+
+@contextmanager
+def suspend_tracking():
+    """Skip the per-row handlers, e.g. while deleting many rows at once"""
+    token = tracking_suspended.set(True)
+    try:
+        yield
+    finally:
+        tracking_suspended.reset(token)
+
+
+def tracked(handler):
+    """Skip a model signal handler for fixture loading and suspended tracking"""
+    @wraps(handler)
+    def wrapper(sender, instance, raw=False, **kwargs):
+        if raw or tracking_suspended.get():
+            return
+        handler(sender, instance, **kwargs)
+    return wrapper
+
+
+def deleted_directly(origin):
+    """Whether a delete started from interviews or notes, rather than cascading from their application"""
+    model = getattr(origin, 'model', type(origin))
+    return model in (Interview, Note)
+
+
+def application_user_id(application_id):
+    return JobApplication.objects.filter(pk=application_id).values_list('user_id', flat=True).first()
+
+
+@receiver(bulk_changed)
+def refresh_after_bulk_change(sender, user_id, application_ids, **kwargs):
+    """Bring the search index, stats and cache version up to date in a bounded number of queries"""
+    get_search_backend().index(application_ids)
+    rebuild_application_counters(application_ids=application_ids)
+    rebuild_user_stats([user_id])
+    bump_user_version(user_id)
+
+
+@receiver(post_save, sender=JobApplication)
+@tracked
+def index_job_application(sender, instance, **kwargs):
+    """Refresh the search document when an application is saved"""
+    get_search_backend().index([instance.pk])
+
+
+@receiver(post_delete, sender=JobApplication)
+@tracked
+def unindex_job_application(sender, instance, **kwargs):
+    """Drop the search document of a deleted application"""
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+@tracked
+def index_note_application(sender, instance, **kwargs):
+    """Note titles and contents are part of the application's search document"""
+    get_search_backend().index([instance.job_application_id])
+
+
+@receiver(pre_save, sender=JobApplication)
+@tracked
+def remember_application_state(sender, instance, **kwargs):
+    """Load the stored state of an updated application so stats can apply the difference"""
+    instance._stats_previous = None
+    if not instance._state.adding:
+        instance._stats_previous = JobApplication.objects.filter(pk=instance.pk).values_list(
+            'user_id', 'status', 'application_date'
+        ).first()
+
+
+@receiver(post_save, sender=JobApplication)
+@tracked
+def update_application_stats(sender, instance, **kwargs):
+    """Move the application between status, month and day counters"""
+    previous = getattr(instance, '_stats_previous', None)
+    apply_application_change(previous, application_state(instance))
+    invalidate_dashboard_stats(instance.user_id)
+    bump_user_version(instance.user_id)
+    if previous is not None and previous[0] != instance.user_id:
+        bump_user_version(previous[0])
+
+
+@receiver(post_delete, sender=JobApplication)
+@tracked
+def remove_application_stats(sender, instance, **kwargs):
+    """Take a deleted application out of its user's counters"""
+    apply_application_change(application_state(instance), None)
+    invalidate_dashboard_stats(instance.user_id)
+    bump_user_version(instance.user_id)
+
+
+@receiver(pre_save, sender=Interview)
+@tracked
+def remember_interview_application(sender, instance, **kwargs):
+    """Remember the previous application of an updated interview in case it is reassigned"""
+    instance._stats_previous_application_id = None
+    if not instance._state.adding:
+        instance._stats_previous_application_id = Interview.objects.filter(pk=instance.pk).values_list(
+            'job_application_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Interview)
+@tracked
+def update_interview_counters(sender, instance, created=False, **kwargs):
+    """Count the interview on its application and refresh the application's next interview"""
+    previous_application_id = getattr(instance, '_stats_previous_application_id', None)
+    moved = previous_application_id not in (None, instance.job_application_id)
+    if moved:
+        adjust_counters(previous_application_id, interviews=-1, next_interview=True)
+    adjust_counters(instance.job_application_id, interviews=int(created or moved), next_interview=True)
+
+
+@receiver(post_delete, sender=Interview)
+@tracked
+def remove_interview_counters(sender, instance, origin=None, **kwargs):
+    """Uncount a deleted interview, unless its application is being deleted too"""
+    if deleted_directly(origin):
+        adjust_counters(instance.job_application_id, interviews=-1, next_interview=True)
+
+
+@receiver(post_save, sender=Interview)
+@tracked
+def update_interview_stats(sender, instance, **kwargs):
+    """Track scheduled interviews for the upcoming interview count"""
+    user_id = application_user_id(instance.job_application_id)
+    previous_application_id = getattr(instance, '_stats_previous_application_id', None)
+    if previous_application_id not in (None, instance.job_application_id):
+        previous_user_id = application_user_id(previous_application_id)
+        if previous_user_id not in (None, user_id):
+            forget_interview(previous_user_id, instance.pk)
+            invalidate_dashboard_stats(previous_user_id)
+            bump_user_version(previous_user_id)
+    if user_id is not None:
+        record_interview(user_id, instance)
+        invalidate_dashboard_stats(user_id)
+        bump_user_version(user_id)
+
+
+@receiver(post_delete, sender=Interview)
+@tracked
+def remove_interview_stats(sender, instance, **kwargs):
+    """Stop counting a deleted interview as upcoming"""
+    user_id = application_user_id(instance.job_application_id)
+    if user_id is not None:
+        forget_interview(user_id, instance.pk)
+        invalidate_dashboard_stats(user_id)
+        bump_user_version(user_id)
+
+
+@receiver(pre_save, sender=Note)
+@tracked
+def remember_note_application(sender, instance, **kwargs):
+    """Remember the previous application of an updated note in case it is reassigned"""
+    instance._counters_previous_application_id = None
+    if not instance._state.adding:
+        instance._counters_previous_application_id = Note.objects.filter(pk=instance.pk).values_list(
+            'job_application_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Note)
+@tracked
+def update_note_counters(sender, instance, created=False, **kwargs):
+    """Count the note on its application"""
+    previous_application_id = getattr(instance, '_counters_previous_application_id', None)
+    moved = previous_application_id not in (None, instance.job_application_id)
+    if moved:
+        adjust_counters(previous_application_id, notes=-1)
+    adjust_counters(instance.job_application_id, notes=int(created or moved))
+
+
+@receiver(post_delete, sender=Note)
+@tracked
+def remove_note_counters(sender, instance, origin=None, **kwargs):
+    """Uncount a deleted note, unless its application is being deleted too"""
+    if deleted_directly(origin):
+        adjust_counters(instance.job_application_id, notes=-1)
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+@tracked
+def bump_note_user_version(sender, instance, **kwargs):
+    """Notes are nested in cached application responses"""
+    user_id = application_user_id(instance.job_application_id)
+    if user_id is not None:
+        bump_user_version(user_id)
+
+
+@receiver(post_save, sender=User)
+@tracked
+def bump_user_responses(sender, instance, **kwargs):
+    """
+    Responses nest their user, so edits invalidate them; on creation this also
+    keeps a new user from being served responses cached for an earlier one with the same id
+    """
+    bump_user_version(instance.pk)
@@ -0,0 +1,279 @@
+"""
+Per-user dashboard statistics
+
+UserApplicationStats holds one row of counters per user. The signal handlers
+in jobs.signals apply each JobApplication and Interview change to it as a
+delta, rebuild_user_stats() recomputes rows in bulk and check_user_stats()
+compares stored rows with a fresh recomputation. Reading the row is a single
+query, so the formatted statistics are only cached when the default cache is
+shared: writes invalidate the entry, which in a per-process cache would only
+reach the worker that handled the write.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .caching import is_shared_cache
+from .models import JobApplication, Interview, UserApplicationStats
+
+# Number of year-month buckets in monthly_applications, including the current month
+MONTHS = 6
+
+# Applications on or after today minus this many days count as recent
+RECENT_DAYS = 30
+
+
+def dashboard_stats_cache_key(user_id):
+    return f'jobs:dashboard_stats:{user_id}'
+
+
+def invalidate_dashboard_stats(user_id):
+    """Drop the cached dashboard statistics of a user"""
+    cache.delete(dashboard_stats_cache_key(user_id))
+
+
+def get_dashboard_stats(user):
+    """Return the dashboard statistics of a user, from the cache when possible"""
+    if not is_shared_cache(DEFAULT_CACHE_ALIAS):
+        return compute_dashboard_stats(user)
+    key = dashboard_stats_cache_key(user.id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(user)
+        cache.set(key, stats, settings.DASHBOARD_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def month_starts(today, months):
+    """Return the first day of the last `months` months, oldest first"""
+    starts = []
+    month_start = today.replace(day=1)
+    for _ in range(months):
+        starts.append(month_start)
+        month_start = (month_start - timedelta(days=1)).replace(day=1)
+    return starts[::-1]
+
+
+async def aget_dashboard_stats(user):
+    """Async version of get_dashboard_stats()"""
+    if not is_shared_cache(DEFAULT_CACHE_ALIAS):
+        return await acompute_dashboard_stats(user)
+    key = dashboard_stats_cache_key(user.id)
+    stats = await cache.aget(key)
+    if stats is None:
+        stats = await acompute_dashboard_stats(user)
+        await cache.aset(key, stats, settings.DASHBOARD_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def compute_dashboard_stats(user):
+    """Build the dashboard statistics of a user from their stats row"""
+    stats = UserApplicationStats.objects.filter(user=user).first()
+    if stats is None:
+        stats, _ = get_or_create_user_stats(user.id)
+    return format_dashboard_stats(stats)
+
+
+async def acompute_dashboard_stats(user):
+    """Async version of compute_dashboard_stats()"""
+    stats = await UserApplicationStats.objects.filter(user=user).afirst()
+    if stats is None:
+        stats, _ = await sync_to_async(get_or_create_user_stats)(user.id)
+    return format_dashboard_stats(stats)
+
+
+def format_dashboard_stats(stats):
+    """Turn a stats row into the dashboard statistics response"""
+    today = timezone.now().date()
+    recent_cutoff = (today - timedelta(days=RECENT_DAYS)).isoformat()
+    now = timezone.now().timestamp()
+    return {
+        'status_counts': [
+            {'status': value, 'count': count}
+            for value, count in sorted(stats.status_counts.items()) if count
+        ],
+        'recent_applications': sum(
+            count for day, count in stats.daily_counts.items() if day >= recent_cutoff
+        ),
+        'upcoming_interviews': sum(
+            1 for scheduled in stats.upcoming_interviews.values() if scheduled >= now
+        ),
+        'total_applications': stats.total_applications,
+        'monthly_applications': [
+            {'month': month.strftime('%Y-%m'), 'count': stats.monthly_counts.get(month.strftime('%Y-%m'), 0)}
+            for month in month_starts(today, MONTHS)
+        ],
+    }
+
+
+def add_count(counts, key, delta):
+    counts[key] = counts.get(key, 0) + delta
+    if not counts[key]:
+        del counts[key]
+
+
+def prune(stats):
+    """Drop days that can no longer be recent and interviews that have passed"""
+    recent_cutoff = (timezone.now().date() - timedelta(days=RECENT_DAYS)).isoformat()
+    now = timezone.now().timestamp()
+    stats.daily_counts = {day: count for day, count in stats.daily_counts.items() if day >= recent_cutoff}
+    stats.upcoming_interviews = {
+        interview_id: scheduled for interview_id, scheduled in stats.upcoming_interviews.items() if scheduled >= now
+    }
+
+
+def get_or_create_user_stats(user_id, lock=False):
+    """
+    Return (stats, created) for the user's stats row, creating it rebuilt from scratch
+    The row is inserted before it is rebuilt, so concurrent callers wait on the insert
+    and then find the row instead of racing to insert it twice; lock selects it FOR UPDATE
+    """
+    rows = UserApplicationStats.objects.select_for_update() if lock else UserApplicationStats.objects
+    with transaction.atomic():
+        stats, created = rows.get_or_create(user_id=user_id)
+        if created:
+            rebuild_user_stats([user_id])
+            stats = rows.get(user_id=user_id)
+    return stats, created
+
+
+def update_user_stats(user_id, change, create=True):
+    """
+    Apply change(stats) to the user's stats row under a row lock
+    Missing rows are created (and then rebuilt from scratch, which already covers the
+    change) unless create is False, which lets deletes that cascade from a user skip
+    a row that is going away
+    """
+    with transaction.atomic():
+        if create:
+            stats, created = get_or_create_user_stats(user_id, lock=True)
+            if created:
+                return
+        else:
+            stats = UserApplicationStats.objects.select_for_update().filter(user_id=user_id).first()
+            if stats is None:
+                return
+        change(stats)
+        prune(stats)
+        stats.save()
+
+
+def application_state(application):
+    """Return the part of an application the stats depend on"""
+    return application.user_id, application.status, application.application_date
+
+
+def apply_application_change(old, new):
+    """Apply an application moving from state old to state new (either may be None)"""
+    def change(sign, state):
+        def apply(stats):
+            user_id, status, application_date = state
+            stats.total_applications += sign
+            add_count(stats.status_counts, status, sign)
+            add_count(stats.monthly_counts, application_date.strftime('%Y-%m'), sign)
+            add_count(stats.daily_counts, application_date.isoformat(), sign)
+        return apply
+
+    if old == new:
+        return
+    if old is not None:
+        update_user_stats(old[0], change(-1, old), create=new is not None)
+    if new is not None:
+        update_user_stats(new[0], change(1, new))
+
+
+def record_interview(user_id, interview):
+    """Track a saved interview in the user's upcoming interviews"""
+    def change(stats):
+        stats.upcoming_interviews.pop(str(interview.pk), None)
+        if interview.status == 'scheduled':
+            stats.upcoming_interviews[str(interview.pk)] = interview.scheduled_date.timestamp()
+    update_user_stats(user_id, change)
+
+
+def forget_interview(user_id, interview_id):
+    """Stop tracking a deleted or reassigned interview"""
+    def change(stats):
+        stats.upcoming_interviews.pop(str(interview_id), None)
+    update_user_stats(user_id, change, create=False)
+
+
+def build_user_stats(user_ids=None):
+    """Recompute stats rows from the application and interview tables, keyed by user id"""
+    applications = JobApplication.objects.order_by()
+    interviews = Interview.objects.filter(status='scheduled', scheduled_date__gte=timezone.now())
+    if user_ids is not None:
+        applications = applications.filter(user_id__in=user_ids)
+        interviews = interviews.filter(job_application__user_id__in=user_ids)
+
+    rows = defaultdict(lambda: UserApplicationStats())
+    for user_id in user_ids or []:
+        rows[user_id]
+
+    for row in applications.values('user_id', 'status', month=TruncMonth('application_date')).annotate(count=Count('id')):
+        stats = rows[row['user_id']]
+        stats.total_applications += row['count']
+        add_count(stats.status_counts, row['status'], row['count'])
+        add_count(stats.monthly_counts, row['month'].strftime('%Y-%m'), row['count'])
+
+    recent_cutoff = timezone.now().date() - timedelta(days=RECENT_DAYS)
+    recent = applications.filter(application_date__gte=recent_cutoff)
+    for row in recent.values('user_id', 'application_date').annotate(count=Count('id')):
+        add_count(rows[row['user_id']].daily_counts, row['application_date'].isoformat(), row['count'])
+
+    for interview_id, user_id, scheduled_date in interviews.values_list(
+        'id', 'job_application__user_id', 'scheduled_date'
+    ):
+        rows[user_id].upcoming_interviews[str(interview_id)] = scheduled_date.timestamp()
+
+    for user_id, stats in rows.items():
+        stats.user_id = user_id
+    return dict(rows)
+
+
+def rebuild_user_stats(user_ids=None, batch_size=1000):
+    """Replace the stats rows of the given users (default: everyone) with recomputed ones"""
+    rows = build_user_stats(user_ids)
+    with transaction.atomic():
+        existing = UserApplicationStats.objects.all()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        existing.delete()
+        UserApplicationStats.objects.bulk_create(rows.values(), batch_size=batch_size)
+    for user_id in rows:
+        invalidate_dashboard_stats(user_id)
+    return len(rows)
+
+
+def check_user_stats(user_ids=None):
+    """
+    Compare stored stats rows with a fresh recomputation
+    Returns a list of (user_id, field, stored, expected) for every mismatch
+    """
+    expected_rows = build_user_stats(user_ids)
+    stored_rows = UserApplicationStats.objects.all()
+    if user_ids is not None:
+        stored_rows = stored_rows.filter(user_id__in=user_ids)
+    stored_rows = {stats.user_id: stats for stats in stored_rows}
+
+    fields = ['total_applications', 'status_counts', 'monthly_counts', 'daily_counts', 'upcoming_interviews']
+    mismatches = []
+    for user_id in sorted(set(expected_rows) | set(stored_rows)):
+        expected = expected_rows.get(user_id) or UserApplicationStats(user_id=user_id)
+        stored = stored_rows.get(user_id)
+        if stored is None:
+            # Rows are created lazily, so a missing row is only wrong if it would hold data
+            stored = UserApplicationStats(user_id=user_id)
+        prune(expected)
+        prune(stored)
+        for field in fields:
+            if getattr(stored, field) != getattr(expected, field):
+                mismatches.append((user_id, field, getattr(stored, field), getattr(expected, field)))
+    return mismatches
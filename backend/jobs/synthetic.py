@@ -0,0 +1,178 @@
+"""
+Synthetic job search histories for benchmarks and capacity tests
+
+Applications are spread over the two years before today with most of them
+still 'applied' or 'rejected', about a third list a salary band, and the
+further an application got the more interviews it has. Rows are inserted
+with bulk_create, which sends no model signals, so the counters of each
+batch of applications are recomputed right after it and the user's search
+index and dashboard stats are rebuilt once at the end. seed_user() is the unit of
+work of the seed_data command and can run in a worker process.
+"""
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .caching import bump_user_version
+from .counters import rebuild_application_counters
+from .models import JobApplication, Interview, Note
+from .search import get_search_backend
+from .stats import rebuild_user_stats
+
+BATCH_SIZE = 2000
+
+STATUS_WEIGHTS = {'applied': 45, 'rejected': 30, 'interview': 15, 'withdrawn': 6, 'offer': 4}
+# Interviews per application by status, as (minimum, maximum)
+INTERVIEWS_BY_STATUS = {'applied': (0, 0), 'rejected': (0, 2), 'interview': (1, 3), 'withdrawn': (0, 1), 'offer': (2, 5)}
+
+COMPANIES = [
+    'Acme', 'Globex', 'Initech', 'Umbrella', 'Stark Industries', 'Wayne Enterprises', 'Hooli', 'Pied Piper',
+    'Vandelay', 'Wonka', 'Cyberdyne', 'Soylent', 'Tyrell', 'Massive Dynamic', 'Aperture', 'Black Mesa',
+]
+TITLES = [
+    'Software Engineer', 'Senior Software Engineer', 'Backend Engineer', 'Frontend Developer',
+    'Full Stack Developer', 'Data Engineer', 'Site Reliability Engineer', 'Engineering Manager',
+    'Product Engineer', 'Platform Engineer',
+]
+LOCATIONS = ['Remote', 'New York, NY', 'San Francisco, CA', 'Berlin', 'London', 'Austin, TX', 'Toronto', '']
+SOURCES = ['LinkedIn', 'Indeed', 'Company website', 'Referral', 'Recruiter', '']
+WORDS = [
+    'python', 'django', 'react', 'typescript', 'postgres', 'kubernetes', 'aws', 'payments', 'platform',
+    'team', 'ownership', 'remote', 'growth', 'customers', 'scale', 'reliability', 'testing', 'mentoring',
+    'api', 'data', 'pipeline', 'startup', 'hybrid', 'benefits', 'equity', 'on-call', 'roadmap', 'design',
+]
+NOTE_TITLES = ['Follow up', 'Recruiter call', 'Research', 'Questions to ask', 'Referral', 'Offer details']
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize() + '.'
+
+
+# Text is drawn from fixed pools; generating every sentence would cost more than inserting it
+_pool_rng = random.Random(0)
+DESCRIPTIONS = [sentence(_pool_rng, _pool_rng.randint(20, 80)) for _ in range(500)]
+SHORT_TEXTS = [sentence(_pool_rng, _pool_rng.randint(5, 40)) for _ in range(500)]
+
+
+def build_applications(user_id, count, rng):
+    today = timezone.localdate()
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    applications = []
+    for index in range(count):
+        company = rng.choice(COMPANIES)
+        salary_min = salary_max = None
+        if rng.random() < 0.35:
+            salary_min = rng.randrange(60, 200, 5) * 1000
+            salary_max = salary_min + rng.randrange(10, 60, 5) * 1000
+        applications.append(JobApplication(
+            user_id=user_id,
+            company_name=f'{company} {index // len(COMPANIES)}' if index >= len(COMPANIES) else company,
+            position_title=rng.choice(TITLES),
+            job_description=rng.choice(DESCRIPTIONS),
+            application_date=today - timedelta(days=int(rng.triangular(0, 730, 0))),
+            status=rng.choices(statuses, weights)[0],
+            contact_person=rng.choice(['', '', 'Alex Kim', 'Sam Lee', 'Jordan Diaz']),
+            contact_email=rng.choice(['', 'jobs@example.com', 'recruiting@example.com']),
+            salary_min=salary_min,
+            salary_max=salary_max,
+            location=rng.choice(LOCATIONS),
+            job_url=f'https://example.com/jobs/{index}' if rng.random() < 0.7 else '',
+            source=rng.choice(SOURCES),
+            general_notes=rng.choice(SHORT_TEXTS) if rng.random() < 0.3 else '',
+        ))
+    return applications
+
+
+def build_interviews(applications, rng):
+    now = timezone.now()
+    interviews = []
+    for application in applications:
+        low, high = INTERVIEWS_BY_STATUS[application.status]
+        scheduled = timezone.make_aware(datetime.combine(application.application_date, time(rng.randint(9, 17))))
+        scheduled += timedelta(days=rng.randint(5, 20))
+        for _ in range(rng.randint(low, high)):
+            if scheduled < now:
+                status = rng.choices(['completed', 'cancelled', 'rescheduled'], [85, 10, 5])[0]
+            else:
+                status = 'scheduled'
+            interviews.append(Interview(
+                job_application_id=application.id,
+                interview_type=rng.choice(['phone', 'video', 'onsite', 'technical', 'behavioral', 'final']),
+                status=status,
+                scheduled_date=scheduled,
+                duration_minutes=rng.choice([30, 45, 60, 60, 90]),
+                interviewer_name=rng.choice(['', 'Taylor', 'Morgan', 'Riley']),
+                notes=rng.choice(SHORT_TEXTS) if rng.random() < 0.3 else '',
+            ))
+            scheduled += timedelta(days=rng.randint(3, 14))
+    return interviews
+
+
+def build_notes(applications, rng):
+    notes = []
+    for application in applications:
+        for _ in range(min(int(rng.expovariate(1.2)), 5)):
+            notes.append(Note(
+                job_application_id=application.id,
+                title=rng.choice(NOTE_TITLES),
+                content=rng.choice(SHORT_TEXTS),
+            ))
+    return notes
+
+
+def insert_applications(user_id, count, seed=None, batch_size=BATCH_SIZE):
+    """Insert count applications with their interviews and notes; return the three row counts"""
+    rng = random.Random(seed)
+    totals = [0, 0, 0]
+    for start in range(0, count, batch_size):
+        # One short transaction per batch, so that parallel writers to SQLite take turns
+        with transaction.atomic():
+            applications = JobApplication.objects.bulk_create(
+                build_applications(user_id, min(batch_size, count - start), rng)
+            )
+            interviews = Interview.objects.bulk_create(build_interviews(applications, rng), batch_size=batch_size)
+            notes = Note.objects.bulk_create(build_notes(applications, rng), batch_size=batch_size)
+            rebuild_application_counters(application_ids=[application.id for application in applications])
+        totals[0] += len(applications)
+        totals[1] += len(interviews)
+        totals[2] += len(notes)
+    return totals
+
+
+def seed_user(user_id, count, seed=None, batch_size=BATCH_SIZE):
+    """Insert a user's applications and index them for search; stats are left to the caller"""
+    totals = insert_applications(user_id, count, seed, batch_size)
+    get_search_backend().rebuild(user_id=user_id)
+    bump_user_version(user_id)
+    return totals
+
+
+def seed_user_in_worker(args):
+    """seed_user() for multiprocessing pools: one job per user, on the worker's own connection"""
+    try:
+        return seed_user(*args)
+    finally:
+        connections.close_all()
+
+
+def seed_applications(user, count, seed=None, batch_size=BATCH_SIZE):
+    """Give a user count synthetic applications, with interviews and notes"""
+    totals = seed_user(user.id, count, seed, batch_size)
+    rebuild_user_stats([user.id])
+    return totals
+
+
+def create_users(count, prefix, password_hash, batch_size=BATCH_SIZE):
+    """Create users prefix1..prefixN sharing one precomputed password hash; return their ids"""
+    users = User.objects.bulk_create(
+        [
+            User(username=f'{prefix}{index}', email=f'{prefix}{index}@example.com', password=password_hash)
+            for index in range(1, count + 1)
+        ],
+        batch_size=batch_size,
+    )
+    return [user.id for user in users]
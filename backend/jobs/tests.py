@@ -1,3 +1,1449 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from .caching import get_cache_stats, reset_cache_stats
+from .calendar_feed import MAX_DAYS, calendar_bounds
+from .checks import check_api_cache
+from .compression import brotli, choose_encoding
+from .counters import check_application_counters
+from .importer import ImportFileError, parse_json
+from .metrics import QueryRecorder, RequestMetricsMiddleware, endpoint_metrics
+from .models import JobApplication, Interview, Note, UserApplicationStats
+from .profiling import ProfilingMiddleware, StackSampler, parse_filename, samples_to_stats
+from .renderers import FastJSONRenderer
+from .rows import get_row_builder
+from .serializers import JobApplicationListSerializer, JobApplicationSerializer
+from .stats import check_user_stats, get_or_create_user_stats, rebuild_user_stats
+from .synthetic import seed_applications
+from .views import JobApplicationViewSet
+
+
+class JobApplicationListQueryTests(APITestCase):
+    """Query-count regression tests for the job application list endpoint"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='lister', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+    def create_applications(self, count):
+        for i in range(count):
+            application = JobApplication.objects.create(
+                user=self.user,
+                company_name=f'Company {i}',
+                position_title=f'Engineer {i}',
+                application_date=date.today() - timedelta(days=i),
+            )
+            Interview.objects.create(
+                job_application=application,
+                interview_type='phone',
+                scheduled_date=timezone.now() + timedelta(days=i),
+            )
+            Note.objects.create(job_application=application, title='Note', content='Content')
+            Note.objects.create(job_application=application, title='Note', content='Content')
+
+    def test_list_returns_counts(self):
+        self.create_applications(1)
+        response = self.client.get('/api/job-applications/')
+        self.assertEqual(response.status_code, 200)
+        row = response.data['results'][0]
+        self.assertEqual(row['interview_count'], 1)
+        self.assertEqual(row['note_count'], 2)
+
+    def test_list_query_count_is_constant(self):
+        # The conditional GET validators, one COUNT(*) for the paginator and one SELECT for the page
+        self.create_applications(2)
+        with self.assertNumQueries(3):
+            self.client.get('/api/job-applications/')
+        self.create_applications(8)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/job-applications/')
+        self.assertEqual(len(response.data['results']), 10)
+
+
+class JobApplicationBulkRetrieveTests(APITestCase):
+    """Tests for the prefetching detail path and the bulk retrieve endpoint"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulk', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.applications = []
+        for i in range(5):
+            application = JobApplication.objects.create(
+                user=self.user,
+                company_name=f'Company {i}',
+                position_title=f'Engineer {i}',
+                application_date=date.today(),
+            )
+            Interview.objects.create(
+                job_application=application,
+                interview_type='video',
+                scheduled_date=timezone.now(),
+            )
+            Note.objects.create(job_application=application, title='Note', content='Content')
+            self.applications.append(application)
+
+    def test_bulk_retrieve_uses_fixed_number_of_queries(self):
+        ids = ','.join(str(application.id) for application in self.applications)
+        # Applications joined with users, then one prefetch each for interviews and notes
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/job-applications/bulk/?ids={ids}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(response.data[0]['interviews']), 1)
+        self.assertEqual(len(response.data[0]['notes']), 1)
+
+    def test_bulk_retrieve_only_returns_own_applications(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        foreign = JobApplication.objects.create(
+            user=other, company_name='Other', position_title='Other', application_date=date.today()
+        )
+        response = self.client.get(f'/api/job-applications/bulk/?ids={self.applications[0].id},{foreign.id}')
+        self.assertEqual([row['id'] for row in response.data], [self.applications[0].id])
+
+    def test_bulk_retrieve_rejects_invalid_ids(self):
+        response = self.client.get('/api/job-applications/bulk/?ids=1,abc')
+        self.assertEqual(response.status_code, 400)
+
+
+class AccessPatternIndexTests(TestCase):
+    """EXPLAIN-based checks that the planner picks the composite and partial indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='indexed', password='testpass123')
+        application = JobApplication.objects.create(
+            user=cls.user, company_name='Acme', position_title='Engineer', application_date=date.today()
+        )
+        Interview.objects.create(
+            job_application=application, interview_type='phone', scheduled_date=timezone.now()
+        )
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables always favour a sequential scan
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_user_listing_uses_user_date_index(self):
+        plan = self.explain(JobApplication.objects.filter(user=self.user))
+        self.assertIn('jobs_app_user_date_idx', plan)
+
+    def test_user_status_filter_uses_user_status_index(self):
+        plan = self.explain(JobApplication.objects.filter(user=self.user, status='offer').order_by())
+        self.assertIn('jobs_app_user_status_idx', plan)
+
+    def test_calendar_range_seeks_on_scheduled_date(self):
+        start, end = calendar_bounds('2025-01-01', '2025-01-31')
+        plan = self.explain(Interview.objects.filter(
+            job_application__user=self.user, scheduled_date__gte=start, scheduled_date__lt=end
+        ))
+        self.assertIn('jobs_int_app_date_idx', plan)
+
+    def test_upcoming_interviews_use_partial_index(self):
+        plan = self.explain(Interview.objects.filter(status='scheduled', scheduled_date__gte=timezone.now()))
+        self.assertIn('jobs_int_scheduled_idx', plan)
+
+
+class KeysetPaginationTests(APITestCase):
+    """Tests for the opt-in cursor pagination mode"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        # Several applications share a date so the tiebreakers are exercised
+        for i in range(25):
+            JobApplication.objects.create(
+                user=self.user,
+                company_name=f'Company {i}',
+                position_title='Engineer',
+                application_date=date.today() - timedelta(days=i // 4),
+            )
+
+    def test_cursor_pages_cover_every_row_in_order(self):
+        expected = list(
+            JobApplication.objects.filter(user=self.user)
+            .order_by('-application_date', '-created_at', '-id')
+            .values_list('id', flat=True)
+        )
+        seen = []
+        url = '/api/job-applications/?pagination=cursor'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_the_earlier_page(self):
+        first = self.client.get('/api/job-applications/?pagination=cursor')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [row['id'] for row in back.data['results']],
+            [row['id'] for row in first.data['results']],
+        )
+        self.assertIsNone(back.data['previous'])
+
+    def test_cursor_page_skips_the_count_query(self):
+        first = self.client.get('/api/job-applications/?pagination=cursor')
+        # The conditional GET validators and the page
+        with self.assertNumQueries(2):
+            self.client.get(first.data['next'])
+
+    def test_page_number_mode_is_the_default(self):
+        response = self.client.get('/api/job-applications/?page=2')
+        self.assertEqual(response.data['count'], 25)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/job-applications/?cursor=garbage')
+        self.assertEqual(response.status_code, 404)
+
+
+class JobApplicationSearchTests(APITestCase):
+    """Tests for the full-text search endpoint and index maintenance"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='searcher', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.zephyr_role = JobApplication.objects.create(
+            user=self.user, company_name='Zephyr Labs', position_title='Backend Engineer',
+            application_date=date.today(),
+        )
+        self.other_role = JobApplication.objects.create(
+            user=self.user, company_name='Acme', position_title='Frontend Engineer',
+            application_date=date.today(), job_description='Some python scripting',
+        )
+
+    def search(self, query):
+        return self.client.get('/api/job-applications/search/', {'q': query})
+
+    def test_results_are_ranked_and_highlighted(self):
+        response = self.search('engineer')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+        response = self.search('python scripting')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.other_role.id])
+        self.assertIn('<mark>', response.data['results'][0]['highlight'])
+
+    def test_highlights_escape_user_text(self):
+        Note.objects.create(
+            job_application=self.zephyr_role, title='Recruiter', content='<script>alert(1)</script> zelda called',
+        )
+        highlight = self.search('zelda').data['results'][0]['highlight']
+        self.assertNotIn('<script>', highlight)
+        self.assertIn('&lt;script&gt;', highlight)
+        self.assertIn('<mark>', highlight)
+
+    def test_index_follows_note_changes(self):
+        note = Note.objects.create(job_application=self.zephyr_role, title='Recruiter', content='Spoke with Zelda')
+        self.assertEqual([row['id'] for row in self.search('zelda').data['results']], [self.zephyr_role.id])
+        note.delete()
+        self.assertEqual(self.search('zelda').data['count'], 0)
+
+    def test_deleted_and_foreign_applications_are_excluded(self):
+        other = User.objects.create_user(username='stranger', password='testpass123')
+        JobApplication.objects.create(
+            user=other, company_name='Zephyr Labs', position_title='Engineer', application_date=date.today()
+        )
+        self.zephyr_role.delete()
+        self.assertEqual(self.search('zephyr').data['count'], 0)
+
+    def test_query_is_required(self):
+        self.assertEqual(self.search('').status_code, 400)
+
+
+# Treat the test cache as shared so the dashboard statistics are cached
+@override_settings(PROCESS_LOCAL_CACHE_BACKENDS=[])
+class DashboardStatsTests(APITestCase):
+    """Tests for the aggregated, cached dashboard statistics"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='dashboard', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        today = date.today()
+        for days_ago, application_status in [(0, 'applied'), (5, 'interview'), (40, 'applied'), (400, 'rejected')]:
+            self.application = JobApplication.objects.create(
+                user=self.user, company_name='Acme', position_title='Engineer',
+                application_date=today - timedelta(days=days_ago), status=application_status,
+            )
+
+    def test_stats_are_read_from_one_row_and_then_cached(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/job-applications/dashboard_stats/')
+        self.assertEqual(response.data['total_applications'], 4)
+        self.assertEqual(response.data['recent_applications'], 2)
+        self.assertEqual(response.data['status_counts'], [
+            {'status': 'applied', 'count': 2},
+            {'status': 'interview', 'count': 1},
+            {'status': 'rejected', 'count': 1},
+        ])
+        monthly = response.data['monthly_applications']
+        self.assertEqual(len(monthly), 6)
+        self.assertEqual(monthly[-1]['month'], date.today().strftime('%Y-%m'))
+        # The application from over a year ago must not land in this year's bucket
+        self.assertEqual(sum(bucket['count'] for bucket in monthly), 3)
+        with self.assertNumQueries(0):
+            self.client.get('/api/job-applications/dashboard_stats/')
+
+    def test_per_process_cache_is_not_used(self):
+        with self.settings(PROCESS_LOCAL_CACHE_BACKENDS=[settings.CACHES['default']['BACKEND']]):
+            self.client.get('/api/job-applications/dashboard_stats/')
+            with self.assertNumQueries(1):
+                self.client.get('/api/job-applications/dashboard_stats/')
+
+    def test_writes_invalidate_the_cache(self):
+        self.client.get('/api/job-applications/dashboard_stats/')
+        Interview.objects.create(
+            job_application=self.application, interview_type='phone',
+            scheduled_date=timezone.now() + timedelta(days=1),
+        )
+        response = self.client.get('/api/job-applications/dashboard_stats/')
+        self.assertEqual(response.data['upcoming_interviews'], 1)
+        self.application.delete()
+        response = self.client.get('/api/job-applications/dashboard_stats/')
+        self.assertEqual(response.data['total_applications'], 3)
+
+
+class UserApplicationStatsTests(TestCase):
+    """Tests for the incrementally maintained per-user statistics"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='counted', password='testpass123')
+        self.application = JobApplication.objects.create(
+            user=self.user, company_name='Acme', position_title='Engineer', application_date=date.today()
+        )
+
+    def stats(self):
+        return UserApplicationStats.objects.get(user=self.user)
+
+    def test_status_transitions_move_counts(self):
+        self.application.status = 'offer'
+        self.application.save()
+        self.assertEqual(self.stats().status_counts, {'offer': 1})
+        self.assertEqual(self.stats().total_applications, 1)
+
+    def test_interviews_are_tracked_until_cancelled(self):
+        interview = Interview.objects.create(
+            job_application=self.application, interview_type='phone',
+            scheduled_date=timezone.now() + timedelta(days=2),
+        )
+        self.assertEqual(list(self.stats().upcoming_interviews), [str(interview.pk)])
+        interview.status = 'cancelled'
+        interview.save()
+        self.assertEqual(self.stats().upcoming_interviews, {})
+
+    def test_incremental_updates_match_a_rebuild(self):
+        second = JobApplication.objects.create(
+            user=self.user, company_name='Initech', position_title='Engineer',
+            application_date=date.today() - timedelta(days=90), status='rejected',
+        )
+        Interview.objects.create(
+            job_application=second, interview_type='video', scheduled_date=timezone.now() + timedelta(days=1),
+        )
+        second.application_date = date.today() - timedelta(days=3)
+        second.save()
+        self.application.delete()
+        self.assertEqual(check_user_stats(), [])
+        stored = self.stats()
+        rebuild_user_stats([self.user.id])
+        rebuilt = self.stats()
+        self.assertEqual(stored.status_counts, rebuilt.status_counts)
+        self.assertEqual(stored.monthly_counts, rebuilt.monthly_counts)
+
+    def test_missing_row_is_created_once_and_rebuilt(self):
+        UserApplicationStats.objects.filter(user=self.user).delete()
+        JobApplication.objects.create(
+            user=self.user, company_name='Initech', position_title='Engineer', application_date=date.today(),
+        )
+        self.assertEqual(self.stats().total_applications, 2)
+        stats, created = get_or_create_user_stats(self.user.id)
+        self.assertFalse(created)
+        self.assertEqual(stats.total_applications, 2)
+        self.assertEqual(check_user_stats(), [])
+
+    def test_check_stats_command_reports_and_fixes_drift(self):
+        UserApplicationStats.objects.filter(user=self.user).update(total_applications=7)
+        self.assertEqual(len(check_user_stats()), 1)
+        call_command('check_stats', '--fix', stdout=io.StringIO())
+        self.assertEqual(self.stats().total_applications, 1)
+
+
+@override_settings(API_CACHE_ENABLED=True)
+class ResponseCacheTests(APITestCase):
+    """Tests for the per-user versioned response cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cached', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.application = JobApplication.objects.create(
+            user=self.user, company_name='Acme', position_title='Engineer', application_date=date.today()
+        )
+
+    def test_repeated_reads_are_served_from_the_cache(self):
+        reset_cache_stats()
+        self.assertEqual(self.client.get('/api/job-applications/')['X-Cache'], 'MISS')
+        # Only the conditional GET validators are read from the database
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/job-applications/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(get_cache_stats()['hits'], 1)
+        self.assertEqual(get_cache_stats()['misses'], 1)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get('/api/job-applications/')
+        self.assertEqual(self.client.get('/api/job-applications/?page=1')['X-Cache'], 'MISS')
+
+    def test_writes_bump_the_user_version(self):
+        self.client.get(f'/api/job-applications/{self.application.id}/')
+        self.client.post('/api/notes/', {
+            'job_application': self.application.id, 'title': 'Call', 'content': 'Follow up',
+        })
+        response = self.client.get(f'/api/job-applications/{self.application.id}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['notes']), 1)
+
+    def test_user_edits_bump_the_user_version(self):
+        url = f'/api/job-applications/{self.application.id}/'
+        self.client.get(url)
+        self.user.username = 'renamed'
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['user']['username'], 'renamed')
+
+    def test_per_process_cache_is_flagged(self):
+        self.assertEqual([warning.id for warning in check_api_cache(None)], ['jobs.W001'])
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(check_api_cache(None), [])
+        with self.settings(API_CACHE_ENABLED=False):
+            self.assertEqual(check_api_cache(None), [])
+
+    def test_users_do_not_share_entries(self):
+        self.client.get('/api/job-applications/')
+        other = User.objects.create_user(username='uncached', password='testpass123')
+        self.client.force_authenticate(user=other)
+        response = self.client.get('/api/job-applications/')
+        self.assertEqual(response.data['count'], 0)
+
+
+class ConditionalGetTests(APITestCase):
+    """Tests for ETag support on list and detail actions"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='conditional', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.application = JobApplication.objects.create(
+            user=self.user, company_name='Acme', position_title='Engineer', application_date=date.today()
+        )
+
+    def test_matching_etag_returns_304_after_one_query(self):
+        response = self.client.get('/api/job-applications/')
+        etag = response['ETag']
+        # Only the aggregate the validators are built from
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/job-applications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_validators_do_not_depend_on_the_cache(self):
+        # Another worker process has its own local memory cache
+        etag = self.client.get('/api/job-applications/')['ETag']
+        cache.clear()
+        response = self.client.get('/api/job-applications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Note.objects.create(job_application=self.application, title='Note', content='Content')
+        response = self.client.get('/api/job-applications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.application.delete()
+        response = self.client.get('/api/job-applications/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_writes_change_the_etag(self):
+        url = f'/api/job-applications/{self.application.id}/'
+        etag = self.client.get(url)['ETag']
+        self.client.patch(url, {'status': 'offer'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_deletes_and_user_edits_change_the_etag(self):
+        second = JobApplication.objects.create(
+            user=self.user, company_name='Initech', position_title='Engineer', application_date=date.today()
+        )
+        JobApplication.objects.filter(user=self.user).update(last_activity_at=timezone.now() - timedelta(hours=1))
+        response = self.client.get('/api/job-applications/')
+        self.assertFalse(response.has_header('Last-Modified'))
+        # Dropping the newest row would leave the newest last_activity_at unchanged
+        second.delete()
+        response = self.client.get(
+            '/api/job-applications/', HTTP_IF_NONE_MATCH=response['ETag'], HTTP_IF_MODIFIED_SINCE=http_date(time.time())
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+
+        url = f'/api/job-applications/{self.application.id}/'
+        etag = self.client.get(url)['ETag']
+        self.user.email = 'renamed@example.com'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['email'], 'renamed@example.com')
+
+
+class JobApplicationBulkWriteTests(APITestCase):
+    """Tests for the bulk create, update and delete endpoints"""
+
+    url = '/api/job-applications/bulk/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='importer', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+    def rows(self, count):
+        return [
+            {
+                'company_name': f'Company {i}', 'position_title': 'Engineer',
+                'application_date': str(date.today()), 'status': 'applied',
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_create_uses_a_bounded_number_of_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self.rows(500), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 500)
+        # INSERTs are batched by the backend's parameter limit, never issued per row
+        self.assertLess(len(queries), 25)
+        self.assertEqual(JobApplication.objects.filter(user=self.user).count(), 500)
+        self.assertEqual(UserApplicationStats.objects.get(user=self.user).total_applications, 500)
+        self.assertEqual(check_user_stats(), [])
+
+    def test_bulk_create_reports_errors_per_item_and_writes_nothing(self):
+        rows = self.rows(3)
+        rows[1]['company_name'] = 'X'
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('company_name', response.data[1])
+        self.assertFalse(JobApplication.objects.exists())
+
+    def test_bulk_update_and_delete(self):
+        ids = self.client.post(self.url, self.rows(3), format='json').data['ids']
+        response = self.client.patch(
+            self.url, [{'id': ids[0], 'status': 'offer'}, {'id': ids[1], 'status': 'rejected'}], format='json'
+        )
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(JobApplication.objects.get(id=ids[0]).status, 'offer')
+
+        response = self.client.patch(self.url, [{'id': 999999, 'status': 'offer'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(self.url, [{'status': 'offer'}], format='json')
+        self.assertEqual(response.data[0]['id'], ['A valid id is required.'])
+
+        response = self.client.delete(self.url, {'ids': ids[:2]}, format='json')
+        self.assertEqual(response.data['deleted'], 2)
+        self.assertEqual(list(JobApplication.objects.values_list('id', flat=True)), ids[2:])
+        self.assertEqual(check_user_stats(), [])
+
+
+    def test_booleans_and_duplicates_are_not_ids(self):
+        ids = self.client.post(self.url, self.rows(2), format='json').data['ids']
+        response = self.client.delete(self.url, {'ids': [True]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.delete(self.url, {'ids': [ids[0], ids[0]]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.patch(self.url, [{'id': True, 'status': 'offer'}], format='json')
+        self.assertEqual(response.data[0]['id'], ['A valid id is required.'])
+        response = self.client.patch(
+            self.url, [{'id': ids[1], 'status': 'offer'}, {'id': ids[1], 'status': 'rejected'}], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[1]['id'], ['Duplicate id.'])
+        self.assertEqual(JobApplication.objects.filter(status='applied').count(), 2)
+
+    def test_bulk_update_of_another_users_application_is_not_found(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        application = JobApplication.objects.create(
+            user=other, company_name='Other Corp', position_title='Engineer', application_date=date.today(),
+        )
+        response = self.client.patch(self.url, [{'id': application.id, 'status': 'offer'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0]['id'], ['Not found.'])
+        application.refresh_from_db()
+        self.assertEqual(application.status, 'applied')
+
+
+class JobApplicationExportTests(APITestCase):
+    """Tests for the streaming CSV/NDJSON export"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='exporter', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        for i in range(3):
+            application = JobApplication.objects.create(
+                user=self.user, company_name=f'Company {i}', position_title='Engineer',
+                application_date=date.today() - timedelta(days=i),
+            )
+            Note.objects.create(job_application=application, title='Call', content=f'Spoke {i}')
+
+    def test_csv_export_streams_one_row_per_application(self):
+        response = self.client.get('/api/job-applications/export/')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['company_name'] for row in rows], ['Company 0', 'Company 1', 'Company 2'])
+        self.assertEqual(rows[0]['notes'], 'Call: Spoke 0')
+
+    def test_ndjson_export_nests_notes(self):
+        response = self.client.get('/api/job-applications/export/', {'type': 'ndjson'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['notes'][0]['content'], 'Spoke 0')
+
+    def test_unknown_type_is_rejected(self):
+        response = self.client.get('/api/job-applications/export/', {'type': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+
+class JobApplicationImportTests(APITestCase):
+    """Tests for the streaming CSV/JSON import pipeline"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='uploader', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        JobApplication.objects.create(
+            user=self.user, company_name='Acme', position_title='Engineer', application_date=date(2025, 1, 2)
+        )
+
+    def upload(self, name, content):
+        return self.client.post(
+            '/api/job-applications/import/', {'file': SimpleUploadedFile(name, content.encode())}, format='multipart'
+        )
+
+    def test_csv_import_skips_duplicates_and_reports_errors(self):
+        content = (
+            'company_name,position_title,application_date,salary_min,status\n'
+            'Acme,Engineer,2025-01-02,,applied\n'
+            'Initech,Engineer,2025-01-03,90000,interview\n'
+            'Initech,Engineer,2025-01-03,,applied\n'
+            'X,Engineer,2025-01-04,,applied\n'
+        )
+        response = self.upload('history.csv', content)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['duplicates'], 2)
+        self.assertEqual(response.data['invalid'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 4)
+        self.assertEqual(UserApplicationStats.objects.get(user=self.user).total_applications, 2)
+
+    def test_json_array_is_parsed_incrementally(self):
+        rows = [
+            {'company_name': f'Company {i}', 'position_title': 'Engineer', 'application_date': '2025-02-01'}
+            for i in range(50)
+        ]
+        # A tiny read size makes items straddle buffer boundaries
+        with mock.patch('jobs.importer.READ_SIZE', 64):
+            response = self.upload('history.json', json.dumps(rows))
+        self.assertEqual(response.data['created'], 50)
+
+    def test_invalid_json_is_rejected(self):
+        response = self.upload('history.json', '[{"company_name": ')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(JobApplication.objects.count(), 1)
+
+    def test_content_after_the_array_is_rejected(self):
+        self.assertEqual(list(parse_json(io.StringIO('[1, 2]\n  '))), [1, 2])
+        with mock.patch('jobs.importer.READ_SIZE', 4):
+            with self.assertRaises(ImportFileError):
+                list(parse_json(io.StringIO('[1,2] [3]')))
+        row = {'company_name': 'Trailing Co', 'position_title': 'Engineer', 'application_date': '2025-02-01'}
+        response = self.upload('history.json', f'[{json.dumps(row)}] [{json.dumps(row)}]')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(JobApplication.objects.filter(company_name='Trailing Co').exists())
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as handle:
+            handle.write('{"company_name": "Globex", "position_title": "Engineer", "application_date": "2025-03-01"}\n')
+        out = io.StringIO()
+        call_command('import_applications', 'uploader', handle.name, stdout=out)
+        os.unlink(handle.name)
+        self.assertIn('1 created', out.getvalue())
+
+
+class AsyncViewTests(APITestCase):
+    """Tests for the async versions of the read-heavy endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='asyncuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        today = date.today()
+        for index in range(12):
+            application = JobApplication.objects.create(
+                user=self.user, company_name=f'Company {index}', position_title='Engineer',
+                application_date=today - timedelta(days=index),
+            )
+        Interview.objects.create(
+            job_application=application, interview_type='phone',
+            scheduled_date=timezone.now() + timedelta(days=1),
+        )
+
+    async def get_async(self, url):
+        response = await self.async_client.get(url, headers={'authorization': f'Token {self.token.key}'})
+        return response.status_code, json.loads(response.content)
+
+    def assertSameAsSync(self, sync_url, async_url):
+        status_code, data = async_to_sync(self.get_async)(async_url)
+        response = self.client.get(sync_url)
+        self.assertEqual(status_code, response.status_code)
+        expected = json.loads(json.dumps(response.data))
+        if isinstance(data, dict) and 'next' in data:
+            # Pagination links point at the endpoint that was called
+            for link in ('next', 'previous'):
+                if expected[link]:
+                    expected[link] = expected[link].replace('/api/', '/api/async/')
+        self.assertEqual(data, expected)
+        return data
+
+    def test_list_matches_the_sync_endpoint(self):
+        data = self.assertSameAsSync('/api/job-applications/?page=2', '/api/async/job-applications/?page=2')
+        self.assertEqual(len(data['results']), 2)
+        self.assertTrue(data['previous'].endswith('/api/async/job-applications/'))
+        data = self.assertSameAsSync('/api/job-applications/', '/api/async/job-applications/')
+        self.assertTrue(data['next'].endswith('/api/async/job-applications/?page=2'))
+
+    def test_dashboard_stats_match_the_sync_endpoint(self):
+        data = self.assertSameAsSync('/api/job-applications/dashboard_stats/', '/api/async/job-applications/dashboard_stats/')
+        self.assertEqual(data['total_applications'], 12)
+
+    def test_interview_endpoints_match_the_sync_endpoints(self):
+        data = self.assertSameAsSync('/api/interviews/upcoming/', '/api/async/interviews/upcoming/')
+        self.assertEqual(len(data), 1)
+        start = date.today().isoformat()
+        end = (date.today() + timedelta(days=7)).isoformat()
+        self.assertSameAsSync(
+            f'/api/interviews/calendar/?start={start}&end={end}', f'/api/async/interviews/calendar/?start={start}&end={end}'
+        )
+
+    def test_invalid_page_is_not_found(self):
+        status_code, _ = async_to_sync(self.get_async)('/api/async/job-applications/?page=3')
+        self.assertEqual(status_code, 404)
+
+    def test_anonymous_requests_are_rejected(self):
+        response = async_to_sync(self.async_client.get)('/api/async/job-applications/')
+        # 403 rather than 401 because SessionAuthentication comes first, as in the viewsets
+        self.assertEqual(response.status_code, 403)
+
+
+class InterviewCalendarTests(APITestCase):
+    """Tests for the calendar window, compact payload and iCalendar feed"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='calendar', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.application = JobApplication.objects.create(
+            user=self.user, company_name='Acme, Inc.', position_title='Engineer', application_date=date.today()
+        )
+
+    def interview(self, scheduled_date, **fields):
+        return Interview.objects.create(
+            job_application=self.application, interview_type='video', scheduled_date=scheduled_date, **fields
+        )
+
+    def test_range_is_half_open_in_the_requested_time_zone(self):
+        # 2025-03-10 in New York runs from 04:00 UTC on the 10th to 04:00 UTC on the 11th
+        inside = self.interview(datetime(2025, 3, 11, 3, 30, tzinfo=dt_timezone.utc))
+        self.interview(datetime(2025, 3, 11, 4, 0, tzinfo=dt_timezone.utc))
+        self.interview(datetime(2025, 3, 10, 3, 59, tzinfo=dt_timezone.utc))
+        response = self.client.get('/api/interviews/calendar/?start=2025-03-10&end=2025-03-10&tz=America/New_York')
+        self.assertEqual([row['id'] for row in response.data], [inside.id])
+
+    def test_default_window_starts_this_month(self):
+        this_month = self.interview(timezone.now().replace(day=1, hour=12))
+        self.interview(timezone.now() + timedelta(days=90))
+        response = self.client.get('/api/interviews/calendar/')
+        self.assertEqual([row['id'] for row in response.data], [this_month.id])
+
+    def test_invalid_windows_are_rejected(self):
+        end = (date(2025, 1, 1) + timedelta(days=MAX_DAYS)).isoformat()
+        for query in ['start=2025-01-01&end=' + end, 'start=2025-02-01&end=2025-01-01',
+                      'start=01/02/2025', 'tz=Mars/Olympus', 'type=xml']:
+            self.assertEqual(self.client.get(f'/api/interviews/calendar/?{query}').status_code, 400, query)
+
+    def test_windows_at_the_edges_of_the_calendar_are_rejected(self):
+        for query in ['start=9999-12-31', 'end=0001-01-01', 'start=9999-12-01&end=9999-12-31',
+                      'start=0001-01-01&end=0001-01-31&tz=Asia/Tokyo']:
+            response = self.client.get(f'/api/interviews/calendar/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+    def test_compact_payload_uses_one_query(self):
+        interview = self.interview(datetime(2025, 5, 2, 9, 0, tzinfo=dt_timezone.utc), duration_minutes=45)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/interviews/calendar/?start=2025-05-01&end=2025-05-31&type=compact')
+        self.assertEqual(response.data, [{
+            'id': interview.id, 'application': self.application.id, 'title': 'Acme, Inc. - Engineer',
+            'type': 'video', 'status': 'scheduled', 'start': '2025-05-02T09:00:00Z', 'end': '2025-05-02T09:45:00Z',
+        }])
+
+    def test_ics_feed_streams_escaped_events(self):
+        self.interview(datetime(2025, 5, 2, 9, 0, tzinfo=dt_timezone.utc), location='Room 1; 2nd floor')
+        self.interview(datetime(2025, 5, 3, 9, 0, tzinfo=dt_timezone.utc), status='cancelled')
+        response = self.client.get('/api/interviews/calendar/?start=2025-05-01&end=2025-05-31&type=ics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertIn('DTSTART:20250502T090000Z\r\n', body)
+        self.assertIn('SUMMARY:Video interview: Acme\\, Inc. - Engineer\r\n', body)
+        self.assertIn('LOCATION:Room 1\\; 2nd floor\r\n', body)
+        self.assertIn('STATUS:CANCELLED\r\n', body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split('\r\n')))
+
+
+class SparseFieldsetTests(APITestCase):
+    """Tests for ?fields= and ?expand= and the queries behind them"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='sparse', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.application = JobApplication.objects.create(
+            user=self.user, company_name='Acme', position_title='Engineer', application_date=date.today(),
+            job_description='A long description', salary_min=100, salary_max=200,
+        )
+        self.interview = Interview.objects.create(
+            job_application=self.application, interview_type='phone', scheduled_date=timezone.now()
+        )
+        Note.objects.create(job_application=self.application, title='Note', content='Content')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # Leave out the conditional GET validators, which are read first
+        return response.data, [query['sql'] for query in queries][1:]
+
+    def test_detail_fields_skip_unused_columns_and_relations(self):
+        data, queries = self.get(f'/api/job-applications/{self.application.id}/?fields=id,company_name,salary_range')
+        self.assertEqual(data, {'id': self.application.id, 'company_name': 'Acme', 'salary_range': '$100 - $200'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('job_description', queries[0])
+        self.assertNotIn('auth_user', queries[0])
+
+    def test_expand_adds_nested_fields_to_a_sparse_fieldset(self):
+        data, queries = self.get(f'/api/job-applications/{self.application.id}/?fields=id&expand=interviews')
+        self.assertEqual(set(data), {'id', 'interviews'})
+        self.assertEqual(data['interviews'][0]['id'], self.interview.id)
+        # The application, then the interview prefetch; no notes
+        self.assertEqual(len(queries), 2)
+
+    def test_default_detail_response_is_unchanged(self):
+        data, _ = self.get(f'/api/job-applications/{self.application.id}/')
+        self.assertEqual(set(data), set(JobApplicationSerializer.Meta.fields))
+
+    def test_list_fields_skip_the_count_joins(self):
+        data, queries = self.get('/api/job-applications/?fields=id,company_name')
+        self.assertEqual(data['results'], [{'id': self.application.id, 'company_name': 'Acme'}])
+        self.assertFalse(any('jobs_interview' in sql for sql in queries))
+
+    def test_interviews_expand_their_application_with_a_join(self):
+        data, queries = self.get('/api/interviews/?fields=id,status&expand=job_application')
+        self.assertEqual(data['results'], [{
+            'id': self.interview.id, 'status': 'scheduled',
+            'job_application': {
+                'id': self.application.id, 'company_name': 'Acme', 'position_title': 'Engineer', 'status': 'applied',
+            },
+        }])
+        self.assertEqual(len(queries), 2)
+
+    def test_note_fields(self):
+        data, _ = self.get('/api/notes/?fields=title')
+        self.assertEqual(data['results'], [{'title': 'Note'}])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/job-applications/?fields=id,password&expand=secrets')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'fields', 'expand'})
+
+
+class FastSerializationTests(APITestCase):
+    """Tests that values() rows and the orjson renderer reproduce the serializers byte for byte"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='fast', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.request = APIRequestFactory().get('/api/job-applications/')
+        for index in range(15):
+            application = JobApplication.objects.create(
+                user=self.user, company_name=f'Café {index} ', position_title='Engineer',
+                application_date=date.today() - timedelta(days=index % 4),
+                salary_min=100 * index if index % 3 else None, salary_max=200 if index % 2 else None,
+                location='Zürich' if index % 2 else '', contact_email='hr@example.com',
+            )
+            if index % 5 == 0:
+                Interview.objects.create(
+                    job_application=application, interview_type='video', scheduled_date=timezone.now()
+                )
+                Interview.objects.create(
+                    job_application=application, interview_type='phone',
+                    scheduled_date=timezone.now() - timedelta(days=1), duration_minutes=30,
+                )
+                Note.objects.create(job_application=application, title='Note', content='Some content')
+
+    def serializer_bytes(self, serializer_class, queryset):
+        data = serializer_class(queryset, many=True, context={'request': self.request}).data
+        return JSONRenderer().render(data)
+
+    def test_list_rows_match_the_list_serializer(self):
+        queryset = JobApplication.objects.filter(user=self.user)
+        builder = get_row_builder(JobApplicationListSerializer(), queryset)
+        rows = builder.build(list(builder.values(queryset)))
+        self.assertEqual(
+            FastJSONRenderer().render(rows), self.serializer_bytes(JobApplicationListSerializer, queryset)
+        )
+
+    def test_detail_rows_match_the_detail_serializer(self):
+        queryset = JobApplication.objects.filter(user=self.user).select_related('user')
+        builder = get_row_builder(JobApplicationSerializer(), queryset)
+        rows = list(builder.iterate(queryset, chunk_size=4))
+        self.assertEqual(
+            FastJSONRenderer().render(rows), self.serializer_bytes(JobApplicationSerializer, queryset)
+        )
+
+    def test_unsupported_serializers_fall_back(self):
+        class CountingSerializer(JobApplicationListSerializer):
+            interview_total = serializers.SerializerMethodField()
+
+            class Meta(JobApplicationListSerializer.Meta):
+                fields = [*JobApplicationListSerializer.Meta.fields, 'interview_total']
+
+            def get_interview_total(self, obj):
+                return obj.interviews.count()
+
+        # Method fields without a matching annotation need the serializer
+        queryset = JobApplication.objects.filter(user=self.user)
+        self.assertIsNone(get_row_builder(CountingSerializer(), queryset))
+        self.assertIsNotNone(get_row_builder(
+            CountingSerializer(), queryset.annotate(interview_total=Count('interviews'))
+        ))
+
+    def test_list_endpoint_pages_match(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/job-applications/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 3)
+        expected = self.serializer_bytes(
+            JobApplicationListSerializer,
+            JobApplication.objects.filter(user=self.user)[:10],
+        )
+        self.assertIn(expected, response.content)
+
+    def test_list_endpoint_cursor_pages(self):
+        seen = []
+        url = '/api/job-applications/?pagination=cursor'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        expected = list(JobApplication.objects.filter(user=self.user).values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_sparse_list_still_uses_rows(self):
+        response = self.client.get('/api/job-applications/?fields=id,salary_range')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'salary_range'})
+
+    def test_export_matches_the_detail_serializer(self):
+        response = self.client.get('/api/job-applications/export/?type=ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        queryset = JobApplication.objects.filter(user=self.user).select_related('user')
+        expected = JobApplicationSerializer(queryset, many=True).data
+        self.assertEqual(rows, json.loads(json.dumps(expected, cls=DjangoJSONEncoder)))
+
+    def test_renderer_matches_json_renderer(self):
+        data = {
+            'text': 'Zürich     "quoted"', 'number': 1.5, 'decimal': Decimal('1.50'),
+            'when': timezone.now(), 'day': date.today(), 'nested': [{'a': None, 'b': True}], 1: 'int key',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class CompressionTests(APITestCase):
+    """Tests for gzip/brotli compression of API responses"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='compression', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        JobApplication.objects.bulk_create([
+            JobApplication(
+                user=self.user, company_name=f'Company {index}', position_title='Engineer',
+                application_date=date.today(), job_description='Build and run services. ' * 20,
+            )
+            for index in range(10)
+        ])
+
+    def test_large_json_is_gzipped(self):
+        plain = self.client.get('/api/job-applications/')
+        response = self.client.get('/api/job-applications/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_weak_etag_still_matches(self):
+        response = self.client.get('/api/job-applications/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        response = self.client.get(
+            '/api/job-applications/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_skipped_responses(self):
+        # No Accept-Encoding, gzip refused, too small, streaming
+        self.assertFalse(self.client.get('/api/job-applications/').has_header('Content-Encoding'))
+        response = self.client.get('/api/job-applications/', HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.client.get('/api/job-applications/dashboard_stats/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.client.get('/api/job-applications/export/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_browsable_api_html_is_not_compressed(self):
+        response = self.client.get(
+            '/api/job-applications/?q=<reflected>', HTTP_ACCEPT='text/html', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_gzip_length_is_padded(self):
+        lengths = {
+            len(self.client.get('/api/job-applications/', HTTP_ACCEPT_ENCODING='gzip').content) for _ in range(5)
+        }
+        self.assertGreater(len(lengths), 1)
+
+    def test_threshold_and_switch_come_from_settings(self):
+        with self.settings(API_COMPRESSION_MIN_SIZE=10):
+            response = self.client.get('/api/job-applications/dashboard_stats/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        with self.settings(API_COMPRESSION_ENABLED=False):
+            response = self.client.get('/api/job-applications/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(choose_encoding('*'), 'br' if brotli is not None else 'gzip')
+        self.assertEqual(choose_encoding('br;q=0.5, gzip;q=0.8'), 'gzip')
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding(''))
+
+    @skipUnless(brotli is not None, 'brotli is not installed')
+    def test_brotli_when_preferred(self):
+        response = self.client.get('/api/job-applications/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.client.get('/api/job-applications/').content)
+
+
+class SyntheticDataTests(APITestCase):
+    """Tests for the synthetic data used by the benchmarks"""
+
+    def test_seeded_history_is_consistent(self):
+        user = User.objects.create_user(username='synthetic', password='testpass123')
+        applications, interviews, notes = seed_applications(user, 120, seed=1, batch_size=50)
+        self.assertEqual(applications, 120)
+        self.assertEqual(Interview.objects.filter(job_application__user=user).count(), interviews)
+        self.assertEqual(Note.objects.filter(job_application__user=user).count(), notes)
+        self.assertGreater(interviews, 0)
+        # Stats and the search index are rebuilt although bulk_create sends no signals
+        self.assertEqual(check_user_stats([user.id]), [])
+        self.client.force_authenticate(user=user)
+        response = self.client.get('/api/job-applications/search/', {'q': 'python'})
+        self.assertGreater(response.data['count'], 0)
+
+    def test_seed_data_command(self):
+        call_command('seed_data', users=3, applications=40, prefix='seeded', password='secret123', stdout=io.StringIO())
+        users = User.objects.filter(username__startswith='seeded').order_by('username')
+        self.assertEqual([user.username for user in users], ['seeded1', 'seeded2', 'seeded3'])
+        # One hash computed once and shared, and it checks out
+        self.assertEqual(len({user.password for user in users}), 1)
+        self.assertTrue(users[0].check_password('secret123'))
+        self.assertEqual(JobApplication.objects.filter(user__in=users).count(), 120)
+        self.assertEqual(check_user_stats([user.id for user in users]), [])
+        with self.assertRaises(CommandError):
+            call_command('seed_data', users=1, prefix='seeded', stdout=io.StringIO())
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTests(APITestCase):
+    """Tests for the per-request SQL and timing instrumentation"""
+
+    def setUp(self):
+        cache.clear()
+        endpoint_metrics.reset()
+        self.user = User.objects.create_user(username='metrics', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.application = JobApplication.objects.create(
+            user=self.user, company_name='Acme', position_title='Engineer', application_date=date.today()
+        )
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs('jobs.metrics', 'INFO') as logs:
+            response = self.client.get('/api/job-applications/')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+, total;dur=[\d.]+$')
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['endpoint'], 'GET jobapplication-list')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['user_id'], self.user.id)
+        self.assertGreater(record['queries'], 0)
+
+    def test_repeated_queries_are_reported(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for _ in range(3):
+                list(JobApplication.objects.filter(pk=self.application.pk))
+            for pk in range(5):
+                list(Note.objects.filter(pk=pk))
+        self.assertEqual(recorder.count, 8)
+        self.assertEqual(recorder.duplicates(), 2)
+        self.assertEqual(list(recorder.repeated(5).values()), [5])
+
+    def test_async_requests_are_recorded_without_a_sync_middleware(self):
+        async def get_response(request):
+            pass
+        self.assertTrue(iscoroutinefunction(RequestMetricsMiddleware(get_response)))
+
+        token = Token.objects.create(user=self.user)
+        with self.assertLogs('jobs.metrics', 'INFO') as logs:
+            response = async_to_sync(self.async_client.get)(
+                '/api/async/job-applications/', headers={'authorization': f'Token {token.key}'}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('Server-Timing'))
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['path'], '/api/async/job-applications/')
+        # The token lookup and the page are read through the async ORM
+        self.assertGreaterEqual(record['queries'], 2)
+
+    def test_streaming_responses_are_recorded_when_iterated(self):
+        with self.assertLogs('jobs.metrics', 'INFO') as logs:
+            response = self.client.get('/api/job-applications/export/')
+            self.assertEqual(logs.records, [])
+            b''.join(response.streaming_content)
+        self.assertFalse(response.has_header('Server-Timing'))
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['endpoint'], 'GET jobapplication-export')
+        # The applications and their prefetched notes are read while streaming
+        self.assertGreaterEqual(record['queries'], 2)
+
+    def test_metrics_view_is_admin_only(self):
+        with self.assertLogs('jobs.metrics', 'INFO'):
+            self.client.get('/api/job-applications/')
+            self.client.get('/api/job-applications/')
+            self.assertEqual(self.client.get('/api/_metrics/').status_code, 403)
+
+            admin = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+            self.client.force_authenticate(user=admin)
+            data = self.client.get('/api/_metrics/').data
+        endpoints = {item['endpoint']: item for item in data['endpoints']}
+        self.assertEqual(endpoints['GET jobapplication-list']['requests'], 2)
+        with self.assertLogs('jobs.metrics', 'INFO'):
+            self.assertEqual(self.client.delete('/api/_metrics/').status_code, 204)
+        # Only the reset itself has been recorded since
+        self.assertEqual([item['endpoint'] for item in endpoint_metrics.snapshot()['endpoints']], ['DELETE metrics'])
+
+    def test_disabled_by_default(self):
+        with self.settings(REQUEST_METRICS_ENABLED=False):
+            response = self.client.get('/api/job-applications/')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class ProfilingTests(APITestCase):
+    """Tests for the viewset request profiler and the profile_summary command"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = self.settings(API_PROFILE_DIR=self.directory, API_PROFILE_SAMPLE_RATE=0, API_PROFILE_SLOW_MS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = User.objects.create_user(username='profiled', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        JobApplication.objects.create(
+            user=self.user, company_name='Acme', position_title='Engineer', application_date=date.today()
+        )
+
+    def profiles(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_sampled_requests_are_profiled(self):
+        with self.settings(API_PROFILE_SAMPLE_RATE=100):
+            self.assertEqual(self.client.get('/api/job-applications/').status_code, 200)
+            # Only viewset requests are profiled
+            self.client.get('/api/_metrics/')
+        [name] = self.profiles()
+        endpoint, _, mode = parse_filename(name)
+        self.assertEqual((endpoint, mode), ('GET jobapplication-list', 'cprofile'))
+        stats = pstats.Stats(os.path.join(self.directory, name))
+        self.assertTrue(any(function == 'list' for _, _, function in stats.stats))
+
+    def test_viewsets_are_profiled_under_asgi(self):
+        async def get_response(request):
+            pass
+        self.assertTrue(iscoroutinefunction(ProfilingMiddleware(get_response)))
+
+        token = Token.objects.create(user=self.user)
+        with self.settings(API_PROFILE_SAMPLE_RATE=100):
+            response = async_to_sync(self.async_client.get)(
+                '/api/job-applications/', headers={'authorization': f'Token {token.key}'}
+            )
+        self.assertEqual(response.status_code, 200)
+        [name] = self.profiles()
+        stats = pstats.Stats(os.path.join(self.directory, name))
+        # The profiler ran on the thread that executed the sync viewset
+        self.assertTrue(any(function == 'list' for _, _, function in stats.stats))
+
+    def test_disabled_by_default(self):
+        self.client.get('/api/job-applications/')
+        self.assertEqual(self.profiles(), [])
+
+    def test_old_profiles_are_rotated(self):
+        with self.settings(API_PROFILE_SAMPLE_RATE=100, API_PROFILE_MAX_FILES=2):
+            for _ in range(4):
+                self.client.get('/api/job-applications/')
+        self.assertEqual(len(self.profiles()), 2)
+
+    def test_slow_requests_are_sampled(self):
+        original = JobApplicationViewSet.list
+
+        def slow_list(view, request, *args, **kwargs):
+            time.sleep(0.05)
+            return original(view, request, *args, **kwargs)
+
+        with mock.patch.object(JobApplicationViewSet, 'list', slow_list):
+            with self.settings(API_PROFILE_SLOW_MS=10_000):
+                self.client.get('/api/job-applications/')
+            self.assertEqual(self.profiles(), [])
+            with self.settings(API_PROFILE_SLOW_MS=20, API_PROFILE_INTERVAL_MS=1):
+                self.client.get('/api/job-applications/')
+        [name] = self.profiles()
+        self.assertEqual(parse_filename(name)[2], 'sampled')
+        stats = pstats.Stats(os.path.join(self.directory, name))
+        self.assertTrue(any(function == 'slow_list' for _, _, function in stats.stats))
+
+    def test_samples_to_stats(self):
+        leaf, middle, root = ('a.py', 1, 'leaf'), ('a.py', 5, 'middle'), ('a.py', 9, 'root')
+        stats = samples_to_stats({(leaf, middle, root): 3, (middle, root): 1}, 0.01)
+        self.assertEqual(stats[leaf][:4], (3, 3, 0.03, 0.03))
+        self.assertAlmostEqual(stats[middle][2], 0.01)
+        self.assertAlmostEqual(stats[root][3], 0.04)
+        self.assertEqual(stats[leaf][4], {middle: (3, 3, 0.03, 0.03)})
+
+    def test_stack_sampler(self):
+        sampler = StackSampler()
+        samples = sampler.register(threading.get_ident(), 0.001)
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+        sampler.unregister(threading.get_ident())
+        self.assertTrue(samples)
+        self.assertTrue(any(function == 'test_stack_sampler' for stack in samples for _, _, function in stack))
+
+    def test_profile_summary_command(self):
+        with self.settings(API_PROFILE_SAMPLE_RATE=100):
+            self.client.get('/api/job-applications/')
+            self.client.get('/api/job-applications/')
+            self.client.get('/api/interviews/')
+        output = io.StringIO()
+        call_command('profile_summary', limit=5, stdout=output)
+        output = output.getvalue()
+        self.assertIn('GET jobapplication-list (cprofile): 2 profiles', output)
+        self.assertIn('GET interview-list (cprofile): 1 profiles', output)
+
+        output = io.StringIO()
+        call_command('profile_summary', endpoint='interview', sort='cumulative', stdout=output)
+        self.assertNotIn('jobapplication', output.getvalue())
+
+
+class ApplicationCounterTests(APITestCase):
+    """Tests for the denormalized interview and note counters on applications"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='counted', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.application = self.create_application('Acme')
+        self.other = self.create_application('Globex')
+
+    def create_application(self, company_name):
+        return JobApplication.objects.create(
+            user=self.user, company_name=company_name, position_title='Engineer', application_date=date.today()
+        )
+
+    def schedule(self, application, days, status='scheduled'):
+        return Interview.objects.create(
+            job_application=application, interview_type='phone', status=status,
+            scheduled_date=timezone.now() + timedelta(days=days),
+        )
+
+    def counters(self, application):
+        return JobApplication.objects.values_list('interview_count', 'note_count', 'next_interview_at').get(
+            pk=application.pk
+        )
+
+    def test_counters_follow_creates_updates_and_deletes(self):
+        later = self.schedule(self.application, 5)
+        sooner = self.schedule(self.application, 2)
+        self.schedule(self.application, 1, status='cancelled')
+        note = Note.objects.create(job_application=self.application, title='Note', content='Content')
+        self.assertEqual(self.counters(self.application), (3, 1, sooner.scheduled_date))
+
+        sooner.status = 'completed'
+        sooner.save()
+        self.assertEqual(self.counters(self.application), (3, 1, later.scheduled_date))
+
+        later.delete()
+        note.delete()
+        self.assertEqual(self.counters(self.application), (2, 0, None))
+        self.assertEqual(check_application_counters([self.user.id]), [])
+
+    def test_reassigned_children_move_their_counts(self):
+        interview = self.schedule(self.application, 3)
+        note = Note.objects.create(job_application=self.application, title='Note', content='Content')
+        interview.job_application = self.other
+        interview.save()
+        note.job_application = self.other
+        note.save()
+        self.assertEqual(self.counters(self.application), (0, 0, None))
+        self.assertEqual(self.counters(self.other), (1, 1, interview.scheduled_date))
+
+    def test_saving_a_stale_application_keeps_the_counters(self):
+        stale = JobApplication.objects.get(pk=self.application.pk)
+        self.schedule(self.application, 3)
+        before = JobApplication.objects.get(pk=self.application.pk).last_activity_at
+        stale.status = 'interview'
+        stale.save()
+        application = JobApplication.objects.get(pk=self.application.pk)
+        self.assertEqual((application.status, application.interview_count), ('interview', 1))
+        self.assertGreaterEqual(application.last_activity_at, before)
+
+    def test_bulk_and_cascading_deletes(self):
+        for _ in range(3):
+            Note.objects.create(job_application=self.application, title='Note', content='Content')
+        self.schedule(self.other, 1)
+        Note.objects.filter(job_application=self.application)[:1].get().delete()
+        Note.objects.filter(job_application=self.application).delete()
+        self.assertEqual(self.counters(self.application)[1], 0)
+        # Deleting the application skips the per-child counter updates
+        with CaptureQueriesContext(connection) as queries:
+            self.other.delete()
+        self.assertFalse([query for query in queries if 'interview_count' in query['sql']])
+
+    def test_synthetic_data_counters_are_consistent(self):
+        seed_applications(self.user, 40, seed=3)
+        self.assertEqual(check_application_counters([self.user.id]), [])
+        self.assertGreater(JobApplication.objects.filter(user=self.user, interview_count__gt=0).count(), 0)
+
+    def test_check_and_rebuild_commands(self):
+        self.schedule(self.application, 1)
+        JobApplication.objects.filter(pk=self.application.pk).update(interview_count=7, next_interview_at=None)
+        with self.assertRaises(CommandError):
+            call_command('check_counters', stdout=io.StringIO())
+
+        output = io.StringIO()
+        call_command('check_counters', fix=True, stdout=output)
+        self.assertIn(f'Application {self.application.pk}: interview_count is 7, expected 1', output.getvalue())
+        self.assertEqual(check_application_counters(), [])
+
+        JobApplication.objects.update(note_count=3)
+        output = io.StringIO()
+        call_command('rebuild_counters', user_ids=[self.user.id], stdout=output)
+        self.assertIn('Rebuilt counters for 2 applications', output.getvalue())
+        self.assertEqual(check_application_counters(), [])
+
+    def test_list_reads_counters_without_joins(self):
+        self.schedule(self.application, 1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/job-applications/')
+        row = next(row for row in response.data['results'] if row['id'] == self.application.pk)
+        self.assertEqual(row['interview_count'], 1)
+        self.assertIsNotNone(row['next_interview_at'])
+        self.assertFalse([query for query in queries if 'JOIN' in query['sql']])
+
+    def test_list_ordering(self):
+        applications = [self.create_application(f'Company {index}') for index in range(6)]
+        for days, application in zip([4, 1, 3], applications):
+            self.schedule(application, days)
+        expected = [applications[1].pk, applications[2].pk, applications[0].pk]
+
+        response = self.client.get('/api/job-applications/?ordering=next_interview')
+        ids = [row['id'] for row in response.data['results']]
+        self.assertEqual(ids[:3], expected)
+        self.assertEqual(len(ids), 8)
+
+        # Keyset pages walk through the rows without a next interview too, both ways
+        seen, pages = [], []
+        url = '/api/job-applications/?ordering=next_interview&pagination=cursor&page_size=3'
+        with mock.patch('jobs.pagination.KeysetPagination.page_size', 3):
+            while url:
+                response = self.client.get(url)
+                pages.append(response.data)
+                seen.extend(row['id'] for row in response.data['results'])
+                url = response.data['next']
+            self.assertEqual(seen, ids)
+            back = self.client.get(pages[-1]['previous']).data
+        self.assertEqual([row['id'] for row in back['results']], ids[3:6])
+
+        Note.objects.create(job_application=applications[5], title='Note', content='Content')
+        response = self.client.get('/api/job-applications/?ordering=recent_activity')
+        self.assertEqual(response.data['results'][0]['id'], applications[5].pk)
+        self.assertEqual(self.client.get('/api/job-applications/?ordering=salary').status_code, 400)
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import JobApplicationViewSet, InterviewViewSet, NoteViewSet, welcome
+from . import async_views
+from .views import JobApplicationViewSet, InterviewViewSet, NoteViewSet, metrics, welcome
 
 # Create a router and register our viewsets with it
 router = DefaultRouter()
@@ -11,5 +12,11 @@ router.register(r'notes', NoteViewSet, basename='note')
 # The API URLs are now determined automatically by the router
 urlpatterns = [
     path('', welcome, name='welcome'),
+    path('api/_metrics/', metrics, name='metrics'),
     path('api/', include(router.urls)),
+    # Async versions of the read-heavy endpoints, for ASGI deployments
+    path('api/async/job-applications/', async_views.job_application_list, name='async-jobapplication-list'),
+    path('api/async/job-applications/dashboard_stats/', async_views.dashboard_stats, name='async-dashboard-stats'),
+    path('api/async/interviews/upcoming/', async_views.upcoming_interviews, name='async-interview-upcoming'),
+    path('api/async/interviews/calendar/', async_views.interview_calendar, name='async-interview-calendar'),
 ] 
\ No newline at end of file
@@ -1,30 +1,92 @@
 from django.shortcuts import render
 from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
-from datetime import datetime, timedelta
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 
+from .caching import CachedReadMixin, cache_response
+from .calendar_feed import COMPACT_FIELDS, CalendarRangeError, calendar_bounds, compact_row, stream_ics
+from .conditional import ConditionalGetMixin
+from .export import EXPORT_FORMATS
+from .fields import SparseFieldsetMixin
+from .importer import PARSERS, ImportFileError, import_applications
+from .metrics import endpoint_metrics
 from .models import JobApplication, Interview, Note
+from .pagination import OptionalKeysetPagination, ordering_terms
+from .rows import FastListMixin
+from .search import SearchResults, get_search_backend
+from .signals import bulk_changed, suspend_tracking
+from .stats import get_dashboard_stats
 from .serializers import (
     JobApplicationSerializer, JobApplicationListSerializer,
     InterviewSerializer, InterviewCreateSerializer,
-    NoteSerializer, NoteCreateSerializer
+    NoteSerializer, NoteCreateSerializer, parse_id
 )
 
 
-class JobApplicationViewSet(viewsets.ModelViewSet):
+class JobApplicationViewSet(
+    SparseFieldsetMixin, ConditionalGetMixin, CachedReadMixin, FastListMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for JobApplication model
     Provides CRUD operations for job applications
     """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalKeysetPagination
+    sparse_fieldset_actions = ['list', 'retrieve', 'bulk']
+    
+    # Upper bound on the number of ids accepted by the bulk retrieve endpoint
+    max_bulk_ids = 100
+    # Upper bound on the number of items accepted by the bulk write endpoints
+    max_bulk_items = 5000
+    # ?ordering= values accepted by the list, each backed by an index
+    list_orderings = {
+        'next_interview': ['next_interview_at', 'id'],
+        'recent_activity': ['-last_activity_at', '-id'],
+    }
     
     def get_queryset(self):
         """Return job applications for the current user"""
-        return JobApplication.objects.filter(user=self.request.user)
+        queryset = JobApplication.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            return self.get_list_queryset(queryset)
+        if self.action in ['bulk_create', 'bulk_update', 'bulk_destroy', 'import_file']:
+            return queryset
+        return self.get_detail_queryset(queryset)
+    
+    @property
+    def keyset_ordering(self):
+        """The list ordering picked with ?ordering=, which keyset pagination follows too"""
+        name = self.request.query_params.get('ordering')
+        if self.action != 'list' or not name:
+            return None
+        if name not in self.list_orderings:
+            raise ValidationError({'ordering': [f'Must be one of: {", ".join(self.list_orderings)}']})
+        return self.list_orderings[name]
+    
+    def get_list_queryset(self, queryset):
+        """The counts are columns kept up to date by jobs.counters, so the list needs no joins"""
+        ordering = self.keyset_ordering or JobApplication._meta.ordering
+        return self.sparse_queryset(queryset.order_by(*ordering_terms(JobApplication, ordering)))
+    
+    def get_detail_queryset(self, queryset):
+        """Join the user and prefetch the nested interviews and notes that are shown"""
+        if self.wants_field('user'):
+            queryset = queryset.select_related('user')
+        if self.wants_field('interviews'):
+            queryset = queryset.prefetch_related(
+                Prefetch('interviews', queryset=Interview.objects.order_by('scheduled_date'))
+            )
+        if self.wants_field('notes'):
+            queryset = queryset.prefetch_related(Prefetch('notes', queryset=Note.objects.order_by('-created_at')))
+        return self.sparse_queryset(queryset)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -39,74 +101,164 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
         """Get dashboard statistics for the user"""
-        user_applications = self.get_queryset()
-        
-        # Status counts
-        status_counts = user_applications.values('status').annotate(
-            count=Count('id')
-        ).order_by('status')
-        
-        # Recent applications (last 30 days)
-        thirty_days_ago = timezone.now().date() - timedelta(days=30)
-        recent_applications = user_applications.filter(
-            application_date__gte=thirty_days_ago
-        ).count()
-        
-        # Upcoming interviews
-        upcoming_interviews = Interview.objects.filter(
-            job_application__user=request.user,
-            scheduled_date__gte=timezone.now(),
-            status='scheduled'
-        ).count()
-        
-        # Total applications
-        total_applications = user_applications.count()
-        
-        # Applications by month (last 6 months)
-        six_months_ago = timezone.now().date() - timedelta(days=180)
-        monthly_applications = user_applications.filter(
-            application_date__gte=six_months_ago
-        ).extra(
-            select={'month': "EXTRACT(month FROM application_date)"}
-        ).values('month').annotate(count=Count('id')).order_by('month')
-        
-        return Response({
-            'status_counts': status_counts,
-            'recent_applications': recent_applications,
-            'upcoming_interviews': upcoming_interviews,
-            'total_applications': total_applications,
-            'monthly_applications': monthly_applications,
-        })
+        return Response(get_dashboard_stats(request.user))
     
     @action(detail=False, methods=['get'])
+    @cache_response
     def search(self, request):
-        """Search job applications"""
+        """Full-text search over job applications, ranked and highlighted"""
         query = request.query_params.get('q', '')
         if not query:
             return Response({'error': 'Query parameter "q" is required'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        queryset = self.get_queryset().filter(
-            Q(company_name__icontains=query) |
-            Q(position_title__icontains=query) |
-            Q(location__icontains=query) |
-            Q(notes__icontains=query)
-        ).distinct()
+        results = SearchResults(get_search_backend(), request.user.id, query)
+        paginator = PageNumberPagination()
+        hits = paginator.paginate_queryset(results, request, view=self)
+        
+        applications = self.get_list_queryset(
+            JobApplication.objects.filter(user=request.user, id__in=[hit.application_id for hit in hits])
+        )
+        applications = {application.id: application for application in applications}
+        hits = [hit for hit in hits if hit.application_id in applications]
         
+        serializer = JobApplicationListSerializer(
+            [applications[hit.application_id] for hit in hits], many=True,
+            context=self.get_serializer_context()
+        )
+        data = serializer.data
+        for row, hit in zip(data, hits):
+            row['rank'] = hit.rank
+            row['highlight'] = hit.highlight
+        return paginator.get_paginated_response(data)
+    
+    @action(detail=False, methods=['get'])
+    @cache_response
+    def bulk(self, request):
+        """Retrieve full job applications for a list of ids (?ids=1,2,3)"""
+        ids = request.query_params.get('ids', '')
+        try:
+            id_list = [int(value) for value in ids.split(',') if value.strip()]
+        except ValueError:
+            return Response({'error': 'Query parameter "ids" must be a comma-separated list of integers'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        if not id_list:
+            return Response({'error': 'Query parameter "ids" is required'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        if len(id_list) > self.max_bulk_ids:
+            return Response({'error': f'At most {self.max_bulk_ids} ids can be requested at once'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.get_queryset().filter(id__in=id_list)
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the user's full application history as CSV (default) or NDJSON (?type=ndjson)"""
+        export_type = request.query_params.get('type', 'csv')
+        if export_type not in EXPORT_FORMATS:
+            return Response({'error': f'Query parameter "type" must be one of: {", ".join(EXPORT_FORMATS)}'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        content_type, extension, stream = EXPORT_FORMATS[export_type]
+        response = StreamingHttpResponse(
+            stream(self.get_queryset(), self.get_serializer_context()), content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="job-applications.{extension}"'
+        return response
+    
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """Import applications from an uploaded CSV or JSON file, skipping duplicates"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'A "file" upload is required'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        file_type = request.query_params.get('type') or upload.name.rsplit('.', 1)[-1].lower()
+        if file_type not in PARSERS:
+            return Response({'error': f'File type must be one of: {", ".join(PARSERS)}'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            result = import_applications(request.user, upload, file_type)
+        except ImportFileError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict(), status=status.HTTP_201_CREATED if result.created else status.HTTP_200_OK)
+    
+    @bulk.mapping.post
+    def bulk_create(self, request):
+        """Create many job applications in one transaction"""
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.max_bulk_items)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            applications = serializer.save(user=request.user)
+            ids = [application.id for application in applications]
+            bulk_changed.send(sender=JobApplication, user_id=request.user.id, application_ids=ids)
+        return Response({'created': len(ids), 'ids': ids}, status=status.HTTP_201_CREATED)
+    
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """Partially update many job applications in one transaction; every item needs an id"""
+        ids = []
+        if isinstance(request.data, list):
+            for item in request.data:
+                try:
+                    ids.append(parse_id(item['id']))
+                except (KeyError, TypeError, ValidationError):
+                    pass
+        applications = self.get_queryset().in_bulk(ids[:self.max_bulk_items])
+        serializer = self.get_serializer(
+            applications, data=request.data, many=True, partial=True, max_length=self.max_bulk_items
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            applications = serializer.save()
+            ids = [application.id for application in applications]
+            bulk_changed.send(sender=JobApplication, user_id=request.user.id, application_ids=ids)
+        return Response({'updated': len(ids), 'ids': ids})
+    
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        """Delete many job applications in one transaction (body: {"ids": [1, 2, 3]})"""
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        # bool is a subclass of int, but true is not an id
+        if not isinstance(ids, list) or not ids or not all(
+            isinstance(value, int) and not isinstance(value, bool) for value in ids
+        ):
+            return Response({'error': 'Body must contain a non-empty list of integer "ids"'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        if len(set(ids)) != len(ids):
+            return Response({'error': '"ids" must not contain duplicates'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.max_bulk_items:
+            return Response({'error': f'At most {self.max_bulk_items} ids can be deleted at once'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            queryset = self.get_queryset().filter(id__in=ids)
+            deleted_ids = list(queryset.values_list('id', flat=True))
+            with suspend_tracking():
+                queryset.delete()
+            bulk_changed.send(sender=JobApplication, user_id=request.user.id, application_ids=deleted_ids)
+        return Response({'deleted': len(deleted_ids), 'ids': deleted_ids})
 
 
-class InterviewViewSet(viewsets.ModelViewSet):
+class InterviewViewSet(SparseFieldsetMixin, ConditionalGetMixin, CachedReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for Interview model
     Provides CRUD operations for interviews
     """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalKeysetPagination
+    sparse_fieldset_actions = ['list', 'retrieve', 'upcoming', 'calendar']
     
     def get_queryset(self):
         """Return interviews for job applications owned by the current user"""
-        return Interview.objects.filter(job_application__user=self.request.user)
+        queryset = Interview.objects.filter(job_application__user=self.request.user)
+        selected = self.get_sparse_fieldset()
+        if selected and 'job_application' in selected:
+            queryset = queryset.select_related('job_application')
+        return self.sparse_queryset(queryset)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -115,6 +267,7 @@ class InterviewViewSet(viewsets.ModelViewSet):
         return InterviewSerializer
     
     @action(detail=False, methods=['get'])
+    @cache_response
     def upcoming(self, request):
         """Get upcoming interviews"""
         queryset = self.get_queryset().filter(
@@ -126,38 +279,54 @@ class InterviewViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @cache_response
     def calendar(self, request):
-        """Get interviews for calendar view"""
-        start_date = request.query_params.get('start')
-        end_date = request.query_params.get('end')
+        """
+        Get interviews for calendar view
+        ?start=&end= are inclusive days (default: the six weeks from the start of this month)
+        and ?tz= the time zone they are in; ?type=compact returns only what a calendar cell
+        shows and ?type=ics streams an iCalendar feed
+        """
+        try:
+            start, end = calendar_bounds(
+                request.query_params.get('start'), request.query_params.get('end'), request.query_params.get('tz')
+            )
+        except CalendarRangeError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         
-        queryset = self.get_queryset()
+        # Half-open bounds on the column itself so the scheduled_date indexes apply
+        queryset = self.get_queryset().filter(scheduled_date__gte=start, scheduled_date__lt=end)
         
-        if start_date and end_date:
-            try:
-                start = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end = datetime.strptime(end_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(
-                    scheduled_date__date__range=[start, end]
-                )
-            except ValueError:
-                return Response({'error': 'Invalid date format'}, 
-                              status=status.HTTP_400_BAD_REQUEST)
+        payload = request.query_params.get('type', 'full')
+        if payload == 'ics':
+            response = StreamingHttpResponse(stream_ics(queryset, request.get_host()), content_type='text/calendar; charset=utf-8')
+            response['Content-Disposition'] = 'attachment; filename="interviews.ics"'
+            return response
+        if payload == 'compact':
+            return Response([compact_row(row) for row in queryset.values(*COMPACT_FIELDS)])
+        if payload != 'full':
+            return Response({'error': 'type must be one of: full, compact, ics'},
+                          status=status.HTTP_400_BAD_REQUEST)
         
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
 
-class NoteViewSet(viewsets.ModelViewSet):
+class NoteViewSet(SparseFieldsetMixin, ConditionalGetMixin, CachedReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for Note model
     Provides CRUD operations for notes
     """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalKeysetPagination
     
     def get_queryset(self):
         """Return notes for job applications owned by the current user"""
-        return Note.objects.filter(job_application__user=self.request.user)
+        queryset = Note.objects.filter(job_application__user=self.request.user)
+        selected = self.get_sparse_fieldset()
+        if selected and 'job_application' in selected:
+            queryset = queryset.select_related('job_application')
+        return self.sparse_queryset(queryset)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -165,6 +334,17 @@ class NoteViewSet(viewsets.ModelViewSet):
             return NoteCreateSerializer
         return NoteSerializer
 
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAdminUser])
+def metrics(request):
+    """Per-endpoint request metrics of this worker process (DELETE resets them)"""
+    if request.method == 'DELETE':
+        endpoint_metrics.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response({'enabled': settings.REQUEST_METRICS_ENABLED, **endpoint_metrics.snapshot()})
+
+
 def welcome(request):
     return HttpResponse('''
     <html>
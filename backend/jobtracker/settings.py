@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from decouple import config
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -54,6 +55,7 @@ INSTALLED_APPS = [
     
     # Third party apps
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     
     # Local apps
@@ -65,6 +67,9 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be at the top
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files
+    'jobs.metrics.RequestMetricsMiddleware',  # Opt-in, see REQUEST_METRICS_ENABLED
+    'jobs.profiling.ProfilingMiddleware',  # Opt-in, see API_PROFILE_SAMPLE_RATE / API_PROFILE_SLOW_MS
+    'jobs.compression.CompressionMiddleware',  # Compresses /api/ responses
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -103,6 +108,8 @@ if DEBUG:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Seconds to wait for another writer (e.g. seed_data --workers) before "database is locked"
+            'OPTIONS': {'timeout': 30},
         }
     }
 else:
@@ -115,9 +122,28 @@ else:
             'PASSWORD': config('DB_PASSWORD'),
             'HOST': config('DB_HOST'),
             'PORT': config('DB_PORT', default='5432'),
+            # Keep connections open across requests instead of a new TLS handshake each time,
+            # and check them before reuse so one dropped by the server is replaced, not failed
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'OPTIONS': {},
         }
     }
 
+    # In-process connection pool shared by a worker's threads; needs psycopg 3 (psycopg[binary,pool])
+    if config('DB_POOL', default=False, cast=bool):
+        DATABASES['default']['CONN_MAX_AGE'] = 0  # Django requires this with a pool
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=4, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+
+    # Behind PgBouncer in transaction mode (e.g. Neon's "-pooler" host) a transaction may run on
+    # a different server connection than the cursor was declared on, so keep cursors client-side
+    if config('DB_PGBOUNCER', default=False, cast=bool):
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -173,16 +199,101 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedBasicAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'jobs.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
 }
 
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared cache in
+# production (e.g. django.core.cache.backends.redis.RedisCache and a redis:// URL)
+# or at django.core.cache.backends.filebased.FileBasedCache and a directory
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='jobtracker'),
+    }
+}
+
+# Cache backends private to each worker process: invalidations made by one worker never
+# reach the others, so caches that are invalidated on writes need a shared backend
+PROCESS_LOCAL_CACHE_BACKENDS = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+]
+
+# Response cache for the read-only API actions (see jobs/caching.py); on by default
+# only with a shared cache backend
+API_CACHE_ALIAS = config('API_CACHE_ALIAS', default='default')
+API_CACHE_ENABLED = config(
+    'API_CACHE_ENABLED',
+    default=CACHES.get(API_CACHE_ALIAS, {}).get('BACKEND') not in PROCESS_LOCAL_CACHE_BACKENDS,
+    cast=bool,
+)
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds a user's dashboard statistics stay cached; writes invalidate them early. Only used with
+# a shared cache, since the invalidation would not reach other workers' local memory caches
+DASHBOARD_STATS_CACHE_TIMEOUT = config('DASHBOARD_STATS_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds a token -> user lookup stays cached; logout, token changes and user changes drop it early,
+# but only from a shared cache: with a per-process one the other workers keep accepting a deleted
+# token until their entry expires, so the default there is a short revocation window
+AUTH_TOKEN_CACHE_TIMEOUT = config(
+    'AUTH_TOKEN_CACHE_TIMEOUT',
+    default=5 if CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHE_BACKENDS else 300,
+    cast=int,
+)
+
+# Seconds a Basic auth password that checked out is remembered, skipping its PBKDF2 hash; 0 hashes every
+# request. Password changes and deactivation drop the entry only from a shared cache, so like the token
+# cache the default is a short window with a per-process one
+BASIC_AUTH_CACHE_TIMEOUT = config(
+    'BASIC_AUTH_CACHE_TIMEOUT',
+    default=5 if CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHE_BACKENDS else 60,
+    cast=int,
+)
+
+# gzip/brotli compression of /api/ responses (see jobs/compression.py); brotli needs the brotli package
+API_COMPRESSION_ENABLED = config('API_COMPRESSION_ENABLED', default=True, cast=bool)
+API_COMPRESSION_MIN_SIZE = config('API_COMPRESSION_MIN_SIZE', default=1024, cast=int)
+API_COMPRESSION_GZIP_LEVEL = config('API_COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+API_COMPRESSION_BROTLI_QUALITY = config('API_COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+
+# Per-request query counts and timings (see jobs/metrics.py): Server-Timing headers,
+# JSON log lines on the jobs.metrics logger and per-endpoint totals at /api/_metrics/
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=False, cast=bool)
+# Runs of the same SQL within one request that are reported as a likely N+1 pattern
+REQUEST_METRICS_REPEAT_THRESHOLD = config('REQUEST_METRICS_REPEAT_THRESHOLD', default=5, cast=int)
+
+# Profiles of viewset requests (see jobs/profiling.py): a percentage run under cProfile,
+# and/or stack samples kept for requests slower than API_PROFILE_SLOW_MS; 0 turns either off
+API_PROFILE_SAMPLE_RATE = config('API_PROFILE_SAMPLE_RATE', default=0.0, cast=float)
+API_PROFILE_SLOW_MS = config('API_PROFILE_SLOW_MS', default=0, cast=int)
+API_PROFILE_INTERVAL_MS = config('API_PROFILE_INTERVAL_MS', default=5, cast=int)
+API_PROFILE_DIR = config('API_PROFILE_DIR', default=os.path.join(tempfile.gettempdir(), 'jobtracker-profiles'))
+API_PROFILE_MAX_FILES = config('API_PROFILE_MAX_FILES', default=200, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'jobs.metrics': {'handlers': ['console'], 'level': config('REQUEST_METRICS_LOG_LEVEL', default='INFO')},
+    },
+}
+
 # CORS settings (for frontend communication)
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # React development server
@@ -202,6 +313,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Let the frontend read the validators used for conditional GETs
+CORS_EXPOSE_HEADERS = ['ETag']
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
@@ -17,10 +17,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.authtoken import views as auth_views
+from users import views as user_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('jobs.urls')),  # Include jobs app URLs
     path('api-auth/', include('rest_framework.urls')),  # DRF browsable API auth
     path('api-token-auth/', auth_views.obtain_auth_token),  # Token authentication
+    path('api-token-auth/logout/', user_views.logout),  # Deletes the caller's token
 ]
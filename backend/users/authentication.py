@@ -0,0 +1,94 @@
+"""
+Token and Basic authentication with verified credentials cached
+
+TokenAuthentication joins the token and user tables on every request. The
+cached class keeps the resolved token, with its user, in the cache for
+AUTH_TOKEN_CACHE_TIMEOUT seconds. Deleting a token (logout or rotation) and
+saving its user (e.g. deactivation) drop the entry, see users.signals. That
+only reaches every worker process with a shared cache; with the per-process
+local memory cache, other workers accept a revoked token for up to
+AUTH_TOKEN_CACHE_TIMEOUT seconds, which therefore defaults to 5 there.
+
+BasicAuthentication hashes the password (PBKDF2) on every request. The
+cached class stores a keyed digest of a password that checked out, with the
+user, for BASIC_AUTH_CACHE_TIMEOUT seconds, so repeat requests compare
+digests instead. Saving the user drops the entry, under the old username
+too when it changed; with a per-process cache, other workers accept the old
+password or a deactivated user for up to BASIC_AUTH_CACHE_TIMEOUT seconds,
+which defaults to 5 there.
+"""
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication
+
+
+def token_cache_key(key):
+    # Hash the key so raw credentials never end up in cache keys
+    return f'users:token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def invalidate_tokens(keys):
+    """Drop the cached lookups of the given token keys"""
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that resolves each token from the database at most once per timeout"""
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            cache.set(cache_key, token, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
+
+
+def basic_cache_key(username):
+    return f'users:basic:{hashlib.sha256(username.encode()).hexdigest()}'
+
+
+def invalidate_basic_credentials(username):
+    """Drop the cached credentials of a username"""
+    cache.delete(basic_cache_key(username))
+
+
+def password_digest(username, password):
+    # Keyed with SECRET_KEY so a cache dump reveals nothing that can be brute-forced offline
+    message = f'{username}:{password}'.encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """BasicAuthentication that hashes each user's password at most once per timeout"""
+
+    def authenticate_credentials(self, userid, password, request=None):
+        timeout = settings.BASIC_AUTH_CACHE_TIMEOUT
+        if not timeout:
+            return super().authenticate_credentials(userid, password, request)
+
+        cache_key = basic_cache_key(userid)
+        digest = password_digest(userid, password)
+        cached = cache.get(cache_key)
+        if cached is not None and hmac.compare_digest(cached[0], digest):
+            user = cached[1]
+            if not user.is_active:
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+            return (user, None)
+
+        user, auth = super().authenticate_credentials(userid, password, request)
+        cache.set(cache_key, (digest, user), timeout)
+        return (user, auth)
@@ -0,0 +1,68 @@
+import base64
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from users.authentication import (
+    CachedBasicAuthentication, CachedTokenAuthentication, invalidate_basic_credentials, invalidate_tokens,
+)
+
+PASSWORD = 'benchmark-password'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare the queries and requests per second of plain and cached token and Basic authentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2.0, help='How long to run each class')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(username='auth-benchmark', password=PASSWORD)
+                token = Token.objects.create(user=user)
+                factory = APIRequestFactory()
+                basic = base64.b64encode(f'{user.username}:{PASSWORD}'.encode()).decode()
+                cases = [
+                    (TokenAuthentication(), f'Token {token.key}'),
+                    (CachedTokenAuthentication(), f'Token {token.key}'),
+                    (BasicAuthentication(), f'Basic {basic}'),
+                    (CachedBasicAuthentication(), f'Basic {basic}'),
+                ]
+
+                def forget():
+                    # Only the benchmark's own entries: the cache may be shared with running workers
+                    invalidate_tokens([token.key])
+                    invalidate_basic_credentials(user.username)
+
+                for authentication, header in cases:
+                    forget()
+                    request = factory.get('/api/job-applications/', HTTP_AUTHORIZATION=header)
+                    requests, queries, seconds = self.run(authentication, request, options['seconds'])
+                    self.stdout.write(
+                        f'{type(authentication).__name__:28} {requests / seconds:10.1f} requests/s   '
+                        f'{queries / requests:.3f} queries/request'
+                    )
+                forget()
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, authentication, request, duration):
+        requests = 0
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            while time.perf_counter() - start < duration:
+                authentication.authenticate(request)
+                requests += 1
+        return requests, len(queries), time.perf_counter() - start
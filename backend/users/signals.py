@@ -0,0 +1,47 @@
+"""
+Signal handlers that drop cached token lookups and Basic credentials (see
+users.authentication) when a token is deleted or replaced, or its user changes
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_basic_credentials, invalidate_tokens
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    """Logout and rotation delete the old token; a saved token must not be served stale either"""
+    invalidate_tokens([instance.key])
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the stored username of an updated user, whose Basic credentials are cached under it"""
+    instance._credentials_previous_username = None
+    if raw or instance._state.adding or (update_fields is not None and User.USERNAME_FIELD not in update_fields):
+        return
+    instance._credentials_previous_username = User.objects.filter(pk=instance.pk).values_list(
+        User.USERNAME_FIELD, flat=True
+    ).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_credentials(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Cached credentials carry the user, so deactivation, password and other changes must reach them"""
+    if raw or (update_fields is not None and set(update_fields) == {'last_login'}):
+        # Logging in only touches last_login, which authentication does not depend on
+        return
+    invalidate_tokens(Token.objects.filter(user=instance).values_list('key', flat=True))
+    invalidate_basic_credentials(instance.get_username())
+    previous_username = getattr(instance, '_credentials_previous_username', None)
+    if previous_username and previous_username != instance.get_username():
+        invalidate_basic_credentials(previous_username)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_credentials(sender, instance, **kwargs):
+    """Tokens go with the user through the cascade; Basic credentials need dropping here"""
+    invalidate_basic_credentials(instance.get_username())
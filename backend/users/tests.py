@@ -1,3 +1,97 @@
-from django.test import TestCase
+import base64
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tokenuser', password='pass')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def token_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/notes/')
+        self.assertEqual(response.status_code, 200)
+        return [query for query in queries if 'authtoken_token' in query['sql']]
+
+    def assertRejected(self):
+        # 403 rather than 401 because SessionAuthentication comes first
+        self.assertIn(self.client.get('/api/notes/').status_code, (401, 403))
+
+    def test_repeat_requests_skip_the_token_query(self):
+        self.assertEqual(len(self.token_queries()), 1)
+        self.assertEqual(self.token_queries(), [])
+
+    def test_logout_deletes_the_token(self):
+        self.token_queries()
+        response = self.client.post('/api-token-auth/logout/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+        self.assertRejected()
+
+    def test_rotated_token_stops_working(self):
+        self.token_queries()
+        old_key = self.token.key
+        self.token.delete()
+        Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {old_key}')
+        self.assertRejected()
+
+    def test_deactivated_user_is_rejected(self):
+        self.token_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertRejected()
+
+
+class CachedBasicAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='basicuser', password='secret-pass')
+
+    def get(self, password, username='basicuser'):
+        credentials = base64.b64encode(f'{username}:{password}'.encode()).decode()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Basic {credentials}')
+        return self.client.get('/api/notes/')
+
+    def test_password_is_hashed_once(self):
+        with mock.patch.object(
+            BasicAuthentication, 'authenticate_credentials', autospec=True,
+            side_effect=BasicAuthentication.authenticate_credentials,
+        ) as verify:
+            self.assertEqual(self.get('secret-pass').status_code, 200)
+            self.assertEqual(self.get('secret-pass').status_code, 200)
+        self.assertEqual(verify.call_count, 1)
+
+    def test_wrong_password_is_rejected_after_a_cached_success(self):
+        self.assertEqual(self.get('secret-pass').status_code, 200)
+        self.assertIn(self.get('wrong-pass').status_code, (401, 403))
+
+    def test_password_change_drops_cached_credentials(self):
+        self.assertEqual(self.get('secret-pass').status_code, 200)
+        self.user.set_password('new-pass')
+        self.user.save()
+        self.assertIn(self.get('secret-pass').status_code, (401, 403))
+        self.assertEqual(self.get('new-pass').status_code, 200)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.get('secret-pass').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIn(self.get('secret-pass').status_code, (401, 403))
+
+    def test_rename_drops_credentials_cached_under_the_old_name(self):
+        self.assertEqual(self.get('secret-pass').status_code, 200)
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertIn(self.get('secret-pass').status_code, (401, 403))
+        self.assertEqual(self.get('secret-pass', username='renamed').status_code, 200)
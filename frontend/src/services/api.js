@@ -110,6 +110,9 @@ export const authAPI = {
   // Login
   login: (credentials) => api.post('/api-token-auth/', credentials),
   
+  // Logout (deletes the token on the server)
+  logout: () => api.post('/api-token-auth/logout/'),
+  
   // Register
   register: (userData) => api.post('/api-auth/registration/', userData),
   